@@ -99,6 +99,58 @@ class Config(QConfig):
                                      content= "The hotkey input to start and stop bot.",
                                      icon=CustomFluentIcon.SPARKLE)
 
+    general_ocr_workers = CustomRangeConfigItem("General",
+                                     "ocr_workers",
+                                     1,
+                                     RangeValidator(1, 8),
+                                     content="Number of OCR worker threads.",
+                                     icon=CustomFluentIcon.SPARKLE,
+                                     restart=True)
+
+    general_ocr_cache_size = CustomRangeConfigItem("General",
+                                     "ocr_cache_size",
+                                     256,
+                                     RangeValidator(0, 4096),
+                                     content="Number of OCR results kept in memory. 0 disables the cache.",
+                                     icon=CustomFluentIcon.SPARKLE,
+                                     restart=True)
+
+    general_ocr_cache_persist = CustomConfigItem("General",
+                                     "ocr_cache_persist",
+                                     False,
+                                     BoolValidator(),
+                                     content="Keep the OCR results between runs.",
+                                     icon=CustomFluentIcon.SPARKLE,
+                                     restart=True)
+
+    general_favorite_recognizer = CustomConfigItem("General",
+                                     "favorite_recognizer",
+                                     True,
+                                     BoolValidator(),
+                                     content="Recognize known favorite names from their pixels instead of running OCR every time.",
+                                     icon=CustomFluentIcon.SPARKLE)
+
+    general_health_fast_path = CustomConfigItem("General",
+                                     "health_fast_path",
+                                     False,
+                                     BoolValidator(),
+                                     content="Read the health bar from a few rows of pixels instead of the whole bar. Faster, but not yet checked against recordings of the game.",
+                                     icon=CustomFluentIcon.SPARKLE)
+
+    general_capture_fps = CustomRangeConfigItem("General",
+                                     "capture_fps",
+                                     0,
+                                     RangeValidator(0, 120),
+                                     content="Health bar captures per second in the background during armor training. 0 reads it on demand, only as often as the damage taken requires.",
+                                     icon=CustomFluentIcon.SPARKLE)
+
+    general_tracing = CustomConfigItem("General",
+                                     "tracing",
+                                     False,
+                                     BoolValidator(),
+                                     content="Save the timings of the captures, OCR, analysis and input of every run to the traces folder of the app data.",
+                                     icon=CustomFluentIcon.SPARKLE)
+
     general_region_healtbar = CustomConfigItem("General",
                                      "region_healtbar",
                                      [774, 1006, 375, 19],
@@ -106,6 +158,13 @@ class Config(QConfig):
                                      content= "Region containing the health bar.",
                                      icon=CustomFluentIcon.SPARKLE)
 
+    general_region_magickabar = CustomConfigItem("General",
+                                     "region_magickabar",
+                                     [60, 1006, 375, 19],
+                                     RegionValidator(),
+                                     content= "Region containing the magicka bar.",
+                                     icon=CustomFluentIcon.SPARKLE)
+
     general_region_favselect = CustomConfigItem("General",
                                      "region_favselect",
                                      [7, 791, 395, 43],
@@ -127,6 +186,20 @@ class Config(QConfig):
                                      content= "Region containing favorite hand selection symbol.",
                                      icon=CustomFluentIcon.SPARKLE)
 
+    general_favequip_margin = CustomRangeConfigItem("General",
+                                     "favequip_margin",
+                                     10,
+                                     RangeValidator(0, 100),
+                                     content="Extra pixels searched around the favorite hand selection region, in case the HUD is slightly offset.",
+                                     icon=CustomFluentIcon.SPARKLE)
+
+    general_region_dialog = CustomConfigItem("General",
+                                     "region_dialog",
+                                     [760, 440, 400, 200],
+                                     RegionValidator(),
+                                     content= "Region at the center of the screen where the wait and sleep menus open.",
+                                     icon=CustomFluentIcon.SPARKLE)
+
     # endregion
 
     # region GUI settings
@@ -164,6 +237,20 @@ class Config(QConfig):
                            content="The application will continue to run in the background",
                            icon=FIF.MINIMIZE
                            )
+    gui_logMaxLines = CustomRangeConfigItem("App",
+                           "Log lines",
+                           5000,
+                           RangeValidator(100, 50000),
+                           content="Number of lines kept in the log panel, the oldest ones are removed first",
+                           icon=FIF.DOCUMENT
+                           )
+    gui_logFlushInterval = CustomRangeConfigItem("App",
+                           "Log refresh interval",
+                           100,
+                           RangeValidator(20, 2000),
+                           content="Milliseconds between two updates of the log panel",
+                           icon=FIF.SYNC
+                           )
     # endregion
 
     # region Train Illusion settings
@@ -189,6 +276,13 @@ class Config(QConfig):
                                     content="Sleep in bed and gain \"Well Rested\" bonus while leveling. You need to target a bed.",
                                     icon=CustomFluentIcon.BED
                                     )
+    illusion_spell_cost = CustomRangeConfigItem("train_illusion",
+                                                 "Spell cost",
+                                                 25,
+                                                 RangeValidator(1, 100),
+                                                 content="Percentage of the magicka bar used by one cast. The bot rests when less magicka remains. 100 rests after every cast.",
+                                                 icon=FIF.SPEED_HIGH
+                                                 )
     # endregion
 
     # region Train Conjuration settings
@@ -207,6 +301,13 @@ class Config(QConfig):
                                             content="Choose the hand to cast the spell. Choose \"Both\" for dual cast.",
                                             icon=CustomFluentIcon.HAND
                                             )
+    conjuration_spell_cost = CustomRangeConfigItem("train_conjuration",
+                                                 "Spell cost",
+                                                 25,
+                                                 RangeValidator(1, 100),
+                                                 content="Percentage of the magicka bar used by one cast. The bot rests when less magicka remains. 100 rests after every cast.",
+                                                 icon=FIF.SPEED_HIGH
+                                                 )
     # endregion
 
     # region Train armor settings
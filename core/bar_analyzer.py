@@ -0,0 +1,173 @@
+import cv2
+import numpy as np
+from core.frame_snapshot import FrameSnapshot
+
+
+def widest_run(mask, max_gap=5):
+    """
+    Return the length of the longest run of True values in a 1D mask, allowing gaps of up to max_gap False values.
+    """
+    positions = np.flatnonzero(mask)
+    if positions.size == 0:
+        return 0
+    breaks = np.flatnonzero(np.diff(positions) > max_gap + 1)
+    starts = np.concatenate(([positions[0]], positions[breaks + 1]))
+    ends = np.concatenate((positions[breaks], [positions[-1]]))
+    return int(np.max(ends - starts) + 1)
+
+
+class BarSpec:
+    """
+    Description of a HUD bar: where it is and which colors make up its filled part.
+    """
+    orientations = ('horizontal', 'vertical')
+
+    def __init__(self, name, region, hue_ranges, min_saturation=70, min_value=50, orientation='horizontal', band=3, max_gap=5):
+        """
+        :param name: The name of the value in the results of BarAnalyzer.analyze.
+        :param region: A tuple (x, y, width, height) containing the bar, in screen coordinates.
+        :param hue_ranges: A list of inclusive (low, high) OpenCV hue ranges (0-179) of the filled part.
+        :param min_saturation: The lowest saturation (0-255) of the filled part.
+        :param min_value: The lowest brightness (0-255) of the filled part.
+        :param orientation: 'horizontal' or 'vertical', the direction the bar fills in.
+        :param band: The number of pixel lines across the middle of the bar that are analyzed.
+        :param max_gap: The largest run of unfilled pixels still considered part of the bar.
+        """
+        if orientation not in BarSpec.orientations:
+            raise ValueError(f"Unknown bar orientation: {orientation}")
+        self.name = name
+        self.region = tuple(region)
+        self.hue_ranges = tuple(tuple(hue_range) for hue_range in hue_ranges)
+        self.min_saturation = min_saturation
+        self.min_value = min_value
+        self.orientation = orientation
+        self.band = band
+        self.max_gap = max_gap
+
+    @property
+    def color_key(self):
+        return self.hue_ranges, self.min_saturation, self.min_value
+
+    @classmethod
+    def health(cls, region):
+        return cls('health', region, [(0, 10), (170, 179)])
+
+    @classmethod
+    def magicka(cls, region):
+        return cls('magicka', region, [(95, 130)])
+
+    @classmethod
+    def stamina(cls, region):
+        return cls('stamina', region, [(35, 85)])
+
+
+class BarAnalyzer:
+    """
+    Computes the fill percentage of several HUD bars in one pass.
+
+    The color test of every bar is precomputed into a lookup table indexed by the quantized BGR value,
+    so frames are never converted to HSV. The lookup tables of up to eight bars are packed into the
+    bits of one table, and the middle band of every bar goes through a single table lookup.
+    """
+    lut_bits = 6  # Bits kept per BGR channel for the lookup table index
+    _lut_cache = {}
+
+    def __init__(self, specs):
+        """
+        :param specs: A list of BarSpec, at most eight.
+        """
+        specs = list(specs)
+        if len(specs) > 8:
+            raise ValueError("BarAnalyzer supports at most eight bars.")
+        if len({spec.name for spec in specs}) != len(specs):
+            raise ValueError("Bar names must be unique.")
+        self.specs = specs
+        self.lut = np.zeros(1 << (3 * BarAnalyzer.lut_bits), dtype=np.uint8)
+        for bit, spec in enumerate(specs):
+            self.lut |= BarAnalyzer.color_table(*spec.color_key) << bit
+
+    @property
+    def regions(self):
+        return [spec.region for spec in self.specs]
+
+    @staticmethod
+    def color_table(hue_ranges, min_saturation, min_value):
+        """
+        Return the lookup table telling, for every quantized BGR value, if it is inside the color range (0 or 1).
+        Tables are cached, so analyzers using the same bar colors share them.
+        """
+        key = (BarAnalyzer.lut_bits, hue_ranges, min_saturation, min_value)
+        table = BarAnalyzer._lut_cache.get(key)
+        if table is None:
+            bits = BarAnalyzer.lut_bits
+            levels = (np.arange(1 << bits, dtype=np.uint16) << (8 - bits)) + (1 << (7 - bits))
+            blue, green, red = np.meshgrid(levels, levels, levels, indexing='ij')
+            bgr = np.stack([blue, green, red], axis=-1).astype(np.uint8).reshape(-1, 1, 3)
+            hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV).reshape(-1, 3)
+            hue, saturation, value = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+
+            in_hue = np.zeros(hue.shape, dtype=bool)
+            for low, high in hue_ranges:
+                in_hue |= (hue >= low) & (hue <= high)
+            table = (in_hue & (saturation >= min_saturation) & (value >= min_value)).astype(np.uint8)
+            BarAnalyzer._lut_cache[key] = table
+        return table
+
+    @staticmethod
+    def lut_index(pixels):
+        """
+        Convert BGR pixels (..., 3) to lookup table indices.
+        """
+        shift = 8 - BarAnalyzer.lut_bits
+        quantized = (pixels >> shift).astype(np.int32)
+        return (quantized[..., 0] << (2 * BarAnalyzer.lut_bits)) | (quantized[..., 1] << BarAnalyzer.lut_bits) | quantized[..., 2]
+
+    @staticmethod
+    def _band(spec, img):
+        # Lines across the middle of the bar, laid out along its length
+        if spec.orientation == 'vertical':
+            img = img.transpose(1, 0, 2)
+        height = img.shape[0]
+        top = max(0, height // 2 - spec.band // 2)
+        return img[top:top + spec.band]
+
+    def analyze(self, frame):
+        """
+        Compute the fill percentage of every bar.
+
+        :param frame: A full BGR screenshot or a FrameSnapshot containing the regions of the bars.
+        :return: A dictionary mapping the bar names to their fill percentage (0-100).
+        """
+        images = []
+        for spec in self.specs:
+            if isinstance(frame, FrameSnapshot):
+                images.append(frame.crop(spec.region))
+            else:
+                x, y, w, h = spec.region
+                images.append(frame[y:y+h, x:x+w])
+        return self.analyze_images(images)
+
+    def analyze_images(self, images):
+        """
+        Compute the fill percentage of every bar from images already cropped to their regions.
+
+        :param images: A list of BGR images, in the order of the specs.
+        :return: A dictionary mapping the bar names to their fill percentage (0-100).
+        """
+        bands = [self._band(spec, img) for spec, img in zip(self.specs, images)]
+        sizes = [band.shape[0] * band.shape[1] for band in bands]
+        if not sum(sizes):
+            return {spec.name: 0.0 for spec in self.specs}
+
+        # One table lookup for the pixels of every bar
+        pixels = np.concatenate([band.reshape(-1, 3) for band in bands])
+        labels = self.lut[self.lut_index(pixels)]
+
+        results = {}
+        offset = 0
+        for bit, (spec, band, size) in enumerate(zip(self.specs, bands, sizes)):
+            length = band.shape[1]
+            mask = ((labels[offset:offset + size] >> bit) & 1).reshape(band.shape[:2]).any(axis=0)
+            results[spec.name] = widest_run(mask, spec.max_gap) / length * 100 if length else 0.0
+            offset += size
+        return results
@@ -0,0 +1,80 @@
+import threading
+import time
+from core.exceptions import OperationCancelledException
+
+
+class CancellationToken:
+    """
+    Tells a running training sequence to stop.
+
+    Waits, captures and OCR requests check the token and raise OperationCancelledException once it is
+    cancelled, and callbacks registered with add_callback (e.g. Clock.interrupt) wake up whatever is
+    blocked at that moment. cancel() can be called from any thread.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.cancelled_at = None  # time.perf_counter() value of the cancel() call
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.cancelled_at = time.perf_counter()
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback):
+        """
+        Call a callback without arguments when the token is cancelled, right away if it already is.
+
+        :return: A callable removing the callback again.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelledException()
+
+    def elapsed(self):
+        """Return the seconds since cancel() was called, None if it was not."""
+        return None if self.cancelled_at is None else time.perf_counter() - self.cancelled_at
+
+    def wait_for(self, future, timeout=None):
+        """
+        Wait for the result of a concurrent.futures.Future, giving up as soon as the token is cancelled.
+
+        :raises OperationCancelledException: If the token is cancelled first.
+        :raises TimeoutError: If the future is not done within the timeout.
+        """
+        done = threading.Event()
+        future.add_done_callback(lambda _: done.set())
+        remove = self.add_callback(done.set)
+        try:
+            done.wait(timeout)
+        finally:
+            remove()
+        if not future.done():
+            if self.cancelled:
+                future.cancel()  # Drop the request if no worker has started it yet
+                raise OperationCancelledException()
+            raise TimeoutError()
+        return future.result()
@@ -0,0 +1,158 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+import cv2
+import mss
+import numpy as np
+
+
+class CaptureBackend(ABC):
+    """
+    Base class for screen capture backends.
+
+    Every backend returns frames as BGR NumPy arrays so the result can be handed
+    directly to the analyzers in ImageProcessing.
+    """
+    logger = logging.getLogger('CaptureBackend')
+
+    @abstractmethod
+    def grab(self, region=None, out=None):
+        """
+        Capture a region of the screen.
+
+        :param region: A tuple (x, y, width, height) in screen coordinates, or None for the whole primary screen.
+        :param out: Optional preallocated BGR array of the region's shape to write the frame into.
+        :return: The captured frame as a BGR NumPy array.
+        """
+
+    def close(self):
+        """Release any resources held by the backend."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class MssCaptureBackend(CaptureBackend):
+    """
+    Capture backend built on a long-lived mss session.
+
+    The mss session is created once per thread (mss handles cannot be shared between threads)
+    and reused for every grab, which avoids the PIL round trip and the full RGB allocation
+    that pyautogui.screenshot performs on each call. Only the requested region is grabbed.
+    """
+
+    def __init__(self, monitor=1):
+        """
+        :param monitor: Index of the mss monitor used when no region is given. 1 is the primary screen.
+        """
+        self.monitor = monitor
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def _session(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._lock:
+                self._sessions.append(sct)
+            self.logger.debug(f"Opened mss capture session for thread {threading.current_thread().name}")
+        return sct
+
+    def grab(self, region=None, out=None):
+        sct = self._session()
+        if region is None:
+            monitor = sct.monitors[self.monitor]
+        else:
+            x, y, w, h = region
+            monitor = {'left': x, 'top': y, 'width': w, 'height': h}
+
+        shot = sct.grab(monitor)
+        # View the raw BGRA buffer without copying it, then drop the alpha channel in a single pass
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        if out is not None:
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=out)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+
+    def close(self):
+        with self._lock:
+            for sct in self._sessions:
+                sct.close()
+            self._sessions.clear()
+        self._local = threading.local()
+
+
+class ReplayCaptureBackend(CaptureBackend):
+    """
+    Capture backend that replays recorded frames instead of reading the screen.
+
+    Each frame is treated as a full screenshot, so regions are cropped from it exactly
+    like they would be from the live screen. Useful for tests and for running on machines
+    without the game.
+    """
+
+    def __init__(self, frames, loop=True, advance_on_grab=False):
+        """
+        :param frames: A list of BGR NumPy arrays or image paths, or a directory containing PNG frames.
+        :param loop: If True, start over from the first frame after the last one.
+        :param advance_on_grab: If True, move to the next frame after every grab.
+        """
+        if isinstance(frames, (str, Path)) and Path(frames).is_dir():
+            frames = sorted(Path(frames).glob('*.png'))
+
+        self.frames = [self._load_frame(frame) for frame in frames]
+        if not self.frames:
+            raise ValueError("ReplayCaptureBackend needs at least one frame.")
+
+        self.loop = loop
+        self.advance_on_grab = advance_on_grab
+        self.index = 0
+        self.grab_count = 0
+
+    @staticmethod
+    def _load_frame(frame):
+        if isinstance(frame, np.ndarray):
+            return frame
+        img = cv2.imread(str(frame))
+        if img is None:
+            raise ValueError(f"Failed to load image at path: {frame}")
+        return img
+
+    @property
+    def current_frame(self):
+        return self.frames[self.index]
+
+    def next_frame(self):
+        """Move to the next frame. Returns False when the end is reached and looping is disabled."""
+        if self.index + 1 < len(self.frames):
+            self.index += 1
+            return True
+        if self.loop:
+            self.index = 0
+            return True
+        return False
+
+    def set_frame(self, index):
+        self.index = index % len(self.frames)
+
+    def grab(self, region=None, out=None):
+        frame = self.current_frame
+        if region is not None:
+            x, y, w, h = region
+            frame = frame[y:y+h, x:x+w]
+
+        if out is not None:
+            out[...] = frame
+            result = out
+        else:
+            result = frame.copy()
+
+        self.grab_count += 1
+        if self.advance_on_grab:
+            self.next_frame()
+        return result
@@ -0,0 +1,159 @@
+import heapq
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+class Clock(ABC):
+    """
+    Source of time for everything that waits: polling loops, input timing and sequence delays.
+
+    now() is a monotonic time in seconds, only meaningful relative to other now() values.
+    Waits are interruptible: after interrupt(), sleeping returns False at once until resume() is called,
+    so a stopped training run does not sit out the rest of its delays.
+    """
+    realtime = True  # False when the clock does not follow the wall clock, e.g. in a simulation
+
+    def __init__(self):
+        self._interrupted = threading.Event()
+
+    @abstractmethod
+    def now(self):
+        """Return the current monotonic time in seconds."""
+
+    @abstractmethod
+    def _wait(self, seconds):
+        """Wait for the given number of seconds, returning False if interrupted."""
+
+    @property
+    def interrupted(self):
+        return self._interrupted.is_set()
+
+    def interrupt(self):
+        """Wake up every wait in progress and make the next ones return at once."""
+        self._interrupted.set()
+
+    def resume(self):
+        """Make waits wait again after interrupt()."""
+        self._interrupted.clear()
+
+    def sleep(self, seconds):
+        """
+        Wait for the given number of seconds.
+
+        :return: True if the whole time passed, False if the wait was interrupted.
+        """
+        if self.interrupted:
+            return False
+        if seconds <= 0:
+            return True
+        return self._wait(seconds)
+
+    def sleep_until(self, deadline):
+        """
+        Wait until now() reaches the deadline.
+
+        :return: True if the deadline was reached, False if the wait was interrupted.
+        """
+        return self.sleep(deadline - self.now())
+
+
+class SystemClock(Clock):
+    """
+    The real clock, based on time.perf_counter.
+    """
+    spin_threshold = 0.002  # The last part of sleep_until is spun instead of slept, for precise timing
+
+    def now(self):
+        return time.perf_counter()
+
+    def _wait(self, seconds):
+        return not self._interrupted.wait(seconds)
+
+    def sleep_until(self, deadline):
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin_threshold and not self.sleep(remaining - self.spin_threshold):
+            return False
+        while time.perf_counter() < deadline:
+            if self.interrupted:
+                return False
+        return not self.interrupted
+
+
+class ScaledClock(Clock):
+    """
+    Real clock running faster (or slower) than the wall clock, for dry runs of long sequences.
+
+    With a scale of 10, a 5 s delay of a sequence takes 0.5 s. The game itself does not speed up,
+    so it is meant for runs against a Simulator or with the game paused.
+    """
+    realtime = False
+
+    def __init__(self, scale=1.0):
+        """
+        :param scale: The number of clock seconds per real second.
+        """
+        if scale <= 0:
+            raise ValueError("The clock scale must be positive.")
+        super().__init__()
+        self.scale = scale
+        self._start = time.perf_counter()
+
+    def now(self):
+        return (time.perf_counter() - self._start) * self.scale
+
+    def _wait(self, seconds):
+        return not self._interrupted.wait(seconds / self.scale)
+
+
+class VirtualClock(Clock):
+    """
+    Clock whose time only moves when something sleeps on it, so waits return immediately.
+
+    Used by the Simulator to run sequences much faster than real time with the exact same timing decisions.
+    Callbacks registered with call_at run when the time passes them, in the middle of a sleep if needed,
+    and can interrupt the clock to end the sleep there.
+    """
+    realtime = False
+
+    def __init__(self, start=0.0):
+        """
+        :param start: The initial value of now(), in seconds.
+        """
+        super().__init__()
+        self._now = start
+        self._alarms = []  # Heap of (time, order, callback)
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self._now
+
+    def call_at(self, when, callback):
+        """
+        Call a callback without arguments once now() reaches a time.
+        """
+        with self._lock:
+            heapq.heappush(self._alarms, (when, next(self._order), callback))
+
+    def _wait(self, seconds):
+        return self.advance(seconds)
+
+    def advance(self, seconds):
+        """
+        Move the time forward, running the callbacks due on the way.
+
+        :return: False if a callback interrupted the clock, which stops the time at that callback.
+        """
+        target = self._now + seconds
+        while True:
+            with self._lock:
+                if not self._alarms or self._alarms[0][0] > target:
+                    self._now = max(self._now, target)
+                    return True
+                when, _, callback = heapq.heappop(self._alarms)
+                self._now = max(self._now, when)
+            callback()
+            if self.interrupted:
+                return False
@@ -25,3 +25,25 @@ class FavoriteTextNotFoundException(LogicError):
     """Exception raised when favorite text is not found indicating a problem with the OCR or the screenshot region."""
     def __init__(self, message="Favorite text not found. There may be an issue with OCR or screenshot region."):
         super().__init__(message)
+
+class WindowNotFoundException(ApplicationError):
+    """Exception raised when no window matches the requested title."""
+    def __init__(self, window_title=None):
+        message = f"No window found with the title: {window_title}" if window_title else "No window found."
+        super().__init__(message)
+
+class WindowAmbiguousException(ApplicationError):
+    """Exception raised when several windows match the requested title."""
+    def __init__(self, window_title=None):
+        message = f"Multiple windows found with the title: {window_title}" if window_title else "Multiple windows found."
+        super().__init__(message)
+
+class OcrError(ApplicationError):
+    """Exception raised when the OCR engine fails to process an image."""
+    def __init__(self, message="The OCR engine failed to process the image."):
+        super().__init__(message)
+
+class OperationCancelledException(ApplicationError):
+    """Exception raised inside a training run when it is stopped, to unwind it from wherever it is waiting."""
+    def __init__(self, message="The operation was cancelled."):
+        super().__init__(message)
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import threading
+import cv2
+import numpy as np
+
+
+class FavoriteNameRecognizer:
+    """
+    Recognizes favorite names from their rendered pixels instead of running OCR.
+
+    The first time a favorite is read, its text is obtained with OCR and stored together with a
+    signature of the rendered name: the width of the text and a binary image of the text, cropped
+    to its bounding box and resized to a fixed size. Later frames are matched against the stored
+    signatures (exactly, then by Hamming distance) and only fall back to OCR on a miss.
+    """
+    logger = logging.getLogger('FavoriteNameRecognizer')
+    signature_size = (128, 16)  # (width, height) of the normalized text image
+
+    def __init__(self, max_distance=0.012, width_tolerance=4, path=None):
+        """
+        :param max_distance: The largest fraction of differing signature bits still considered a match.
+        :param width_tolerance: The largest difference in text width (pixels) between matching signatures.
+        :param path: The JSON file used by load and save.
+        """
+        self.max_distance = max_distance
+        self.width_tolerance = width_tolerance
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._exact = {}  # (width, signature bytes) -> text
+        self._widths = np.empty(0, dtype=np.int32)
+        self._bits = np.empty((0, self.signature_size[0] * self.signature_size[1] // 8), dtype=np.uint8)
+        self._texts = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._texts)
+
+    @staticmethod
+    def signature(binary_img):
+        """
+        Compute the signature of a thresholded favorite name (dark text on a light background).
+
+        :param binary_img: The thresholded grayscale image.
+        :return: A tuple (text width, packed signature bits), or None if the image holds no text.
+        """
+        text_mask = binary_img < 128
+        columns = np.flatnonzero(text_mask.any(axis=0))
+        if columns.size == 0:
+            return None
+        rows = np.flatnonzero(text_mask.any(axis=1))
+
+        text = text_mask[rows[0]:rows[-1] + 1, columns[0]:columns[-1] + 1].astype(np.uint8) * 255
+        small = cv2.resize(text, FavoriteNameRecognizer.signature_size, interpolation=cv2.INTER_AREA)
+        return int(columns[-1] - columns[0] + 1), np.packbits(small > 127)
+
+    def lookup(self, binary_img):
+        """
+        Return the text of a known favorite name, or None if it was never seen.
+        """
+        signature = self.signature(binary_img)
+        if signature is None:
+            return None
+        width, bits = signature
+
+        with self._lock:
+            text = self._exact.get((width, bits.tobytes()))
+            if text is None:
+                index = self._match(width, bits)
+                if index is not None:
+                    text = self._texts[index]
+
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return text
+
+    def _match(self, width, bits):
+        """
+        Return the index of the closest stored signature within the tolerances, or None. Called with the lock held.
+        """
+        candidates = np.flatnonzero(np.abs(self._widths - width) <= self.width_tolerance)
+        if not candidates.size:
+            return None
+        distances = np.unpackbits(self._bits[candidates] ^ bits, axis=1).sum(axis=1)
+        best = np.argmin(distances)
+        if distances[best] > self.max_distance * bits.size * 8:
+            return None
+        return int(candidates[best])
+
+    def learn(self, binary_img, text):
+        """
+        Store the text of a favorite name. Images without text or empty texts are ignored.
+        """
+        signature = self.signature(binary_img)
+        if signature is None or not text.strip():
+            return
+        self._add(*signature, text)
+
+    def forget(self, binary_img):
+        """
+        Remove the stored name matching an image, e.g. when it turned out to be misread by OCR.
+        The next time the name is shown, it is read with OCR again.
+
+        :return: The text that was forgotten, or None if the image matched no stored name.
+        """
+        signature = self.signature(binary_img)
+        if signature is None:
+            return None
+        width, bits = signature
+
+        with self._lock:
+            index = self._match(width, bits)
+            if index is None:
+                return None
+            text = self._texts.pop(index)
+            del self._exact[(int(self._widths[index]), self._bits[index].tobytes())]
+            self._widths = np.delete(self._widths, index)
+            self._bits = np.delete(self._bits, index, axis=0)
+        self.logger.debug(f"Forgot the favorite name '{text}'.")
+        return text
+
+    def _add(self, width, bits, text):
+        with self._lock:
+            key = (width, bits.tobytes())
+            if key in self._exact:
+                return
+            self._exact[key] = text
+            self._widths = np.append(self._widths, np.int32(width))
+            self._bits = np.vstack([self._bits, bits[None, :]])
+            self._texts.append(text)
+
+    def recognize(self, binary_img, ocr):
+        """
+        Read a favorite name, using OCR only for names that were never seen.
+
+        :param binary_img: The thresholded grayscale image of the favorite name.
+        :param ocr: A callable taking the image and returning its text, used on a miss.
+        :return: The text of the favorite name.
+        """
+        text = self.lookup(binary_img)
+        if text is None:
+            text = ocr(binary_img)
+            self.learn(binary_img, text)
+        return text
+
+    def save(self):
+        """
+        Write the known signatures to the JSON file.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            entries = [[int(width), bits.tobytes().hex(), text] for width, bits, text in zip(self._widths, self._bits, self._texts)]
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump({'signature_size': list(self.signature_size), 'entries': entries}, file)
+        self.logger.debug(f"Saved {len(entries)} favorite signatures to {self.path}")
+
+    def load(self):
+        """
+        Read the signatures from the JSON file. Returns the number of signatures loaded.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to load the favorite signatures from {self.path}: {e}")
+            return 0
+
+        if data.get('signature_size') != list(self.signature_size):
+            return 0
+        for width, bits, text in data.get('entries', []):
+            self._add(width, np.frombuffer(bytes.fromhex(bits), dtype=np.uint8), text)
+        self.logger.debug(f"Loaded {len(self)} favorite signatures from {self.path}")
+        return len(self)
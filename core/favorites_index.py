@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+
+
+class FavoritesIndex:
+    """
+    Ordered list of the entries of the favorites menu, from top to bottom.
+
+    It is built from a full scan of the menu and saved to disk, so later equips can press the
+    exact number of keys to reach a favorite instead of reading every entry on the way.
+    """
+    logger = logging.getLogger('FavoritesIndex')
+
+    def __init__(self, path=None):
+        """
+        :param path: The JSON file used by load and save.
+        """
+        self.path = path
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def is_valid(self):
+        return bool(self.entries)
+
+    def update(self, entries):
+        """
+        Replace the index with the entries of a full scan, ordered from top to bottom.
+        """
+        self.entries = [entry.strip() for entry in entries]
+        self.logger.info(f"Favorites index updated with {len(self.entries)} entries.")
+
+    def invalidate(self):
+        """
+        Clear the index and delete its JSON file, so the next equip rebuilds it from a full scan.
+        """
+        self.entries = []
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            self.logger.warning(f"Failed to delete the favorites index {self.path}: {e}")
+
+    def index_of(self, entry_text):
+        """
+        Return the position of the entry with exactly this text, or None.
+        """
+        entry_text = entry_text.strip()
+        for position, entry in enumerate(self.entries):
+            if entry == entry_text:
+                return position
+        return None
+
+    def find(self, favorite_name):
+        """
+        Return the position of the first entry containing the favorite name, or None.
+        """
+        for position, entry in enumerate(self.entries):
+            if favorite_name in entry:
+                return position
+        return None
+
+    def save(self):
+        if not self.path:
+            return
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump({'entries': self.entries}, file)
+
+    def load(self):
+        """
+        Read the index from the JSON file. Returns the number of entries loaded.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self.entries = list(json.load(file).get('entries', []))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to load the favorites index from {self.path}: {e}")
+            self.entries = []
+        return len(self.entries)
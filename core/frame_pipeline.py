@@ -0,0 +1,223 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+from core.tracing import tracer
+
+AnalyzedState = namedtuple('AnalyzedState', ['sequence', 'timestamp', 'values'])
+
+
+class FrameRingBuffer:
+    """
+    Fixed number of preallocated frames, written by one capture thread and read by analyzer threads.
+
+    Readers pin the frame they analyze. The writer only reuses slots that are neither pinned nor the
+    newest frame, and drops the new frame when no slot is free, so a frame is never overwritten while
+    it is read. Readers always take the newest frame they have not claimed yet; older ones are skipped.
+    """
+
+    def __init__(self, slots, shape, dtype=np.uint8):
+        """
+        :param slots: The number of preallocated frames (at least 2).
+        :param shape: The shape of a frame, e.g. (height, width, 3).
+        :param dtype: The data type of a frame.
+        """
+        if slots < 2:
+            raise ValueError("FrameRingBuffer needs at least two slots.")
+        self.frames = np.empty((slots,) + tuple(shape), dtype=dtype)
+        self.dropped = 0  # Frames not captured because every slot was in use
+        self.skipped = 0  # Frames captured but never claimed by a reader
+        self._sequences = [0] * slots
+        self._timestamps = [0.0] * slots
+        self._pins = [0] * slots
+        self._latest = None
+        self._sequence = 0
+        self._claimed = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def sequence(self):
+        """The sequence number of the newest frame, 0 before the first one."""
+        return self._sequence
+
+    def acquire_write(self):
+        """
+        Return the index of the slot the next frame should be written to, or None to drop the frame.
+        """
+        with self._condition:
+            free = [slot for slot, pins in enumerate(self._pins) if pins == 0 and slot != self._latest]
+            if not free:
+                self.dropped += 1
+                return None
+            return min(free, key=lambda slot: self._sequences[slot])
+
+    def publish(self, slot, timestamp):
+        """
+        Make the frame written to the slot the newest frame and wake up the readers.
+        """
+        with self._condition:
+            self._sequence += 1
+            self._sequences[slot] = self._sequence
+            self._timestamps[slot] = timestamp
+            self._latest = slot
+            self._condition.notify_all()
+
+    def acquire_latest(self, timeout=None):
+        """
+        Claim and pin the newest frame no reader has claimed yet, waiting for one if needed.
+        The slot must be given back with release.
+
+        :param timeout: How long to wait for a new frame. None waits until one arrives or the buffer is closed.
+        :return: A tuple (slot, sequence, timestamp), or None on timeout or when the buffer is closed.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._sequence > self._claimed or self._closed, timeout):
+                return None
+            if self._closed:
+                return None
+            slot = self._latest
+            sequence = self._sequences[slot]
+            self.skipped += sequence - self._claimed - 1
+            self._claimed = sequence
+            self._pins[slot] += 1
+            return slot, sequence, self._timestamps[slot]
+
+    def release(self, slot):
+        with self._condition:
+            self._pins[slot] -= 1
+
+    def close(self):
+        """Wake up the waiting readers; acquire_latest returns None from now on."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class CapturePipeline:
+    """
+    Captures a screen region on a background thread and analyzes the frames on worker threads.
+
+    The capture thread writes into a FrameRingBuffer at a fixed rate. Each worker takes the newest
+    frame, runs every analyzer on it and publishes the results as an AnalyzedState, which the
+    training sequence reads with latest_state without waiting for a capture or an analysis.
+    Under backpressure frames are dropped, so the state is never older than the frame being analyzed.
+    """
+    logger = logging.getLogger('CapturePipeline')
+
+    def __init__(self, backend, region, analyzers, fps=30, workers=1, slots=4):
+        """
+        :param backend: The CaptureBackend used by the capture thread.
+        :param region: A tuple (x, y, width, height) captured on every tick.
+        :param analyzers: A dictionary mapping value names to callables taking the BGR frame and returning a value.
+        :param fps: The number of captures per second.
+        :param workers: The number of analyzer threads.
+        :param slots: The number of frames in the ring buffer.
+        """
+        if fps <= 0:
+            raise ValueError("CapturePipeline needs a positive frame rate.")
+        x, y, w, h = region
+        self.backend = backend
+        self.region = (x, y, w, h)
+        self.analyzers = dict(analyzers)
+        self.interval = 1.0 / fps
+        self.buffer = FrameRingBuffer(max(slots, workers + 2), (h, w, 3))
+        self.captured = 0
+        self.analyzed = 0
+        self._worker_count = workers
+        self._state = None
+        self._state_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def running(self):
+        return bool(self._threads)
+
+    def start(self):
+        if self._threads:
+            return
+        self._threads.append(threading.Thread(target=self._capture_loop, name='CaptureThread', daemon=True))
+        for i in range(self._worker_count):
+            self._threads.append(threading.Thread(target=self._analyze_loop, name=f'AnalyzerWorker-{i}', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop the capture and analyzer threads and wait for them to finish."""
+        self._stop.set()
+        self.buffer.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.logger.debug(f"Capture pipeline statistics: {self.stats()}")
+
+    def latest_state(self, max_age=None):
+        """
+        Return the newest AnalyzedState without waiting.
+
+        :param max_age: The maximum age of the analyzed frame in seconds. None accepts any age.
+        :return: The AnalyzedState, or None if no frame was analyzed yet or the newest one is too old.
+        """
+        with self._state_lock:
+            state = self._state
+        if state is None or (max_age is not None and time.monotonic() - state.timestamp > max_age):
+            return None
+        return state
+
+    def stats(self):
+        return {
+            'captured': self.captured,
+            'analyzed': self.analyzed,
+            'dropped': self.buffer.dropped,
+            'skipped': self.buffer.skipped,
+        }
+
+    def _capture_loop(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            slot = self.buffer.acquire_write()
+            if slot is not None:
+                try:
+                    with tracer.span('capture'):
+                        self.backend.grab(self.region, out=self.buffer.frames[slot])
+                    self.buffer.publish(slot, time.monotonic())
+                    self.captured += 1
+                except Exception as e:
+                    self.logger.error(f"Failed to capture a frame: {e}")
+
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_tick = time.monotonic()  # Running late, do not try to catch up
+
+    def _analyze_loop(self):
+        while not self._stop.is_set():
+            item = self.buffer.acquire_latest(timeout=0.1)
+            if item is None:
+                continue
+            slot, sequence, timestamp = item
+            try:
+                frame = self.buffer.frames[slot]
+                values = {name: analyzer(frame) for name, analyzer in self.analyzers.items()}
+            except Exception as e:
+                self.logger.error(f"Failed to analyze frame {sequence}: {e}")
+                continue
+            finally:
+                self.buffer.release(slot)
+
+            with self._state_lock:
+                # With several workers a slower one may finish an older frame last
+                if self._state is None or sequence > self._state.sequence:
+                    self._state = AnalyzedState(sequence, timestamp, values)
+                self.analyzed += 1
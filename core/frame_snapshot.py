@@ -0,0 +1,93 @@
+import time
+
+
+class FrameSnapshot:
+    """
+    The content of several screen regions captured at the same moment, addressed in screen coordinates.
+
+    Regions close to each other are captured with a single grab of their bounding box. Regions far
+    apart get their own grab, so no large unused area between them is copied. crop returns NumPy
+    views into the captured images: handing a region to an analyzer copies nothing.
+    """
+
+    def __init__(self, captures, timestamp=None):
+        """
+        :param captures: A list of (box, image) tuples, box being the (x, y, width, height) screen area of the image.
+        :param timestamp: The time.monotonic() value of the capture.
+        """
+        self.captures = [(tuple(box), image) for box, image in captures]
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+
+    @staticmethod
+    def bounding_box(regions):
+        """
+        Return the smallest (x, y, width, height) box containing all the regions.
+        """
+        left = min(x for x, _, _, _ in regions)
+        top = min(y for _, y, _, _ in regions)
+        right = max(x + w for x, _, w, _ in regions)
+        bottom = max(y + h for _, y, _, h in regions)
+        return left, top, right - left, bottom - top
+
+    @staticmethod
+    def plan(regions, max_overhead=1.5):
+        """
+        Group regions into the boxes to grab. Two boxes are merged while the area of their bounding box
+        is at most max_overhead times the sum of their areas.
+
+        :param regions: A list of (x, y, width, height) tuples.
+        :param max_overhead: How much larger than the useful area a merged grab may be.
+        :return: A list of (x, y, width, height) boxes covering every region.
+        """
+        boxes = list(dict.fromkeys(tuple(region) for region in regions))
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(boxes)):
+                for j in range(i + 1, len(boxes)):
+                    union = FrameSnapshot.bounding_box([boxes[i], boxes[j]])
+                    if union[2] * union[3] <= max_overhead * (boxes[i][2] * boxes[i][3] + boxes[j][2] * boxes[j][3]):
+                        boxes[i] = union
+                        del boxes[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return boxes
+
+    @classmethod
+    def capture(cls, backend, regions, max_overhead=1.5):
+        """
+        Capture the regions with as few grabs as plan allows.
+
+        :param backend: The CaptureBackend to grab from.
+        :param regions: A list of (x, y, width, height) tuples.
+        :param max_overhead: See plan.
+        """
+        timestamp = time.monotonic()
+        return cls([(box, backend.grab(box)) for box in cls.plan(regions, max_overhead)], timestamp)
+
+    def _find(self, region):
+        x, y, w, h = region
+        for box, image in self.captures:
+            bx, by, bw, bh = box
+            if bx <= x and by <= y and x + w <= bx + bw and y + h <= by + bh:
+                return box, image
+        return None
+
+    def __contains__(self, region):
+        return self._find(region) is not None
+
+    def crop(self, region):
+        """
+        Return a view of a region of the snapshot.
+
+        :param region: A tuple (x, y, width, height) in screen coordinates, inside one of the captured boxes.
+        :return: The region as a NumPy view, without copying.
+        """
+        found = self._find(region)
+        if found is None:
+            raise ValueError(f"Region {tuple(region)} is not part of the snapshot.")
+        (bx, by, _, _), image = found
+        x, y, w, h = region
+        return image[y - by:y - by + h, x - bx:x - bx + w]
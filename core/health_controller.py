@@ -0,0 +1,105 @@
+import math
+import time
+from collections import deque
+
+
+class HealthController:
+    """
+    Decides when to poll the health bar again and when to start healing, from recent health samples.
+
+    The rate of change of health is estimated with a least squares fit over the samples of the last
+    few seconds. While health is stable the bar is polled rarely; when it falls, the poll interval
+    shrinks so that health drops by at most max_drop between two polls. Healing starts as soon as
+    health is below the heal threshold or is predicted to get there before a cast would complete.
+    """
+
+    def __init__(self, heal_threshold=75, critical_threshold=30, min_interval=0.05, max_interval=1.0, max_drop=2.0, window=2.0):
+        """
+        :param heal_threshold: The health percentage under which healing starts.
+        :param critical_threshold: The health percentage under which the training is stopped.
+        :param min_interval: The shortest time between two polls, in seconds.
+        :param max_interval: The longest time between two polls, in seconds.
+        :param max_drop: The largest health loss (percentage points) allowed between two polls.
+        :param window: The age in seconds of the oldest sample used for the rate estimate.
+        """
+        self.heal_threshold = heal_threshold
+        self.critical_threshold = critical_threshold
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_drop = max_drop
+        self.window = window
+        self.samples = deque(maxlen=64)  # (timestamp, health)
+
+    @property
+    def health(self):
+        """The last health sample, or None."""
+        return self.samples[-1][1] if self.samples else None
+
+    def reset(self):
+        """Forget the samples, e.g. after healing changed the health abruptly."""
+        self.samples.clear()
+
+    def add_sample(self, health, timestamp=None):
+        """
+        Record a health reading.
+
+        :param health: The health percentage.
+        :param timestamp: The time.monotonic() value of the reading. Defaults to now.
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        self.samples.append((timestamp, health))
+        while self.samples and timestamp - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+    def rate(self):
+        """
+        Return the estimated change of health in percentage points per second (negative while taking damage).
+        """
+        if len(self.samples) < 2:
+            return 0.0
+        times = [timestamp for timestamp, _ in self.samples]
+        values = [health for _, health in self.samples]
+        mean_time = sum(times) / len(times)
+        mean_value = sum(values) / len(values)
+        variance = sum((t - mean_time) ** 2 for t in times)
+        if variance == 0:
+            return 0.0
+        return sum((t - mean_time) * (v - mean_value) for t, v in zip(times, values)) / variance
+
+    def time_to(self, level):
+        """
+        Return the predicted time in seconds until health falls to the level, or infinity if it is not falling.
+        """
+        health = self.health
+        if health is None:
+            return math.inf
+        if health <= level:
+            return 0.0
+        rate = self.rate()
+        if rate >= 0:
+            return math.inf
+        return (health - level) / -rate
+
+    def should_heal(self, lead_time=0.0):
+        """
+        Return True if healing should start now.
+
+        :param lead_time: How long a heal takes to land, in seconds. Healing starts early enough for health
+            not to fall under the heal threshold before it does.
+        """
+        return self.health is not None and self.time_to(self.heal_threshold) <= lead_time
+
+    def is_critical(self):
+        return self.health is not None and self.health < self.critical_threshold
+
+    def next_interval(self):
+        """
+        Return how long to wait before the next poll, in seconds.
+        """
+        if len(self.samples) < 2:
+            # No rate yet, e.g. right after a heal: poll again soon, health may be falling fast
+            return self.min_interval
+        rate = self.rate()
+        if rate >= 0:
+            return self.max_interval
+        return min(self.max_interval, max(self.min_interval, self.max_drop / -rate))
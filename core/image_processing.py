@@ -1,13 +1,19 @@
-import pyautogui
 import cv2
-import pytesseract
 import numpy as np
 from PIL import Image
 import logging
 from tkinter.filedialog import asksaveasfilename
 from tkinter import Tk
-import time
 from core.utils import Utils
+from core.capture import MssCaptureBackend
+from core.frame_snapshot import FrameSnapshot
+from core.bar_analyzer import BarAnalyzer, BarSpec, widest_run
+from core.template_registry import template_registry
+from core.template_matching import TemplateMatcher
+from core.ocr_service import OcrService
+from core.ocr_cache import OcrCache
+from core.favorite_recognizer import FavoriteNameRecognizer
+from core.tracing import traced
 from config.config import cfg
 from pathlib import Path
 from core.app_data_manager import app_data_manager
@@ -18,36 +24,197 @@ import os
 class ImageProcessing:
     logger = logging.getLogger('ImageProcessing')  # Static logger for the class
     assets_path = resources.files('core.assets')
+    capture_backend = None  # Shared CaptureBackend, created on first use
+    ocr_service = None  # Shared OcrService, created on first use
+    ocr_cache = None  # Shared OcrCache, created on first use
+    favorite_recognizer = None  # Shared FavoriteNameRecognizer, created on first use
+    bar_analyzer = None  # Shared BarAnalyzer, rebuilt when the bar regions change
+    favorite_equip_templates = [('r', 'fav_right_icon'), ('l', 'fav_left_icon'), ('lr', 'fav_both_icon')]
+    favorite_equip_early_exit = 0.95  # Confidence at which the other hand icons are not worth checking
 
+    @staticmethod
+    def register_templates():
+        """
+        Register and preload the template images shipped in core/assets.
+        """
+        for _, name in ImageProcessing.favorite_equip_templates:
+            template_registry.register(name, ImageProcessing.assets_path / f'{name}.png')
+
+    @staticmethod
+    def get_capture_backend():
+        """
+        Return the active capture backend, creating the default mss backend on first use.
+        """
+        if ImageProcessing.capture_backend is None:
+            ImageProcessing.capture_backend = MssCaptureBackend()
+        return ImageProcessing.capture_backend
+
+    @staticmethod
+    def set_capture_backend(backend):
+        """
+        Replace the capture backend used by screenshot (e.g. with a ReplayCaptureBackend in tests).
+
+        :param backend: The CaptureBackend instance to use, or None to go back to the default backend.
+        """
+        previous = ImageProcessing.capture_backend
+        if previous is not None and previous is not backend:
+            previous.close()
+        ImageProcessing.capture_backend = backend
+
+    @staticmethod
+    def get_ocr_service():
+        """
+        Return the active OCR service, starting the default one on first use.
+        """
+        if ImageProcessing.ocr_service is None:
+            ImageProcessing.ocr_service = OcrService(workers=cfg.general_ocr_workers.value)
+        return ImageProcessing.ocr_service
+
+    @staticmethod
+    def set_ocr_service(service):
+        """
+        Replace the OCR service used by ocr_extract_text (e.g. with one backed by a FakeOcrEngine in tests).
+
+        :param service: The OcrService instance to use, or None to go back to the default service.
+        """
+        previous = ImageProcessing.ocr_service
+        if previous is not None and previous is not service:
+            previous.close()
+        ImageProcessing.ocr_service = service
+
+    @staticmethod
+    def get_ocr_cache():
+        """
+        Return the OCR result cache, creating it (and loading the saved results if enabled) on first use.
+        """
+        if ImageProcessing.ocr_cache is None:
+            path = app_data_manager.get_file_path('ocr_cache.json') if cfg.general_ocr_cache_persist.value else None
+            ImageProcessing.ocr_cache = OcrCache(max_size=cfg.general_ocr_cache_size.value, path=path)
+            ImageProcessing.ocr_cache.load()
+        return ImageProcessing.ocr_cache
+
+    @staticmethod
+    def get_favorite_recognizer():
+        """
+        Return the favorite name recognizer, creating it (and loading the saved signatures if enabled) on first use.
+        """
+        if ImageProcessing.favorite_recognizer is None:
+            path = app_data_manager.get_file_path('favorite_signatures.json') if cfg.general_ocr_cache_persist.value else None
+            ImageProcessing.favorite_recognizer = FavoriteNameRecognizer(path=path)
+            ImageProcessing.favorite_recognizer.load()
+        return ImageProcessing.favorite_recognizer
 
     @staticmethod
+    @traced('capture')
     def screenshot(region=None):
         """
-        Capture the health bar area of the screen.
+        Capture a region of the screen.
+
+        :param region: A tuple (x, y, width, height) to capture, or None for the whole screen.
+        :return: The captured image as a BGR NumPy array.
         """
         try:
+            Utils.check_cancelled()
             Utils.focus_window(cfg.general_window_name.value)
-            screenshot = pyautogui.screenshot(region=region)
-            screenshot = np.array(screenshot)
-            screenshot = cv2.cvtColor(screenshot, cv2.COLOR_RGB2BGR)
-            return screenshot
+            return ImageProcessing.get_capture_backend().grab(region)
 
         except Exception as e:
             raise
 
+    @staticmethod
+    @traced('capture')
+    def snapshot(regions):
+        """
+        Capture several regions of the screen at once, see FrameSnapshot.
+
+        :param regions: A list of (x, y, width, height) tuples.
+        :return: The FrameSnapshot, to be cropped with crop_image.
+        """
+        Utils.check_cancelled()
+        Utils.focus_window(cfg.general_window_name.value)
+        return FrameSnapshot.capture(ImageProcessing.get_capture_backend(), regions)
+
+    @staticmethod
+    def favorite_equip_search_region(margin=None):
+        """
+        Return the favorite equip region padded by the search margin, clamped to the top left of the screen.
+
+        :param margin: The padding in pixels on every side. Defaults to the configured margin.
+        """
+        if margin is None:
+            margin = cfg.general_favequip_margin.value
+        x, y, w, h = cfg.general_region_favequip.value
+        left, top = max(x - margin, 0), max(y - margin, 0)
+        return left, top, x + w + margin - left, y + h + margin - top
+
     @staticmethod
     def crop_image(image, region):
         """
         Crop the image based on the specified region.
 
-        :param image: The input image to be cropped (as a NumPy array).
+        :param image: The input image to be cropped (as a NumPy array), or a FrameSnapshot.
         :param region: A tuple (x, y, width, height) specifying the region to crop.
-        :return: The cropped image as a NumPy array.
+        :return: The cropped image as a NumPy array (a view, not a copy).
         """
+        if isinstance(image, FrameSnapshot):
+            return image.crop(region)
         x, y, w, h = region
         cropped_image = image[y:y+h, x:x+w]
         return cropped_image
 
+    @staticmethod
+    def frame_difference(image, reference):
+        """
+        Mean absolute difference per pixel channel between two images of the same shape (0-255).
+        """
+        return cv2.norm(image, reference, cv2.NORM_L1) / image.size
+
+    @staticmethod
+    def wait_until_changed(region, timeout, reference=None, threshold=2.0, interval=0.02):
+        """
+        Wait until the content of a screen region changes.
+
+        :param region: A tuple (x, y, width, height) to watch.
+        :param timeout: The maximum time to wait in seconds.
+        :param reference: The image the region is compared to. Defaults to the region content when the wait starts.
+            Capture it before sending the input that should change the screen, so a fast change is not missed.
+        :param threshold: The mean difference (see frame_difference) above which the region counts as changed.
+        :param interval: The time between two captures in seconds.
+        :return: True if the region changed, False on timeout.
+        """
+        backend = ImageProcessing.get_capture_backend()
+        if reference is None:
+            reference = backend.grab(region)
+        return Utils.wait_until(
+            lambda: ImageProcessing.frame_difference(backend.grab(region), reference) > threshold,
+            timeout, interval)
+
+    @staticmethod
+    def wait_until_stable(region, timeout, settle=0.1, threshold=2.0, interval=0.02):
+        """
+        Wait until the content of a screen region stops changing, e.g. at the end of a menu animation.
+
+        :param region: A tuple (x, y, width, height) to watch.
+        :param timeout: The maximum time to wait in seconds.
+        :param settle: How long the region must stay unchanged, in seconds.
+        :param threshold: The mean difference (see frame_difference) above which the region counts as changed.
+        :param interval: The time between two captures in seconds.
+        :return: True if the region settled, False on timeout.
+        """
+        backend = ImageProcessing.get_capture_backend()
+        clock = Utils.get_clock()
+        state = {'frame': backend.grab(region), 'since': clock.now()}
+
+        def settled():
+            frame = backend.grab(region)
+            now = clock.now()
+            if ImageProcessing.frame_difference(frame, state['frame']) > threshold:
+                state['frame'], state['since'] = frame, now
+                return False
+            return now - state['since'] >= settle
+
+        return Utils.wait_until(settled, timeout, interval)
+
     @staticmethod
     def display_and_save_image(image, window_name='Image', save_key='s'):
         """
@@ -76,9 +243,10 @@ class ImageProcessing:
 
         cv2.destroyAllWindows()
         Utils.focus_window(cfg.general_window_name.value)
-        time.sleep(1)
+        Utils.get_clock().sleep(1)
 
     @staticmethod
+    @traced('ocr')
     def ocr_extract_text(image, config=None):
         """
         Extract text from an image using Tesseract OCR.
@@ -101,10 +269,12 @@ class ImageProcessing:
         else:
             gray_image = img
 
-        if config:
-            text = pytesseract.image_to_string(gray_image, config=config)
-        else:
-            text = pytesseract.image_to_string(gray_image)
+        # Identical crops (favorites, menu headers) are read over and over, skip Tesseract for those
+        cache = ImageProcessing.get_ocr_cache()
+        text = cache.get(gray_image, config)
+        if text is None:
+            text = Utils.get_cancel_token().wait_for(ImageProcessing.get_ocr_service().submit(gray_image, config))
+            cache.put(gray_image, config, text)
 
         if cfg.general_debug.value:
             ImageProcessing.logger.debug("Extracted Text: {}".format(text))
@@ -112,6 +282,7 @@ class ImageProcessing:
         return text
 
     @staticmethod
+    @traced('analyze_menu')
     def analyze_menu(img):
         gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         _, thresh_img = cv2.threshold(gray_img, 150, 255, cv2.THRESH_BINARY_INV)
@@ -120,11 +291,13 @@ class ImageProcessing:
         return extracted_text
 
     @staticmethod
+    @traced('analyze_health')
     def analyze_health(img):
         if isinstance(img, str):
-            img = cv2.imread(img)
+            path = img
+            img = cv2.imread(path)
             if img is None:
-                raise ValueError(f"Failed to load image at path: {img}")
+                raise ValueError(f"Failed to load image at path: {path}")
         elif isinstance(img, np.ndarray):
             img = img
         else:
@@ -154,20 +327,98 @@ class ImageProcessing:
         return health_percentage
 
     @staticmethod
+    def health_reader():
+        """
+        Return the function reading the health percentage from a crop of the health bar:
+        analyze_health_fast if general_health_fast_path is set, analyze_health otherwise.
+        """
+        return ImageProcessing.analyze_health_fast if cfg.general_health_fast_path.value else ImageProcessing.analyze_health
+
+    @staticmethod
+    @traced('analyze_health')
+    def analyze_health_fast(img, rows=3, max_gap=5):
+        """
+        Estimate the health percentage from a thin horizontal band through the middle of the bar.
+
+        Only a few pixel rows are converted to HSV. The columns containing red are projected
+        onto a single scanline, and the health is the width of the longest red run (allowing
+        gaps of up to max_gap pixels) relative to the width of the region. analyze_health
+        remains available as the slower, morphology based verification path.
+
+        :param img: The health bar region as a BGR NumPy array.
+        :param rows: The number of rows around the vertical center used for the projection.
+        :param max_gap: The largest run of non-red columns still considered part of the bar.
+        :return: The health percentage, 0 if no red was found.
+        """
+        if isinstance(img, str):
+            path = img
+            img = cv2.imread(path)
+            if img is None:
+                raise ValueError(f"Failed to load image at path: {path}")
+        elif not isinstance(img, np.ndarray):
+            raise TypeError("screenshot must be a file path or an OpenCV image (numpy array)")
+
+        height, width = img.shape[:2]
+        top = max(0, height // 2 - rows // 2)
+        hsv = cv2.cvtColor(img[top:top + rows], cv2.COLOR_BGR2HSV)
+        hue, saturation, value = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+        red = ((hue <= 10) | (hue >= 170)) & (saturation >= 70) & (value >= 50)
+
+        return widest_run(red.any(axis=0), max_gap) / width * 100
+
+    @staticmethod
+    def bar_specs():
+        """
+        Return the BarSpec of every HUD bar with a configured region.
+        """
+        return [BarSpec.health(cfg.general_region_healtbar.value),
+                BarSpec.magicka(cfg.general_region_magickabar.value)]
+
+    @staticmethod
+    def get_bar_analyzer():
+        """
+        Return the BarAnalyzer of the configured bars, rebuilding it when a region changed.
+        """
+        specs = ImageProcessing.bar_specs()
+        analyzer = ImageProcessing.bar_analyzer
+        if analyzer is None or analyzer.regions != [spec.region for spec in specs]:
+            ImageProcessing.bar_analyzer = analyzer = BarAnalyzer(specs)
+        return analyzer
+
+    @staticmethod
+    @traced('analyze_bars')
+    def analyze_bars(frame=None):
+        """
+        Read the fill percentage of every configured HUD bar.
+
+        :param frame: A full screenshot or FrameSnapshot containing the bars, captured if None.
+        :return: A dictionary mapping bar names ('health', ...) to percentages.
+        """
+        analyzer = ImageProcessing.get_bar_analyzer()
+        if frame is None:
+            frame = ImageProcessing.snapshot(analyzer.regions)
+        return analyzer.analyze(frame)
+
+    @staticmethod
+    @traced('analyze_favorite_name')
     def analyze_favorite_name(img):
         if isinstance(img, str):
-            img = cv2.imread(img)
+            path = img
+            img = cv2.imread(path)
             if img is None:
-                raise ValueError(f"Failed to load image at path: {img}")
+                raise ValueError(f"Failed to load image at path: {path}")
         elif isinstance(img, np.ndarray):
             img = img
         else:
             raise TypeError("screenshot must be a file path or an OpenCV image (numpy array)")
 
-        gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        _, thresh_img = cv2.threshold(gray_img, 150, 255, cv2.THRESH_BINARY_INV)
-        thresh_img = cv2.resize(thresh_img, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
-        extracted_text = ImageProcessing.ocr_extract_text(thresh_img)
+        thresh_img = ImageProcessing._threshold_favorite_name(img)
+        if cfg.general_favorite_recognizer.value:
+            # Names already read once are recognized from their pixels, OCR only runs for new names
+            recognizer = ImageProcessing.get_favorite_recognizer()
+            extracted_text = recognizer.recognize(thresh_img, ImageProcessing._ocr_favorite_name)
+        else:
+            extracted_text = ImageProcessing._ocr_favorite_name(thresh_img)
         extracted_text = extracted_text.lower()
         translation_table = str.maketrans({
             "\n": "",
@@ -179,32 +430,52 @@ class ImageProcessing:
         return extracted_text
 
     @staticmethod
+    def _threshold_favorite_name(img):
+        gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        _, thresh_img = cv2.threshold(gray_img, 150, 255, cv2.THRESH_BINARY_INV)
+        return thresh_img
+
+    @staticmethod
+    def forget_favorite_name(img):
+        """
+        Make the favorite recognizer forget the name shown in an image, so it is read with OCR next time.
+
+        :param img: The BGR image of the favorite name region, as given to analyze_favorite_name.
+        :return: The text that was forgotten, or None if the name was not known.
+        """
+        return ImageProcessing.get_favorite_recognizer().forget(ImageProcessing._threshold_favorite_name(img))
+
+    @staticmethod
+    def _ocr_favorite_name(thresh_img):
+        thresh_img = cv2.resize(thresh_img, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+        return ImageProcessing.ocr_extract_text(thresh_img)
+
+    @staticmethod
+    @traced('analyze_favorite_equip')
     def analyze_favorite_equip(img):
+        """
+        Detect which hand icon is shown next to the selected favorite.
+
+        :param img: A full screenshot (path or NumPy array), or a FrameSnapshot containing favorite_equip_search_region.
+        :return: 'l', 'r', 'lr', or '' if no icon was found.
+        """
         if isinstance(img, str):
-            img = cv2.imread(img)
+            path = img
+            img = cv2.imread(path)
             if img is None:
-                error_message = f"Failed to load image at path: {img}"
+                error_message = f"Failed to load image at path: {path}"
                 ImageProcessing.logger.error(error_message)
                 raise ValueError(error_message)
-        elif not isinstance(img, np.ndarray):
-            error_message = "screenshot must be a file path or an OpenCV image (numpy array)"
+        elif isinstance(img, np.ndarray):
+            ImageProcessing.logger.debug(f"Image resolution: {img.shape}")
+        elif not isinstance(img, FrameSnapshot):
+            error_message = "screenshot must be a file path, an OpenCV image (numpy array) or a FrameSnapshot"
             ImageProcessing.logger.error(error_message)
             raise TypeError(error_message)
 
-        ImageProcessing.logger.debug(f"Image resolution: {img.shape}")
-
-        right_icon = cv2.imread(ImageProcessing.assets_path / 'fav_right_icon.png', cv2.IMREAD_GRAYSCALE)
-        left_icon = cv2.imread(ImageProcessing.assets_path / 'fav_left_icon.png', cv2.IMREAD_GRAYSCALE)
-        both_icon = cv2.imread(ImageProcessing.assets_path / 'fav_both_icon.png', cv2.IMREAD_GRAYSCALE)
-
-        if right_icon is None or left_icon is None or both_icon is None:
-            error_message = "Failed to load one or more favorite icon images."
-            ImageProcessing.logger.error(error_message)
-            raise ValueError(error_message)
-
-        templates = [('r', right_icon), ('l', left_icon), ('lr', both_icon)]
-        cropped_img1 = ImageProcessing.crop_image(img, cfg.general_region_favequip.value)
-        result1 = ImageProcessing._match_templates(cropped_img1, templates)
+        templates = [(label, template_registry.get(name)) for label, name in ImageProcessing.favorite_equip_templates]
+        cropped_img1 = ImageProcessing.crop_image(img, ImageProcessing.favorite_equip_search_region())
+        result1 = ImageProcessing._match_templates(cropped_img1, templates, ImageProcessing.favorite_equip_early_exit)
         ImageProcessing.logger.debug(f"Confidence level of favorite equip state: {result1['confidence']}")
 
         if cfg.general_debug.value:
@@ -217,23 +488,16 @@ class ImageProcessing:
         return ''
 
     @staticmethod
-    def _match_templates(gray_img, templates):
-        if len(gray_img.shape) == 3:
-            gray_img = cv2.cvtColor(gray_img, cv2.COLOR_BGR2GRAY)
-
-        best_match_label = None
-        best_match_confidence = 0
-
-        for label, template in templates:
-            res = cv2.matchTemplate(gray_img, template, cv2.TM_CCOEFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+    def _match_templates(gray_img, templates, threshold=None):
+        """
+        Match the templates against the image and return the best match.
 
-            if max_val > best_match_confidence:
-                best_match_confidence = max_val
-                best_match_label = label
+        :param gray_img: The image to search in (grayscale or BGR), or a list of images.
+        :param templates: A list of (label, grayscale template) tuples.
+        :param threshold: Stop matching as soon as a template reaches this confidence.
+        :return: A dictionary with the best 'label' and 'confidence', see TemplateMatcher.match.
+        """
+        return TemplateMatcher.match(gray_img, templates, threshold=threshold)
 
-        return {
-            'label': best_match_label,
-            'confidence': best_match_confidence
-        }
 
+ImageProcessing.register_templates()
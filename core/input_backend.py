@@ -0,0 +1,255 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from core.clock import SystemClock
+from core.tracing import traced
+
+InputEvent = namedtuple('InputEvent', ['kind', 'value', 'delay'])
+InputEvent.__doc__ = """
+A keyboard or mouse event of an InputBatch.
+
+kind is 'key_down', 'key_up', 'mouse_down', 'mouse_up', 'move' or 'wait', value the key name, mouse button
+or (x, y) position, and delay the time in seconds between the previous event and this one.
+"""
+
+
+class InputBatch:
+    """
+    Builder for a burst of input events with their timing, sent at once with InputBackend.send.
+
+    Example: InputBatch().press('a', count=3, interval=0.2).wait(0.2).press('enter')
+    """
+
+    def __init__(self):
+        self._events = []
+        self._pending_delay = 0.0
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    @property
+    def events(self):
+        """The list of InputEvent, ending with a 'wait' event if the batch ends with a wait."""
+        if self._pending_delay > 0:
+            return self._events + [InputEvent('wait', None, self._pending_delay)]
+        return list(self._events)
+
+    @property
+    def duration(self):
+        """The time the batch takes to send, in seconds."""
+        return sum(event.delay for event in self.events)
+
+    def _add(self, kind, value):
+        self._events.append(InputEvent(kind, value, self._pending_delay))
+        self._pending_delay = 0.0
+        return self
+
+    def wait(self, seconds):
+        self._pending_delay += seconds
+        return self
+
+    def key_down(self, key):
+        return self._add('key_down', key)
+
+    def key_up(self, key):
+        return self._add('key_up', key)
+
+    def mouse_down(self, button='left'):
+        return self._add('mouse_down', button)
+
+    def mouse_up(self, button='left'):
+        return self._add('mouse_up', button)
+
+    def move(self, x, y):
+        return self._add('move', (x, y))
+
+    def press(self, key, count=1, interval=0.0, hold=0.0):
+        """
+        Press and release a key.
+
+        :param count: The number of presses.
+        :param interval: The time between two presses, in seconds.
+        :param hold: How long the key stays down, in seconds.
+        """
+        for i in range(count):
+            if i:
+                self.wait(interval)
+            self.key_down(key).wait(hold).key_up(key)
+        return self
+
+    def click(self, buttons='left', hold=0.0):
+        """
+        Press and release one or several mouse buttons together.
+
+        :param buttons: A button name or a list of them, e.g. ['left', 'right'] to dual cast.
+        :param hold: How long the buttons stay down, in seconds.
+        """
+        buttons = [buttons] if isinstance(buttons, str) else list(buttons)
+        for button in buttons:
+            self.mouse_down(button)
+        self.wait(hold)
+        for button in buttons:
+            self.mouse_up(button)
+        return self
+
+
+class InputBackend(ABC):
+    """
+    Sends keyboard and mouse input to the game.
+
+    Batches are sent against deadlines measured from the start of the batch, so the timing of a
+    long burst does not drift with the time each event takes to dispatch.
+    """
+
+    def __init__(self, clock=None):
+        """
+        :param clock: The Clock the waits of a batch are measured with. Defaults to the system clock.
+        """
+        self.clock = clock if clock is not None else SystemClock()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def key_down(self, key):
+        """Press a key, given by its name (e.g. 'a', 'enter', 'f5')."""
+
+    @abstractmethod
+    def key_up(self, key):
+        """Release a key."""
+
+    @abstractmethod
+    def mouse_down(self, button='left'):
+        """Press a mouse button ('left', 'right' or 'middle')."""
+
+    @abstractmethod
+    def mouse_up(self, button='left'):
+        """Release a mouse button."""
+
+    @abstractmethod
+    def move(self, x, y):
+        """Move the mouse cursor to absolute screen coordinates."""
+
+    def close(self):
+        """Release the resources held by the backend."""
+
+    @traced('input')
+    def send(self, batch):
+        """
+        Send an InputBatch (or a list of InputEvent) with its timing. Batches from several threads do not interleave.
+        If the clock is interrupted, the rest of the batch only releases the keys and buttons it pressed.
+
+        :return: True if the whole batch was sent, False if some of its input was dropped because the clock was interrupted.
+        """
+        dispatch = {
+            'key_down': self.key_down,
+            'key_up': self.key_up,
+            'mouse_down': self.mouse_down,
+            'mouse_up': self.mouse_up,
+            'move': lambda position: self.move(*position),
+            'wait': lambda value: None,
+        }
+        presses = {'key_down': 'key_up', 'mouse_down': 'mouse_up'}
+        with self._lock:
+            deadline = self.clock.now()
+            interrupted = False
+            dropped = False
+            held = set()
+            for event in batch:
+                deadline += event.delay
+                if not interrupted and not self.clock.sleep_until(deadline):
+                    interrupted = True  # The clock was interrupted: release what is held, without waiting
+                if interrupted and (event.kind, event.value) not in held:
+                    dropped = dropped or event.kind != 'wait'
+                    continue
+                dispatch[event.kind](event.value)
+                if event.kind in presses:
+                    held.add((presses[event.kind], event.value))
+                else:
+                    held.discard((event.kind, event.value))
+        return not dropped
+
+    def press(self, key, count=1, interval=0.0, hold=0.0):
+        """Press and release a key, see InputBatch.press. Returns False if the press was dropped, see send."""
+        return self.send(InputBatch().press(key, count, interval, hold))
+
+    def click(self, buttons='left', hold=0.0):
+        """Click one or several mouse buttons together, see InputBatch.click. Returns False if the click was dropped, see send."""
+        return self.send(InputBatch().click(buttons, hold))
+
+
+class Win32InputBackend(InputBackend):
+    """
+    Sends input directly through the Windows API.
+
+    Keys go through the keyboard module and mouse buttons through user32.mouse_event, which
+    avoids the pause pyautogui adds after every call (pyautogui.PAUSE, 0.1 s by default).
+    """
+    _mouse_flags = {
+        'left': (0x0002, 0x0004),
+        'right': (0x0008, 0x0010),
+        'middle': (0x0020, 0x0040),
+    }
+
+    def __init__(self, clock=None):
+        super().__init__(clock)
+        import ctypes
+        import keyboard
+        self._user32 = ctypes.windll.user32
+        self._keyboard = keyboard
+
+    def key_down(self, key):
+        self._keyboard.press(key)
+
+    def key_up(self, key):
+        self._keyboard.release(key)
+
+    def mouse_down(self, button='left'):
+        self._user32.mouse_event(self._mouse_flags[button][0], 0, 0, 0, 0)
+
+    def mouse_up(self, button='left'):
+        self._user32.mouse_event(self._mouse_flags[button][1], 0, 0, 0, 0)
+
+    def move(self, x, y):
+        self._user32.SetCursorPos(int(x), int(y))
+
+
+class RecordingInputBackend(InputBackend):
+    """
+    Backend recording the events with their time instead of sending them, for tests and benchmarks.
+    """
+
+    def __init__(self, clock=None):
+        super().__init__(clock)
+        self.events = []  # (clock.now() timestamp, kind, value)
+        self.pressed = set()  # Keys and buttons currently down
+
+    def _record(self, kind, value):
+        self.events.append((self.clock.now(), kind, value))
+
+    def key_down(self, key):
+        self.pressed.add(key)
+        self._record('key_down', key)
+
+    def key_up(self, key):
+        self.pressed.discard(key)
+        self._record('key_up', key)
+
+    def mouse_down(self, button='left'):
+        self.pressed.add(f'mouse_{button}')
+        self._record('mouse_down', button)
+
+    def mouse_up(self, button='left'):
+        self.pressed.discard(f'mouse_{button}')
+        self._record('mouse_up', button)
+
+    def move(self, x, y):
+        self._record('move', (x, y))
+
+    def keys_pressed(self):
+        """Return the keys pressed (key_down events) in order."""
+        return [value for _, kind, value in self.events if kind == 'key_down']
+
+    def clear(self):
+        self.events.clear()
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+from config.config import cfg, CustomConfigItemBase
+
+
+def sequence_settings(sequence):
+    """
+    Return the config items of a sequence, by attribute name of cfg.
+
+    :param sequence: The Logic method name of the sequence, which is also the name of its config group.
+    """
+    settings = {}
+    for attr_name in dir(cfg):
+        config_item = getattr(cfg, attr_name)
+        if isinstance(config_item, CustomConfigItemBase) and config_item.group == sequence:
+            settings[attr_name] = config_item
+    return settings
+
+
+class Job:
+    """
+    A training sequence to run from a JobQueue, with the settings it runs with.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, sequence, settings=None, status=PENDING, job_id=None):
+        """
+        :param sequence: The Logic method name of the sequence, e.g. 'train_illusion'.
+        :param settings: A dictionary mapping cfg attribute names of the sequence settings to their serialized values.
+            Settings that are not given keep their current value.
+        :param status: One of PENDING, RUNNING, DONE or FAILED.
+        :param job_id: The unique id of the job, generated if None.
+        """
+        self.sequence = sequence
+        self.settings = dict(settings or {})
+        self.status = status
+        self.id = job_id or uuid.uuid4().hex[:8]
+
+    @property
+    def finished(self):
+        return self.status in (Job.DONE, Job.FAILED)
+
+    def describe(self):
+        name = self.sequence.replace('_', ' ').capitalize()
+        if not self.settings:
+            return name
+        items = sequence_settings(self.sequence)
+        values = ', '.join(f"{items[key].name if key in items else key}: {value}" for key, value in self.settings.items())
+        return f"{name} ({values})"
+
+    @contextmanager
+    def applied_settings(self):
+        """
+        Set the config items of the sequence to the values of the job while the block runs.
+        """
+        items = sequence_settings(self.sequence)
+        previous = {}
+        try:
+            for key, value in self.settings.items():
+                item = items[key]
+                previous[key] = item.value
+                item.deserializeFrom(value)
+            yield self
+        finally:
+            for key, value in previous.items():
+                items[key].value = value
+
+    def to_dict(self):
+        return {'id': self.id, 'sequence': self.sequence, 'settings': self.settings, 'status': self.status}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['sequence'], data.get('settings'), data.get('status', Job.PENDING), data.get('id'))
+
+
+class JobQueue:
+    """
+    Training sequences to run back to back, e.g. an Illusion run, then Armor, then Conjuration.
+
+    The queue is saved after every change, so a session interrupted by a crash resumes with the job it was running.
+    """
+    logger = logging.getLogger('JobQueue')
+
+    def __init__(self, path=None):
+        """
+        :param path: The JSON file used by load and save.
+        """
+        self.path = path
+        self.jobs = []
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def __iter__(self):
+        return iter(self.jobs)
+
+    def pending(self):
+        """Return the jobs that have not run to the end yet, in order."""
+        return [job for job in self.jobs if not job.finished]
+
+    def add(self, sequence, settings=None):
+        """
+        Append a job.
+
+        :param sequence: The Logic method name of the sequence.
+        :param settings: A dictionary mapping cfg attribute names to values for this job. Defaults to
+            the current values of every setting of the sequence.
+        :return: The new Job.
+        """
+        items = sequence_settings(sequence)
+        if settings is None:
+            settings = {key: item.serialize() for key, item in items.items()}
+        unknown = set(settings) - set(items)
+        if unknown:
+            raise ValueError(f"Unknown settings for {sequence}: {', '.join(sorted(unknown))}")
+
+        job = Job(sequence, settings)
+        self.jobs.append(job)
+        self.logger.info(f"Queued {job.describe()}.")
+        self.save()
+        return job
+
+    def remove(self, job_id):
+        self.jobs = [job for job in self.jobs if job.id != job_id]
+        self.save()
+
+    def clear(self):
+        """Remove every job but the one running, which ends the queue after it."""
+        self.jobs = [job for job in self.jobs if job.status == Job.RUNNING]
+        self.save()
+
+    def prune(self):
+        """
+        Remove the jobs that ran to the end, so the saved queue does not grow from session to session.
+
+        :return: The number of jobs removed.
+        """
+        finished = [job for job in self.jobs if job.finished]
+        if finished:
+            self.jobs = [job for job in self.jobs if not job.finished]
+            self.save()
+        return len(finished)
+
+    def next_job(self):
+        """Return the first job that has not run to the end, or None."""
+        pending = self.pending()
+        return pending[0] if pending else None
+
+    def set_status(self, job, status):
+        job.status = status
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'w', encoding='utf-8') as file:
+                json.dump({'jobs': [job.to_dict() for job in self.jobs]}, file)
+        except OSError as e:
+            self.logger.error(f"Failed to save the job queue to {self.path}: {e}")
+
+    def load(self):
+        """
+        Read the queue from the JSON file. A job saved as running was interrupted, and runs again from the start.
+
+        :return: The number of jobs left to run.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self.jobs = [Job.from_dict(data) for data in json.load(file).get('jobs', [])]
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Failed to load the job queue from {self.path}: {e}")
+            self.jobs = []
+        for job in self.jobs:
+            if job.status == Job.RUNNING:
+                self.logger.info(f"{job.describe()} was interrupted, it will run again.")
+                job.status = Job.PENDING
+        self.prune()  # Finished jobs of an earlier session
+        return len(self.pending())
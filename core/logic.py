@@ -1,10 +1,15 @@
-import pyautogui
-import time
-import keyboard
 import logging
 from core.exceptions import *
 from core.image_processing import ImageProcessing
 from core.utils import Utils
+from core.input_backend import InputBatch
+from core.favorites_index import FavoritesIndex
+from core.job_queue import Job, JobQueue
+from core.frame_pipeline import CapturePipeline
+from core.sequence_engine import SequenceContext, SequenceRunner
+from core.tracing import traced
+from core import sequences
+from core.app_data_manager import app_data_manager
 from config.config import cfg, HandSelection
 
 
@@ -16,173 +21,100 @@ def add_attributes(**attrs):
     return decorator
 
 class Logic:
-    def __init__(self):
+    max_favorites = 40  # Upper bound of entries read when scanning the favorites menu
+    health_max_age_frames = 3  # Capture intervals after which a reading of the health pipeline is too old to use
+
+    def __init__(self, clock=None):
+        """
+        :param clock: The Clock every wait of the bot uses, e.g. a ScaledClock for a dry run. Keeps the current clock if None.
+        """
+        if clock is not None:
+            Utils.set_clock(clock)
         # Configure the logging
         self.logger = logging.getLogger(self.__class__.__name__)  # Get a logger for this class
         # ImageProcessing = ImageProcessing()
         self.current_thread = None
-
-    @add_attributes(sequence_name="Train Illusion")
-    @add_attributes(sequence_summary="This bot will automatically select the \'Muffle\' spell from your favorites (make sure to add it beforehand), cast it with the chosen hand, and then sleep for 1 hour to regenerate Magicka. If the 'Bed' parameter is enabled, you'll need to aim at a bed before starting the bot, allowing it to interact with it and sleep.")
-    def train_illusion(self):
+        self.favorites_index = FavoritesIndex(app_data_manager.get_file_path('favorites_index.json'))
+        self.favorites_index.load()
+        self.last_favorite_image = None  # Image of the last favorite name read, see read_favorite
+        self.favorites_menu_open = False  # See toggle_favorites_menu
+        self.job_queue = JobQueue(app_data_manager.get_file_path('job_queue.json'))
+        self.job_queue.load()
+        self.health_pipeline = None
+        self.sequence_runner = SequenceRunner()
+        self.sequence_state = {}  # Kept between the sequences of a run, see SequenceContext
+
+    @property
+    def clock(self):
+        return Utils.get_clock()
+
+    def run_sequence(self, sequence):
         """
-        Trains the Illusion skill by repeatedly casting a spell and sleeping for an hour in-game.
-
-        :param repeat_times: The number of cycles to repeat.
-        :param hand: The hand(s) to use for casting the spell. Options are HandSelection.LEFT, HandSelection.RIGHT, or HandSelection.BOTH.
-        :param bed: Boolean indicating whether to use a bed for sleeping. Default is None.
-        """
-        repeat_times = cfg.illusion_repeat_time.value
-        hand = cfg.illusion_hand.value
-        bed = cfg.illusion_bed.value
-
-        self.logger.info("Starting illusion training")
-
-        if not Utils.focus_window(cfg.general_window_name.value):
-            self.logger.error("Failed to focus window. Stopping illusion training.")
-            return False  # Stop the bot sequence
-        if not self.equip_favorite('muffle',hand):
-            self.logger.error("Failed to equip favorite. Stopping illusion training.")
-            return False  # Stop the bot sequence
-
-        try:
-            for i in range(repeat_times):
-                if not self.current_thread._is_running:
-                    self.logger.info("Stopping illusion training early.")
-                    return False
-
-                self.logger.info(f"Cycle {i+1} of {repeat_times}")
-
-                # Cast the Illusion spell
-                self.perform_action(hand=hand, delay=1)
-                time.sleep(1)
-
-                # Sleep for an hour in-game
-                self.go_sleep_or_wait(bed=bed, check_menu=False)
+        Run a training sequence defined in core/sequences.py.
 
-                # Add a short delay between cycles to avoid potential issues
-                time.sleep(1)
-
-            self.logger.info("Illusion training completed.")
-            return True  # Indicate that the training was successful
-
-        except Exception as e:
-            self.logger.exception("An unexpected error occurred while illusion training.")
-            return False
-
-    @add_attributes(sequence_name="Train Conjuration")
-    @add_attributes(sequence_summary="This bot will automatically select the \'Soul Trap\' spell from your favorites (be sure to add it beforehand), cast it on a targeted corpse, and then sleep for 1 hour to regenerate Magicka. Before activating the bot, ensure you are aiming at the desired corpse."
-)
-    def train_conjuration(self):
+        :return: True if the sequence completed, False if it failed or was stopped.
         """
-        Trains the Conjuration skill by repeatedly casting a spell and sleeping for an hour in-game.
+        return self.sequence_runner.run(sequence, SequenceContext(self, self.sequence_state, self.clock))
 
-        :param repeat_times: The number of cycles to repeat.
-        :param hand: The hand(s) to use for casting the spell. Options are HandSelection.LEFT, HandSelection.RIGHT, or HandSelection.BOTH.
-        :param bed: Boolean indicating whether to use a bed for sleeping. Default is None.
+    def run_jobs(self):
         """
-        repeat_times = cfg.conjuration_repeat_time.value
-        hand = cfg.conjuration_hand.value
-
-        self.logger.info("Starting Conjuration training")
-
-        if not Utils.focus_window(cfg.general_window_name.value):
-            self.logger.error("Failed to focus window. Stopping Conjuration training.")
-            return False  # Stop the bot sequence
-        if not self.equip_favorite('soul trap',hand):
-            self.logger.error("Failed to equip favorite. Stopping Conjuration training.")
-            return False  # Stop the bot sequence
-
-        try:
-            for i in range(repeat_times):
-                if not self.current_thread._is_running:
-                    self.logger.info("Stopping Conjuration training early.")
-                    return False
-
-                self.logger.info(f"Cycle {i+1} of {repeat_times}")
-
-                # Cast the Illusion spell
-                self.perform_action(hand=hand, delay=1)
-                time.sleep(1)
-
-                # Sleep for an hour in-game
-                self.go_sleep_or_wait(check_menu=False)
-
-                # Add a short delay between cycles to avoid potential issues
-                time.sleep(1)
+        Run the jobs of the job queue one after the other, each with its own settings.
 
-            self.logger.info("Conjuration training completed.")
-            return True  # Indicate that the training was successful
+        The jobs share this Logic and its warm state (favorites index, equipped favorite), as well as the
+        capture session, window handle and OCR engine. A failed job does not stop the queue. When the run is
+        stopped, the current job stays in the queue and runs again on the next start. Once the queue is done,
+        the finished jobs are removed from it.
 
-        except Exception as e:
-            self.logger.exception("An unexpected error occurred while Conjuration training.")
-            return False
-
-    @add_attributes(sequence_name="Train Armor")
-    @add_attributes(sequence_summary="This bot will automatically select the specified healing spell from your favorites (be sure to add it beforehand) and cast it to restore your health while you’re under attack. Before activating the bot, make sure you're engaged in combat to take damage, which will help increase your armor skill. Additionally, ensure you're equipped with either light or heavy armor, depending on which skill you want to level up."
-)
-    def train_armor(self):
-        """
-        Trains the Armor skill by repeatedly taking damage and healing when health is low.
-        Stops the training and opens the menu if health is critically low (below 25%).
-        Stops automatically when the training timer reaches the configured duration.
+        :return: True if every job completed.
         """
-        self.logger.info("Starting armor training")
-
-        if not Utils.focus_window(cfg.general_window_name.value):
-            self.logger.error("Failed to focus window. Stopping armor training.")
-            return False  # Stop the bot sequence
-
-        # Use the healing spell directly from the config, which is now of type HealingSpell
-        healing_spell = cfg.armor_healing_skill.value.name.lower().replace('_', ' ')
-        delay = cfg.armor_healing_skill.value.value  # Get the delay directly from the enum
-        self.logger.debug(f"Searching healing spell: {healing_spell} in favorite")
-
-
-        if not self.equip_favorite(healing_spell, cfg.armor_hand.value):
-            self.logger.error(f"Failed to equip healing spell: {healing_spell}. Stopping armor training.")
-            return False  # Stop the bot sequence
-
-        start_time = time.time()
-        training_duration = cfg.armor_train_time.value * 60  # Convert minutes to seconds
-
-        try:
-            while self.current_thread._is_running:
-                elapsed_time = time.time() - start_time
-
-                if elapsed_time >= training_duration:
-                    self.logger.info(f"Training duration of {cfg.armor_train_time.value} minutes reached. Stopping armor training.")
-                    break
-
-                # Check the current health status
-                health_percentage = self.check_health()
-
-                self.logger.info(f"Current health: {health_percentage}%")
-
-                if health_percentage < 75:
-                    self.logger.info("Health is below 50%, starting to heal.")
-
-                    # Keep healing until health is above 90%
-                    while health_percentage < 90 and self.current_thread._is_running:
-                        self.perform_action(hand=cfg.armor_hand.value, delay=delay)  # Use the delay from the enum
-                        # time.sleep(delay)  # Wait for the healing to take effect
-
-                        health_percentage = self.check_health()  # Recheck health after healing
-                        self.logger.info(f"Health after healing: {health_percentage}%")
-                        # Check if health is critically low
-                        if health_percentage < 30:
-                            self.logger.error("Health is critically low (below 25%). Stopping armor training.")
-                            return False  # Stop the bot sequence
+        completed = True
+        while True:
+            job = self.job_queue.next_job()
+            if job is None:
+                break
+            method = getattr(self, job.sequence, None)
+            if not hasattr(method, 'sequence_name'):
+                self.logger.error(f"Unknown sequence in the job queue: {job.sequence}")
+                self.job_queue.set_status(job, Job.FAILED)
+                completed = False
+                continue
+
+            self.logger.info(f"Starting job: {job.describe()} ({len(self.job_queue.pending())} left in the queue)")
+            self.job_queue.set_status(job, Job.RUNNING)
+            with job.applied_settings():
+                result = method()
+
+            if self.current_thread is not None and not self.current_thread._is_running:
+                self.job_queue.set_status(job, Job.PENDING)
+                self.logger.info("Job queue stopped, the current job will run again on the next start.")
+                return False
+            self.job_queue.set_status(job, Job.DONE if result else Job.FAILED)
+            completed = completed and bool(result)
+
+        failed = [job.describe() for job in self.job_queue if job.status == Job.FAILED]
+        if failed:
+            self.logger.warning(f"Job queue finished, failed jobs: {', '.join(failed)}")
+        else:
+            self.logger.info("Job queue finished.")
+        self.job_queue.prune()
+        return completed
 
-                # Add a short delay to simulate time passing and avoid spamming the check
-                time.sleep(0.5)
+    def reset_sequence_state(self):
+        """Forget what earlier sequences learned about the game, e.g. the equipped favorite."""
+        self.sequence_state.clear()
 
-            self.logger.info("Armor training completed.")
-            return True  # Indicate that the training was successful
+    def check_magicka(self, assume_full=False):
+        """
+        Check the current magicka percentage.
 
-        except Exception as e:
-            self.logger.exception("An unexpected error occurred while armor training.")
-            return False
+        :param assume_full: Skyrim hides the magicka bar while it is full, so with this flag a bar that is not
+            found reads as 100%. Only use it when magicka cannot be empty, e.g. after resting.
+        """
+        magicka_percentage = ImageProcessing.analyze_bars()['magicka']
+        if magicka_percentage == 0 and assume_full:
+            magicka_percentage = 100
+        self.logger.debug(f"Current magicka: {magicka_percentage:.1f}%")
+        return magicka_percentage
 
     def perform_action(self, hand: HandSelection = HandSelection.RIGHT, delay: float = 1.0):
         """
@@ -194,27 +126,22 @@ class Logic:
         # self.logger.debug("Perform action with {} hand".format(hand))
 
         try:
+            input_backend = Utils.get_input_backend()
             if hand == HandSelection.BOTH:
                 self.logger.debug("Casting with both hands simultaneously.")
                 # Simulate pressing both mouse buttons for dual casting
-                pyautogui.mouseDown(button='left')
-                pyautogui.mouseDown(button='right')
-                time.sleep(delay)
-                pyautogui.mouseUp(button='left')
-                pyautogui.mouseUp(button='right')
+                input_backend.click(['left', 'right'], hold=delay)
             elif hand == HandSelection.LEFT:
                 self.logger.debug("Casting with left hand.")
-                pyautogui.mouseDown(button='left')
-                time.sleep(delay)
-                pyautogui.mouseUp(button='left')
+                input_backend.click('left', hold=delay)
             elif hand == HandSelection.RIGHT:
                 self.logger.debug("Casting with right hand.")
-                pyautogui.mouseDown(button='right')
-                time.sleep(delay)
-                pyautogui.mouseUp(button='right')
+                input_backend.click('right', hold=delay)
             else:
                 self.logger.error(f"Invalid hand selection: {hand}")
 
+        except OperationCancelledException:
+            raise
         except Exception as e:
             self.logger.exception(f"An error occurred while performing the action: {e}")
             raise
@@ -232,28 +159,21 @@ class Logic:
             # Close any open menu if the check_menu flag is True
             self.close_menu_if_open()
 
-        if bed:
-            # Interact with a bed (default key 'E')
-            keyboard.press_and_release('e')
-        else:
-            # Open the wait menu (default key 'T')
-            keyboard.press_and_release('t')
+        dialog_region = cfg.general_region_dialog.value
 
-        # Wait for the menu to open
-        time.sleep(1)
+        # Interact with a bed (default key 'E') or open the wait menu (default key 'T') and wait for the menu to open
+        self.press_and_wait('e' if bed else 't', dialog_region, timeout=1)
 
         # Set the sleep or wait time
         if sleep_time > 1:
             # Scroll down to increase the time if necessary (default key 'Down Arrow')
             for _ in range(sleep_time - 1):
-                keyboard.press_and_release('d')  # 's' is often mapped to 'Down Arrow'
-                time.sleep(0.2)  # Short delay between key presses
-
-        # Press Enter to confirm sleeping or waiting for the specified time
-        keyboard.press_and_release('enter')
+                self.press_and_wait('d', dialog_region, timeout=0.2, settle=0.05)  # 's' is often mapped to 'Down Arrow'
 
-        # Wait for the time to pass and the game to return to normal
-        time.sleep(2)
+        # Press Enter to confirm sleeping or waiting for the specified time, then wait for the time
+        # to pass and the game to return to normal. The long settle time keeps the fade to black from
+        # being taken for the end of the wait.
+        self.press_and_wait('enter', dialog_region, timeout=2, settle=0.5)
 
     def quicksave_and_quit_game(self):
         """
@@ -263,53 +183,74 @@ class Logic:
 
         self.quicksave()
 
-        # Open the system menu (default key 'Esc')
-        keyboard.press_and_release('esc')
-        time.sleep(2)  # Wait for the menu to open
+        input_backend = Utils.get_input_backend()
+
+        # Open the system menu (default key 'Esc') and wait for it to open
+        input_backend.send(InputBatch().press('esc').wait(2))
 
         # Click on the 'System' icon at coordinates (1357, 166)
         absolute_x, absolute_y = Utils.relative_to_absolute_coords(1357, 106)
-        pyautogui.click(absolute_x, absolute_y)
-        time.sleep(1)  # Short delay to ensure the click is registered
 
-        # Navigate to 'Quit menu'
-        for _ in range(3):
-            keyboard.press_and_release('a')
-            time.sleep(0.2)  # Short delay between key presses
-
-        for _ in range(8):
-            keyboard.press_and_release('s')
-            time.sleep(0.2)  # Short delay between key presses
-
-        # Press Enter
-        keyboard.press_and_release('enter')
-        time.sleep(0.5)  # Wait for the game to quit
-
-        # Navigate to 'Quit Desktop' by pressing 'Down Arrow' 3 times
-        for _ in range(3):
-            keyboard.press_and_release('s')
-            time.sleep(0.2)  # Short delay between key presses
-
-        # Press Enter to select
-        for _ in range(3):
-            keyboard.press_and_release('enter')
-            time.sleep(0.5)  # Short delay between key presses
+        # The rest is sent as one burst, so the delays between key presses are kept precisely
+        quit_sequence = (InputBatch()
+                         .move(absolute_x, absolute_y).click('left').wait(1)   # Short delay to ensure the click is registered
+                         .press('a', count=3, interval=0.2).wait(0.2)          # Navigate to 'Quit menu'
+                         .press('s', count=8, interval=0.2).wait(0.2)
+                         .press('enter').wait(0.5)                             # Wait for the game to quit
+                         .press('s', count=3, interval=0.2).wait(0.2)          # Navigate to 'Quit Desktop'
+                         .press('enter', count=3, interval=0.5).wait(0.5))     # Press Enter to select
+        input_backend.send(quit_sequence)
 
     def quicksave(self):
         # Quicksave the game (default key 'F5')
-        keyboard.press_and_release('f5')
-        time.sleep(2)  # Wait for the quicksave to complete
+        Utils.get_input_backend().send(InputBatch().press('f5').wait(2))  # Wait for the quicksave to complete
 
+    @traced('health_poll')
     def check_health(self):
         """
         Check the current health percentage.
         """
-        screenshot = ImageProcessing.screenshot(cfg.general_region_healtbar.value)
-        health_percentage = ImageProcessing.analyze_health(screenshot)
+        state = None
+        if self.health_pipeline is not None:
+            # A stalled capture thread must not freeze the reading, past a few frames the bar is read directly
+            state = self.health_pipeline.latest_state(max_age=self.health_max_age_frames * self.health_pipeline.interval)
+            if state is None:
+                self.logger.debug("No recent health reading from the capture pipeline, reading the health bar directly.")
+        if state is not None:
+            # Read by the background pipeline, at most a few frames old
+            health_percentage = state.values['health']
+        else:
+            screenshot = ImageProcessing.screenshot(cfg.general_region_healtbar.value)
+            health_percentage = ImageProcessing.health_reader()(screenshot)
+
+            if cfg.general_debug.value and cfg.general_health_fast_path.value:
+                # Cross-check the fast path against the morphology based reader
+                verified_percentage = ImageProcessing.analyze_health(screenshot)
+                self.logger.debug(f"Health fast path: {health_percentage:.1f}%, verification: {verified_percentage:.1f}%")
         health_percentage = 100 if health_percentage == 0 else health_percentage
-        print(health_percentage)
         return health_percentage
 
+    def start_health_pipeline(self):
+        """
+        Start reading the health bar in the background, so check_health does not wait for a capture.
+        Does nothing when the capture rate is set to 0, or in a simulation where the
+        pipeline thread would not follow the simulated time.
+        """
+        fps = cfg.general_capture_fps.value
+        if fps <= 0 or self.health_pipeline is not None or not self.clock.realtime:
+            return
+        self.health_pipeline = CapturePipeline(ImageProcessing.get_capture_backend(),
+                                               cfg.general_region_healtbar.value,
+                                               {'health': ImageProcessing.health_reader()},
+                                               fps=fps)
+        self.health_pipeline.start()
+
+    def stop_health_pipeline(self):
+        if self.health_pipeline is None:
+            return
+        self.health_pipeline.stop()
+        self.health_pipeline = None
+
     def equip_favorite(self, favorite_name, hand: HandSelection = HandSelection.RIGHT):
         favorite_name = favorite_name.lower().replace('_', ' ')
         self.logger.info(f"Attempting to equip '{favorite_name}' in {hand.name} hand.")
@@ -318,57 +259,18 @@ class Logic:
             self.close_menu_if_open()
 
             # Open the favorites menu
-            Utils.press_key_with_delay('q', 1)
-
-            # Initialize variables
-            favorite_found = False
-            previous_text = ""
-            steps_up = 0  # To track how many times we've moved up
-            reached_top = False
-            max_steps = 20  # Max steps to prevent infinite loops
-
-            # Analyze menu while moving up
-            while steps_up < max_steps:
-                # Take a screenshot and analyze the text
-                screenshot = ImageProcessing.screenshot(region=cfg.general_region_favselect.value)
-                current_text = ImageProcessing.analyze_favorite_name(screenshot)
-
-                if not current_text:
-                    raise FavoriteTextNotFoundException('No text was found in the favorites menu.')
-
-                self.logger.debug(f"Detected favorite text: {current_text.strip()}")
-
-                # If the favorite is found, break out of the loop
-                if favorite_name in current_text.lower():
-                    favorite_found = True
-                    break
-
-                # Check if the text is the same as the last iteration (indicates we're at the top)
-                if current_text == previous_text:
-                    if not reached_top:
-                        self.logger.info("Reached the top of the favorites menu. Going back to initial position.")
-                        reached_top = True
-                        for _ in range(steps_up):  # Go back to the initial position
-                            Utils.press_key_with_delay('s', 0.2)
-                    else:
-                        self.logger.info("Reached the bottom of the favorites menu.")
-                        raise FavoriteNotFoundException(favorite_name)
-                else:
-                    # Update previous text and move up
-                    previous_text = current_text
-                    if reached_top:
-                        Utils.press_key_with_delay('s', 0.2)
-                    else:
-                        Utils.press_key_with_delay('w', 0.2)
-                    steps_up += 1
-
-            if not favorite_found:
+            self.toggle_favorites_menu()
+
+            if not self.select_favorite(favorite_name):
                 raise FavoriteNotFoundException(favorite_name)
 
-            time.sleep(1)
             # Proceed with equipping the favorite based on hand selection if the favorite was found
-            hand_state = self.detect_favorite_equipped()
+            equip_region = cfg.general_region_favequip.value
+            ImageProcessing.wait_until_stable(equip_region, timeout=1)
+            snapshot = ImageProcessing.snapshot([ImageProcessing.favorite_equip_search_region()])
+            hand_state = self.detect_favorite_equipped(snapshot)
             self.logger.debug(f"Current hand state: {hand_state.name}")
+            equip_reference = ImageProcessing.crop_image(snapshot, equip_region)
 
             # Equip the favorite based on the hand selection
             if hand == HandSelection.RIGHT:
@@ -376,20 +278,16 @@ class Logic:
                     self.logger.info(f"{favorite_name} is already equipped in RIGHT hand, skipping re-equipping.")
                 else:
                     self.logger.info(f"Equipping {favorite_name} in RIGHT hand.")
-                    pyautogui.mouseDown(button='right')
-                    time.sleep(0.1)
-                    pyautogui.mouseUp(button='right')
-                    time.sleep(1)
+                    Utils.get_input_backend().click('right', hold=0.1)
+                    ImageProcessing.wait_until_changed(equip_region, timeout=1, reference=equip_reference)
 
             elif hand == HandSelection.LEFT:
                 if hand_state in [HandSelection.LEFT, HandSelection.BOTH]:
                     self.logger.info(f"{favorite_name} is already equipped in LEFT hand, skipping re-equipping.")
                 else:
                     self.logger.info(f"Equipping {favorite_name} in LEFT hand.")
-                    pyautogui.mouseDown(button='left')
-                    time.sleep(0.1)
-                    pyautogui.mouseUp(button='left')
-                    time.sleep(1)
+                    Utils.get_input_backend().click('left', hold=0.1)
+                    ImageProcessing.wait_until_changed(equip_region, timeout=1, reference=equip_reference)
 
             elif hand == HandSelection.BOTH:
                 if hand_state == HandSelection.BOTH:
@@ -397,22 +295,14 @@ class Logic:
                 else:
                     if hand_state == HandSelection.LEFT:
                         self.logger.info(f"Right hand is free, equipping {favorite_name} in RIGHT hand.")
-                        pyautogui.mouseDown(button='right')
-                        time.sleep(0.1)
-                        pyautogui.mouseUp(button='right')
+                        Utils.get_input_backend().click('right', hold=0.1)
                     elif hand_state == HandSelection.RIGHT:
                         self.logger.info(f"Left hand is free, equipping {favorite_name} in LEFT hand.")
-                        pyautogui.mouseDown(button='left')
-                        time.sleep(0.1)
-                        pyautogui.mouseUp(button='left')
+                        Utils.get_input_backend().click('left', hold=0.1)
                     elif hand_state == HandSelection.NONE:
                         self.logger.info(f"Equipping {favorite_name} in BOTH hands.")
-                        pyautogui.mouseDown(button='left')
-                        pyautogui.mouseDown(button='right')
-                        time.sleep(0.1)
-                        pyautogui.mouseUp(button='left')
-                        pyautogui.mouseUp(button='right')
-                    time.sleep(1)
+                        Utils.get_input_backend().click(['left', 'right'], hold=0.1)
+                    ImageProcessing.wait_until_changed(equip_region, timeout=1, reference=equip_reference)
 
             return True
 
@@ -422,12 +312,106 @@ class Logic:
         except FavoriteTextNotFoundException as e:
             self.logger.exception(e)
             return False
+        except OperationCancelledException:
+            raise
         except Exception as e:
             self.logger.exception("An unexpected error occurred while trying to equip the favorite.")
             return False
         finally:
-            # Close the favorites menu
-            Utils.press_key_with_delay('q', 1)
+            # Close the favorites menu. Once the run is stopped this raises, and TrainingRunnable closes it instead
+            self.close_favorites_menu_if_open()
+
+    def read_favorite(self):
+        """
+        Read the name of the selected entry in the favorites menu.
+        """
+        screenshot = ImageProcessing.screenshot(region=cfg.general_region_favselect.value)
+        current_text = ImageProcessing.analyze_favorite_name(screenshot)
+        self.last_favorite_image = screenshot  # Forgotten by the recognizer if the text turns out to be wrong
+
+        if not current_text:
+            raise FavoriteTextNotFoundException('No text was found in the favorites menu.')
+
+        self.logger.debug(f"Detected favorite text: {current_text.strip()}")
+        return current_text
+
+    def select_favorite(self, favorite_name):
+        """
+        Move the cursor of the open favorites menu to the favorite.
+        Jumps straight to it when the favorites index knows its position, otherwise scans the menu first.
+
+        :return: True if the favorite is selected, False if it is not in the favorites menu.
+        """
+        current_text = self.read_favorite()
+        if favorite_name in current_text:
+            return True
+        if self.favorites_index.is_valid() and self.jump_to_favorite(favorite_name, current_text):
+            return True
+
+        current_text = self.scan_favorites()
+        return self.jump_to_favorite(favorite_name, current_text)
+
+    def jump_to_favorite(self, favorite_name, current_text):
+        """
+        Press the number of keys the favorites index gives between the selected entry and the favorite,
+        then verify only the final entry. The index is invalidated if the verification fails.
+
+        :return: True if the favorite is selected.
+        """
+        current = self.favorites_index.index_of(current_text)
+        target = self.favorites_index.find(favorite_name)
+        if current is None or target is None:
+            return False
+        start_image = self.last_favorite_image
+
+        key = 'w' if target < current else 's'
+        for _ in range(abs(target - current)):
+            self.press_and_wait(key, cfg.general_region_favselect.value, timeout=0.2, settle=0.05)
+
+        if favorite_name in self.read_favorite():
+            return True
+
+        self.logger.info("Favorites index is out of date, scanning the favorites menu again.")
+        self.favorites_index.invalidate()
+        # Either name may have been misread by OCR and remembered by the recognizer, read them again next time
+        for image in (start_image, self.last_favorite_image):
+            if image is not None:
+                ImageProcessing.forget_favorite_name(image)
+        return False
+
+    def scan_favorites(self):
+        """
+        Read every entry of the favorites menu and store their order in the favorites index.
+        Leaves the cursor on the last entry.
+
+        :return: The text of the last entry.
+        """
+        self.logger.info("Scanning the favorites menu.")
+
+        # Move up until the text stops changing, which means the top is reached
+        previous_text = self.read_favorite()
+        for _ in range(self.max_favorites):
+            self.press_and_wait('w', cfg.general_region_favselect.value, timeout=0.2, settle=0.05)
+            current_text = self.read_favorite()
+            if current_text == previous_text:
+                break
+            previous_text = current_text
+
+        # Walk down to the bottom, recording each entry
+        entries = [previous_text]
+        for _ in range(self.max_favorites):
+            self.press_and_wait('s', cfg.general_region_favselect.value, timeout=0.2, settle=0.05)
+            current_text = self.read_favorite()
+            if current_text == entries[-1]:
+                break
+            entries.append(current_text)
+
+        self.favorites_index.update(entries)
+        try:
+            self.favorites_index.save()
+        except OSError as e:
+            self.logger.error(f"Failed to save the favorites index: {e}")
+        return entries[-1]
 
     def is_menu_open(self):
         """
@@ -447,20 +431,19 @@ class Logic:
             self.logger.info("Menu is not open")
             return False
 
-    def detect_favorite_equipped(self):
+    def detect_favorite_equipped(self, snapshot=None):
         """
         Detect which hand(s) the favorite is equipped in.
+        :param snapshot: A FrameSnapshot containing the favorite equipment region, captured if None.
         :return: Enum value indicating 'l', 'r', 'lr', or 'none'.
         """
-        try:
-            # Capture the screenshot of the favorite equipment region
-            screenshot = ImageProcessing.screenshot()
+        # Capture only the favorite equipment region and its search margin
+        if snapshot is None:
+            snapshot = ImageProcessing.snapshot([ImageProcessing.favorite_equip_search_region()])
 
-            # Analyze the screenshot to extract the relevant text
-            equipped_state = ImageProcessing.analyze_favorite_equip(screenshot)
-            self.logger.debug(f"Detected current favorite hand state text: {equipped_state}")
-        except Exception as e:
-            raise
+        # Analyze the snapshot to extract the relevant text
+        equipped_state = ImageProcessing.analyze_favorite_equip(snapshot)
+        self.logger.debug(f"Detected current favorite hand state text: {equipped_state}")
 
         # Determine the hand state based on the extracted text
         if equipped_state == "l":
@@ -473,12 +456,67 @@ class Logic:
             return HandSelection.NONE
 
     def open_menu(self):
-        keyboard.press_and_release('esc')
-        time.sleep(1)
+        self.press_and_wait('esc', cfg.general_region_menu.value, timeout=1)
 
     def close_menu_if_open(self):
-        keyboard.press_and_release('esc')
-        time.sleep(1)
+        menu_region = cfg.general_region_menu.value
+        self.press_and_wait('esc', menu_region, timeout=1)
         if self.is_menu_open():
-            keyboard.press_and_release('esc')
-            time.sleep(1)
+            self.press_and_wait('esc', menu_region, timeout=1)
+
+    def toggle_favorites_menu(self, timeout=1.0):
+        """
+        Open or close the favorites menu and wait for it to react, see press_and_wait.
+
+        favorites_menu_open follows the key presses that were actually sent. A stopped run raises before
+        pressing the key or drops the press, so the menu may be left open until close_favorites_menu_if_open.
+        """
+        region = cfg.general_region_favselect.value
+        reference = ImageProcessing.screenshot(region)
+        deadline = self.clock.now() + timeout
+        if Utils.get_input_backend().press('q'):
+            self.favorites_menu_open = not self.favorites_menu_open
+        return self._wait_for_reaction('q', region, reference, deadline)
+
+    def close_favorites_menu_if_open(self):
+        if self.favorites_menu_open:
+            self.toggle_favorites_menu()
+
+    def press_and_wait(self, key, region, timeout=1.0, settle=0.1):
+        """
+        Press a key and wait until a screen region reacts to it and settles, instead of sleeping for a fixed time.
+        The timeout bounds the whole call, so a key press without visible effect costs no more than a fixed delay.
+
+        :param key: The key to press.
+        :param region: A tuple (x, y, width, height) expected to change after the key press.
+        :param timeout: The maximum time to wait in seconds.
+        :param settle: How long the region must stay unchanged after the change, in seconds.
+        :return: True if the region changed, False on timeout.
+        """
+        reference = ImageProcessing.screenshot(region)
+        deadline = self.clock.now() + timeout
+        Utils.get_input_backend().press(key)
+        return self._wait_for_reaction(key, region, reference, deadline, settle)
+
+    def _wait_for_reaction(self, key, region, reference, deadline, settle=0.1):
+        """Wait until the region differs from the reference and settles, at most until the deadline."""
+        if not ImageProcessing.wait_until_changed(region, max(deadline - self.clock.now(), 0), reference=reference):
+            self.logger.debug(f"No screen change after pressing '{key}'.")
+            return False
+        ImageProcessing.wait_until_stable(region, max(deadline - self.clock.now(), 0), settle)
+        return True
+
+
+def _sequence_method(sequence):
+    @add_attributes(sequence_name=sequence.name)
+    @add_attributes(sequence_summary=sequence.summary)
+    def method(self):
+        return self.run_sequence(sequence)
+    method.__name__ = sequence.function_name
+    method.__doc__ = sequence.description
+    return method
+
+
+# Expose every sequence as a Logic method, which is how the bot list discovers them
+for _sequence in sequences.SEQUENCES:
+    setattr(Logic, _sequence.function_name, _sequence_method(_sequence))
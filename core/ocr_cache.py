@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+
+class OcrCache:
+    """
+    LRU cache of OCR results keyed by the content of the image and the Tesseract config.
+
+    Two keying modes are available:
+
+    * 'exact': a SHA-1 of the pixels, only identical images hit.
+    * 'perceptual': a 64-bit difference hash, so images differing by a few pixels also hit.
+
+    Entries are evicted when the cache grows over max_size (least recently used first) or
+    when they are older than ttl seconds. The cache can be saved to and loaded from a JSON file.
+    """
+    logger = logging.getLogger('OcrCache')
+    hash_modes = ('exact', 'perceptual')
+
+    def __init__(self, max_size=256, ttl=None, hash_mode='exact', path=None):
+        """
+        :param max_size: The maximum number of entries.
+        :param ttl: The lifetime of an entry in seconds. None keeps entries until they are evicted.
+        :param hash_mode: 'exact' or 'perceptual'.
+        :param path: The JSON file used by load and save.
+        """
+        if hash_mode not in OcrCache.hash_modes:
+            raise ValueError(f"Unknown OCR cache hash mode: {hash_mode}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hash_mode = hash_mode
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (text, timestamp)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, image, config=None):
+        """
+        Build the cache key of an image and Tesseract config.
+        """
+        image = np.ascontiguousarray(image)
+        if self.hash_mode == 'perceptual':
+            gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+            bits = np.packbits(small[:, 1:] > small[:, :-1])
+            digest = f"p{bits.tobytes().hex()}{image.shape[0]}x{image.shape[1]}"
+        else:
+            digest = hashlib.sha1(str(image.shape).encode() + image.tobytes()).hexdigest()
+        return f"{digest}|{config or ''}"
+
+    def get(self, image, config=None):
+        """
+        Return the cached text of an image, or None on a miss.
+        """
+        key = self.key(image, config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, image, config, text):
+        """
+        Store the text extracted from an image.
+        """
+        key = self.key(image, config)
+        with self._lock:
+            self._entries[key] = (text, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return the hit and miss counters and the number of entries.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._entries),
+        }
+
+    def save(self):
+        """
+        Write the entries to the JSON file, oldest first.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            data = {'hash_mode': self.hash_mode, 'entries': [[key, text, timestamp] for key, (text, timestamp) in self._entries.items()]}
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        self.logger.debug(f"Saved {len(data['entries'])} OCR cache entries to {self.path}")
+
+    def load(self):
+        """
+        Read the entries from the JSON file, dropping the expired ones. Returns the number of entries loaded.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to load the OCR cache from {self.path}: {e}")
+            return 0
+
+        if data.get('hash_mode') != self.hash_mode:
+            return 0
+
+        now = time.time()
+        with self._lock:
+            for key, text, timestamp in data.get('entries', []):
+                if self.ttl is None or now - timestamp <= self.ttl:
+                    self._entries[key] = (text, timestamp)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            count = len(self._entries)
+        self.logger.debug(f"Loaded {count} OCR cache entries from {self.path}")
+        return count
@@ -0,0 +1,248 @@
+import hashlib
+import logging
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+import cv2
+import numpy as np
+from core.exceptions import OcrError
+
+
+class OcrEngine(ABC):
+    """
+    Base class for OCR engines. An engine instance is only ever used by one worker thread.
+    """
+
+    @abstractmethod
+    def image_to_string(self, image, config=None):
+        """
+        Extract the text of a grayscale image.
+
+        :param image: The grayscale image as a NumPy array.
+        :param config: Tesseract command line options, e.g. '--psm 7'.
+        :return: The extracted text.
+        """
+
+    def close(self):
+        """Release the resources held by the engine."""
+
+
+def bundled_tessdata_path():
+    """
+    Return the tessdata folder bundled by PyInstaller (see main.spec), or None when running from source.
+    """
+    bundle_dir = getattr(sys, '_MEIPASS', None)
+    if bundle_dir is None:
+        return None
+    path = os.path.join(bundle_dir, 'tessdata')
+    return path if os.path.isdir(path) else None
+
+
+class TesserocrEngine(OcrEngine):
+    """
+    Engine keeping a Tesseract instance loaded in memory through the tesserocr C-API binding.
+    The language data is loaded once instead of on every call.
+    """
+
+    def __init__(self, lang='eng', tessdata_path=None):
+        """
+        :param lang: The Tesseract language.
+        :param tessdata_path: The folder of the language data. Defaults to the bundled one, or the one of tesserocr.
+        """
+        import tesserocr
+        self._tesserocr = tesserocr
+        if tessdata_path is None:
+            tessdata_path = bundled_tessdata_path()
+        if tessdata_path is None:
+            self._api = tesserocr.PyTessBaseAPI(lang=lang)
+        else:
+            self._api = tesserocr.PyTessBaseAPI(path=tessdata_path, lang=lang)
+        self._config = None
+
+    def _apply_config(self, config):
+        if config == self._config:
+            return
+        self._api.SetPageSegMode(self._tesserocr.PSM.AUTO)
+        args = shlex.split(config or '')
+        for option, value in zip(args, args[1:]):
+            if option == '--psm':
+                self._api.SetPageSegMode(int(value))
+            elif option == '-c':
+                key, _, variable = value.partition('=')
+                self._api.SetVariable(key, variable)
+        self._config = config
+
+    def image_to_string(self, image, config=None):
+        from PIL import Image
+        self._apply_config(config)
+        self._api.SetImage(Image.fromarray(image))
+        return self._api.GetUTF8Text()
+
+    def close(self):
+        self._api.End()
+
+
+class TesseractProcessEngine(OcrEngine):
+    """
+    Engine running the tesseract executable. The image is piped through stdin and the text read
+    from stdout, so no temporary files are written. Used when tesserocr is not installed.
+    """
+
+    def __init__(self, tesseract_cmd=None):
+        if tesseract_cmd is None:
+            import pytesseract
+            tesseract_cmd = pytesseract.pytesseract.tesseract_cmd
+        self.tesseract_cmd = tesseract_cmd
+        # Do not flash a console window for every call on Windows
+        self._creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+
+    def image_to_string(self, image, config=None):
+        success, png = cv2.imencode('.png', image)
+        if not success:
+            raise OcrError("Failed to encode the image for Tesseract.")
+
+        command = [self.tesseract_cmd, 'stdin', 'stdout'] + shlex.split(config or '')
+        result = subprocess.run(command, input=png.tobytes(), capture_output=True, creationflags=self._creationflags)
+        if result.returncode != 0:
+            raise OcrError(f"Tesseract failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+        return result.stdout.decode('utf-8')
+
+
+class FakeOcrEngine(OcrEngine):
+    """
+    Deterministic engine for tests. Images are looked up by their content digest.
+    """
+
+    def __init__(self, responses=None, default=''):
+        """
+        :param responses: A dictionary mapping image digests (see FakeOcrEngine.digest) to text.
+        :param default: The text returned for unknown images.
+        """
+        self.responses = dict(responses or {})
+        self.default = default
+        self.calls = []
+
+    @staticmethod
+    def digest(image):
+        image = np.ascontiguousarray(image)
+        return hashlib.sha1(str(image.shape).encode() + image.tobytes()).hexdigest()
+
+    def add_response(self, image, text):
+        self.responses[FakeOcrEngine.digest(image)] = text
+
+    def image_to_string(self, image, config=None):
+        key = FakeOcrEngine.digest(image)
+        self.calls.append((key, config))
+        return self.responses.get(key, self.default)
+
+
+def default_engine_factory():
+    """
+    Create the fastest OCR engine available: tesserocr if it is installed, the tesseract executable otherwise.
+    """
+    try:
+        return TesserocrEngine()
+    except ImportError:
+        return TesseractProcessEngine()
+    except Exception as e:
+        # Installed but unable to start, e.g. RuntimeError when the tessdata folder is not found
+        logging.getLogger('OcrService').warning(f"Failed to start tesserocr, using the tesseract executable instead: {e}")
+        return TesseractProcessEngine()
+
+
+class OcrService:
+    """
+    Runs OCR requests on a fixed number of worker threads, each owning a long-lived engine.
+
+    Requests go through a bounded queue: submit blocks when the queue is full, which keeps
+    producers from piling up images faster than they can be read.
+    """
+    logger = logging.getLogger('OcrService')
+    _STOP = object()
+
+    def __init__(self, engine_factory=default_engine_factory, workers=1, max_queue=16):
+        """
+        :param engine_factory: A callable returning a new OcrEngine. Called once per worker.
+        :param workers: The number of worker threads.
+        :param max_queue: The maximum number of pending requests.
+        """
+        if workers < 1:
+            raise ValueError("OcrService needs at least one worker.")
+        self.engine_factory = engine_factory
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._worker, name=f'OcrWorker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def workers(self):
+        return len(self._workers)
+
+    def _worker(self):
+        # Create the engine up front so it is warm when the first request arrives
+        engine, error = None, None
+        try:
+            engine = self.engine_factory()
+        except Exception as e:
+            error = e
+            self.logger.error(f"Failed to start the OCR engine: {e}")
+
+        while True:
+            item = self._queue.get()
+            if item is OcrService._STOP:
+                break
+            future, image, config = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if error is not None:
+                    raise OcrError(f"The OCR engine is not available: {error}")
+                future.set_result(engine.image_to_string(image, config))
+            except Exception as e:
+                future.set_exception(e)
+
+        if engine is not None:
+            engine.close()
+
+    def submit(self, image, config=None, timeout=None):
+        """
+        Queue an OCR request.
+
+        :param image: The grayscale image as a NumPy array.
+        :param config: Tesseract command line options.
+        :param timeout: How long to wait for room in the queue. None waits forever.
+        :return: A Future resolving to the extracted text.
+        """
+        if self._closed:
+            raise OcrError("The OCR service is closed.")
+        future = Future()
+        try:
+            self._queue.put((future, image, config), timeout=timeout)
+        except queue.Full:
+            raise OcrError("The OCR request queue is full.")
+        return future
+
+    def extract(self, image, config=None, timeout=None):
+        """
+        Extract the text of an image and wait for the result.
+        """
+        return self.submit(image, config, timeout).result(timeout)
+
+    def close(self):
+        """Stop the workers once the pending requests are done."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(OcrService._STOP)
+        for worker in self._workers:
+            worker.join()
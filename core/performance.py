@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+from core.tracing import tracer as shared_tracer
+
+PerformanceMetrics = namedtuple('PerformanceMetrics', [
+    'cycles_per_minute',  # Loop iterations of the sequence
+    'capture_fps',  # Screen captures per second, by the sequence and the capture pipeline
+    'ocr_latency',  # Median OCR time in milliseconds, None without OCR in the window
+    'health_polls',  # check_health calls per second
+    'sleeping',  # Fractions of the window the sequence spent in each activity
+    'acting',
+    'analyzing',
+    'window',  # The length of the window in seconds
+])
+
+# Activity of the time spent in each stage, stages that are not listed only count through the stages they contain
+STAGE_ACTIVITIES = {
+    'sleep': 'sleeping',
+    'wait': 'sleeping',
+    'input': 'acting',
+    'focus_window': 'acting',
+    'capture': 'analyzing',
+    'ocr': 'analyzing',
+    'health_poll': 'analyzing',
+    'analyze_menu': 'analyzing',
+    'analyze_health': 'analyzing',
+    'analyze_bars': 'analyzing',
+    'analyze_favorite_name': 'analyzing',
+    'analyze_favorite_equip': 'analyzing',
+}
+
+
+def activity_times(spans, start, end):
+    """
+    Split the time between start and end by activity, see STAGE_ACTIVITIES.
+
+    The spans are clipped to the interval. The time of a span does not include the spans nested in it,
+    so a wait counts as sleeping except for the captures of its polls.
+
+    :param spans: The spans of a single thread.
+    :return: A dictionary mapping 'sleeping', 'acting' and 'analyzing' to seconds.
+    """
+    times = dict.fromkeys(('sleeping', 'acting', 'analyzing'), 0.0)
+    intervals = []
+    for span in spans:
+        span_start, span_end = max(span.start, start), min(span.start + span.duration, end)
+        if span_end > span_start:
+            intervals.append((span_start, -span_end, span.stage))
+    intervals.sort()  # Parents before their children
+
+    stack = []  # Open intervals as [end, stage, time of the nested intervals, start]
+
+    def close(item):
+        item_end, stage, nested, item_start = item
+        activity = STAGE_ACTIVITIES.get(stage)
+        if activity is not None:
+            times[activity] += max(item_end - item_start - nested, 0.0)
+        if stack:
+            stack[-1][2] += item_end - item_start
+
+    for span_start, negative_end, stage in intervals:
+        while stack and stack[-1][0] <= span_start:
+            close(stack.pop())
+        stack.append([-negative_end, stage, 0.0, span_start])
+    while stack:
+        close(stack.pop())
+    return times
+
+
+def compute_metrics(spans, window, now=None, thread=None):
+    """
+    Compute the throughput of a training sequence from the spans of a Tracer.
+
+    :param spans: The spans recorded by the tracer.
+    :param window: The number of seconds before now taken into account.
+    :param now: The end of the window, as a time.perf_counter value. Defaults to the current time.
+    :param thread: The thread id of the sequence, whose time is split by activity. None uses every span.
+    :return: A PerformanceMetrics.
+    """
+    now = time.perf_counter() if now is None else now
+    start = now - window
+    ended = [span for span in spans if start <= span.start + span.duration <= now]
+
+    def count(stage):
+        return sum(1 for span in ended if span.stage == stage)
+
+    ocr = [span.duration for span in ended if span.stage == 'ocr']
+    sequence_spans = [span for span in spans if thread is None or span.thread == thread]
+    times = activity_times(sequence_spans, start, now)
+    return PerformanceMetrics(
+        cycles_per_minute=count('cycle') * 60 / window,
+        capture_fps=count('capture') / window,
+        ocr_latency=float(np.median(ocr)) * 1000 if ocr else None,
+        health_polls=count('health_poll') / window,
+        sleeping=times['sleeping'] / window,
+        acting=times['acting'] / window,
+        analyzing=times['analyzing'] / window,
+        window=window,
+    )
+
+
+class PerformanceReporter:
+    """
+    Reports the PerformanceMetrics of a running sequence at a fixed interval, from a background thread.
+
+    The metrics are computed from the spans of the tracer, so the sequence itself does no extra work
+    and a listener (e.g. a Qt signal) is called once per interval however many stages run.
+    """
+    logger = logging.getLogger('PerformanceReporter')
+
+    def __init__(self, callback, interval=1.0, window=30.0, thread=None, tracer=None):
+        """
+        :param callback: A callable taking the PerformanceMetrics.
+        :param interval: The time between two reports, in seconds.
+        :param window: The number of seconds of spans summarized by each report. Shorter runs use their duration.
+        :param thread: The thread id of the sequence, see compute_metrics.
+        :param tracer: The Tracer to read, the shared one by default.
+        """
+        self.callback = callback
+        self.interval = interval
+        self.window = window
+        self.sequence_thread = thread
+        self.tracer = tracer if tracer is not None else shared_tracer
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._report_loop, name='PerformanceReporter', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the reports, after a last one covering the end of the run."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.report()
+
+    def report(self):
+        now = time.perf_counter()
+        window = min(self.window, max(now - self._started, self.interval))
+        try:
+            # Only the spans of the window, not the whole buffer
+            self.callback(compute_metrics(self.tracer.recent(now - window), window, now, self.sequence_thread))
+        except Exception as e:
+            self.logger.error(f"Failed to report the performance metrics: {e}")
+
+    def _report_loop(self):
+        while not self._stop.wait(self.interval):
+            self.report()
@@ -0,0 +1,225 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from core.clock import SystemClock
+from core.exceptions import OperationCancelledException
+from core.tracing import tracer
+
+
+class SequenceContext:
+    """
+    State shared by the steps of a running sequence.
+
+    values holds what the steps of one run pass to each other (e.g. the last health reading).
+    state outlives the run and is shared by the sequences run by the same Logic, e.g. to remember
+    which favorite is equipped.
+    """
+
+    def __init__(self, logic, state=None, clock=None):
+        """
+        :param logic: The Logic instance whose actions the steps call.
+        :param state: The dictionary kept between runs.
+        :param clock: The Clock the waits of the sequence use. Defaults to the system clock.
+        """
+        self.logic = logic
+        self.state = {} if state is None else state
+        self.clock = clock if clock is not None else SystemClock()
+        self.values = {}
+
+    def is_running(self):
+        thread = getattr(self.logic, 'current_thread', None)
+        return thread is None or thread._is_running
+
+    def sleep(self, seconds):
+        """
+        Wait for the given number of seconds. The wait ends early when the run is stopped.
+
+        :return: True if the whole time passed.
+        """
+        with tracer.span('sleep'):
+            return self.clock.sleep(seconds)
+
+
+class Node:
+    """Base class of the elements of a sequence."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def run(self, context, runner):
+        """
+        Execute the node.
+
+        :return: False if the sequence must stop, True otherwise.
+        """
+        raise NotImplementedError
+
+
+class Step(Node):
+    """
+    A single action, with an optional guard, skip condition, retries and a wait once it is done.
+    """
+
+    def __init__(self, name, action, guard=None, skip_if=None, retries=0, retry_delay=0.5, wait=None, optional=False):
+        """
+        :param name: The name shown in the logs.
+        :param action: A callable taking the SequenceContext. Returning False means the step failed, any other value succeeds.
+        :param guard: A callable taking the SequenceContext. The step only runs when it returns True.
+        :param skip_if: A callable taking the SequenceContext. The step is skipped as redundant when it returns True.
+        :param retries: How many times a failed action is tried again.
+        :param retry_delay: The time between two tries, in seconds.
+        :param wait: The time to wait after the action, in seconds, or a callable taking the SequenceContext and returning it.
+        :param optional: If True, the sequence goes on when the step fails.
+        """
+        super().__init__(name)
+        self.action = action
+        self.guard = guard
+        self.skip_if = skip_if
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.wait = wait
+        self.optional = optional
+
+    def run(self, context, runner):
+        if self.guard is not None and not self.guard(context):
+            return True
+        if self.skip_if is not None and self.skip_if(context):
+            runner.logger.debug(f"Skipping step '{self.name}', nothing to do.")
+            return True
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                runner.logger.info(f"Retrying step '{self.name}' ({attempt}/{self.retries}).")
+                context.sleep(self.retry_delay)
+            if self.action(context) is not False:
+                break
+        else:
+            if not self.optional:
+                runner.logger.error(f"Step '{self.name}' failed.")
+                return False
+            runner.logger.warning(f"Optional step '{self.name}' failed.")
+
+        if self.wait is not None:
+            context.sleep(self.wait(context) if callable(self.wait) else self.wait)
+        return True
+
+
+class Loop(Node):
+    """
+    Repeats its steps a number of times or until a condition is met.
+    The current iteration is available to the steps as context.values['iteration'].
+    """
+
+    def __init__(self, name, steps, times=None, until=None, wait=None):
+        """
+        :param name: The name shown in the logs.
+        :param steps: The list of nodes repeated.
+        :param times: The number of iterations, or a callable taking the SequenceContext and returning it. None repeats until stopped.
+        :param until: A callable taking the SequenceContext, checked before each iteration. The loop ends when it returns True.
+        :param wait: The time to wait between iterations, in seconds, or a callable taking the SequenceContext and returning it.
+        """
+        super().__init__(name)
+        self.steps = steps
+        self.times = times
+        self.until = until
+        self.wait = wait
+
+    def run(self, context, runner):
+        times = self.times(context) if callable(self.times) else self.times
+        iteration = 0
+        while times is None or iteration < times:
+            if not context.is_running():
+                return False
+            if self.until is not None and self.until(context):
+                break
+
+            context.values['iteration'] = iteration
+            if times is not None:
+                runner.logger.info(f"{self.name.capitalize()} {iteration + 1} of {times}")
+            with tracer.span('cycle'):
+                if not runner.run_nodes(self.steps, context):
+                    return False
+
+            iteration += 1
+            if self.wait is not None:
+                context.sleep(self.wait(context) if callable(self.wait) else self.wait)
+        return True
+
+
+class Parallel(Node):
+    """
+    Runs independent steps at the same time, e.g. screen reads that do not send any input.
+    Succeeds when every step succeeds.
+    """
+
+    def __init__(self, name, steps):
+        super().__init__(name)
+        self.steps = steps
+
+    def run(self, context, runner):
+        with ThreadPoolExecutor(max_workers=len(self.steps), thread_name_prefix='SequenceStep') as executor:
+            futures = [executor.submit(step.run, context, runner) for step in self.steps]
+            return all([future.result() for future in futures])
+
+
+class Sequence:
+    """
+    A training sequence defined as data.
+    """
+
+    def __init__(self, name, summary, steps, description=None, teardown=None):
+        """
+        :param name: The name shown in the bot list, e.g. 'Train Illusion'.
+        :param summary: The text shown under the name in the bot list.
+        :param steps: The list of nodes to run.
+        :param description: The docstring of the generated Logic method.
+        :param teardown: A callable taking the SequenceContext, always called once the steps are done.
+        """
+        self.name = name
+        self.summary = summary
+        self.steps = steps
+        self.description = description
+        self.teardown = teardown
+
+    @property
+    def function_name(self):
+        """The Logic method name of the sequence, which is also the config group of its settings."""
+        return self.name.replace(' ', '_').lower()
+
+
+class SequenceRunner:
+    """
+    Interprets Sequence definitions.
+    """
+    logger = logging.getLogger('SequenceRunner')
+
+    def run(self, sequence, context):
+        """
+        Run a sequence.
+
+        :return: True if every step completed, False if a step failed, raised or the sequence was stopped.
+        """
+        self.logger.info(f"Starting {sequence.name}")
+        try:
+            if not self.run_nodes(sequence.steps, context):
+                self.logger.info(f"Stopping {sequence.name} early.")
+                return False
+            self.logger.info(f"{sequence.name} completed.")
+            return True
+
+        except OperationCancelledException:
+            self.logger.info(f"{sequence.name} stopped.")
+            return False
+        except Exception:
+            self.logger.exception(f"An unexpected error occurred during {sequence.name}.")
+            return False
+        finally:
+            if sequence.teardown is not None:
+                sequence.teardown(context)
+
+    def run_nodes(self, nodes, context):
+        for node in nodes:
+            if not context.is_running():
+                return False
+            if not node.run(context, self):
+                return False
+        return True
@@ -0,0 +1,167 @@
+"""
+The training sequences of the bot, defined as data and run by the SequenceRunner.
+
+Every Sequence in SEQUENCES becomes a Logic method named after it ('Train Illusion' -> train_illusion),
+which is how the bot list finds it, and its settings are the config items of the group with the same name.
+Adding a bot means adding a Sequence here and its config group in config/config.py.
+"""
+from core.sequence_engine import Sequence, Step, Loop
+from core.health_controller import HealthController
+from core.utils import Utils
+from config.config import cfg
+
+
+def focus_game(context):
+    return Utils.focus_window(cfg.general_window_name.value)
+
+
+def equip(favorite_name, hand):
+    """
+    Build the step equipping a favorite. It is skipped when the favorite is known to be equipped in that hand
+    by an earlier step sharing the same state.
+
+    :param favorite_name: The favorite name, or a callable returning it.
+    :param hand: A callable returning the HandSelection.
+    """
+    def target():
+        return (favorite_name() if callable(favorite_name) else favorite_name), hand()
+
+    def action(context):
+        name, selected_hand = target()
+        if not context.logic.equip_favorite(name, selected_hand):
+            context.state.pop('equipped', None)
+            return False
+        context.state['equipped'] = (name, selected_hand)
+
+    return Step('equip favorite', action, skip_if=lambda context: context.state.get('equipped') == target())
+
+
+def read_magicka(context, assume_full=False):
+    context.values['magicka'] = context.logic.check_magicka(assume_full=assume_full)
+
+
+def spell_cycles(hand, spell_cost, bed=lambda: None, times=None):
+    """
+    Build the nodes casting the equipped spell repeatedly and resting only when the magicka left is below the cost of a cast.
+
+    :param hand: A callable returning the HandSelection.
+    :param spell_cost: A callable returning the percentage of the magicka bar used by one cast.
+    :param bed: A callable returning whether to sleep in a bed.
+    :param times: A callable returning the number of casts.
+    """
+    def rest(context):
+        # One in-game hour refills the whole magicka bar, so it is the shortest useful rest
+        context.logic.logger.info(f"Magicka at {context.values['magicka']:.0f}%, below the spell cost of {spell_cost()}%. Resting for an hour.")
+        context.logic.go_sleep_or_wait(bed=bed(), check_menu=False)
+        context.sleep(1)  # Add a short delay after resting to avoid potential issues
+        read_magicka(context, assume_full=True)
+
+    def cast(context):
+        context.logic.perform_action(hand=hand(), delay=1)
+        context.sleep(1)
+        read_magicka(context)
+
+    return [
+        Step('read magicka', lambda context: read_magicka(context, assume_full=True)),
+        Loop('cast', times=lambda context: times(), steps=[
+            Step('rest', rest, guard=lambda context: context.values['magicka'] < spell_cost()),
+            Step('cast spell', cast),
+        ]),
+    ]
+
+
+def healing_spell():
+    return cfg.armor_healing_skill.value.name.lower().replace('_', ' ')
+
+
+def start_armor_training(context):
+    context.values['start_time'] = context.clock.now()
+    context.values['controller'] = HealthController(heal_threshold=75, critical_threshold=30)
+    context.logic.start_health_pipeline()
+
+
+def armor_duration_reached(context):
+    if context.clock.now() - context.values['start_time'] < cfg.armor_train_time.value * 60:
+        return False
+    context.logic.logger.info(f"Training duration of {cfg.armor_train_time.value} minutes reached. Stopping armor training.")
+    return True
+
+
+def read_health(context):
+    controller = context.values['controller']
+    health_percentage = context.logic.check_health()
+    controller.add_sample(health_percentage, context.clock.now())
+    context.logic.logger.debug(f"Current health: {health_percentage}% ({controller.rate():+.1f}%/s)")
+
+
+def should_heal(context):
+    # Start early enough for the heal to land before health falls under the threshold
+    return context.values['controller'].should_heal(lead_time=cfg.armor_healing_skill.value.value)
+
+
+def heal(context):
+    logic, controller = context.logic, context.values['controller']
+    delay = cfg.armor_healing_skill.value.value  # Get the delay directly from the enum
+    logic.logger.info(f"Health is at {controller.health}% ({controller.rate():+.1f}%/s), starting to heal.")
+
+    # Keep healing until health is above 90%
+    while context.is_running():
+        logic.perform_action(hand=cfg.armor_hand.value, delay=delay)
+
+        health_percentage = logic.check_health()  # Recheck health after healing
+        controller.add_sample(health_percentage, context.clock.now())
+        logic.logger.info(f"Health after healing: {health_percentage}%")
+        # Check if health is critically low
+        if controller.is_critical():
+            logic.logger.error("Health is critically low (below 30%). Stopping armor training.")
+            return False
+        if health_percentage >= 90:
+            break
+
+    # Healing makes health jump, start the damage rate estimate over
+    controller.reset()
+
+
+TRAIN_ILLUSION = Sequence(
+    name="Train Illusion",
+    summary="This bot will automatically select the \'Muffle\' spell from your favorites (make sure to add it beforehand), cast it with the chosen hand until your Magicka runs low, and then sleep for 1 hour to regenerate it. If the 'Bed' parameter is enabled, you'll need to aim at a bed before starting the bot, allowing it to interact with it and sleep.",
+    description="Trains the Illusion skill by repeatedly casting a spell, sleeping for an hour in-game whenever magicka runs out.",
+    steps=[
+        Step('focus window', focus_game),
+        equip('muffle', hand=lambda: cfg.illusion_hand.value),
+        *spell_cycles(hand=lambda: cfg.illusion_hand.value,
+                      spell_cost=lambda: cfg.illusion_spell_cost.value,
+                      bed=lambda: cfg.illusion_bed.value,
+                      times=lambda: cfg.illusion_repeat_time.value),
+    ])
+
+TRAIN_CONJURATION = Sequence(
+    name="Train Conjuration",
+    summary="This bot will automatically select the \'Soul Trap\' spell from your favorites (be sure to add it beforehand), cast it on a targeted corpse until your Magicka runs low, and then sleep for 1 hour to regenerate it. Before activating the bot, ensure you are aiming at the desired corpse.",
+    description="Trains the Conjuration skill by repeatedly casting a spell, waiting for an hour in-game whenever magicka runs out.",
+    steps=[
+        Step('focus window', focus_game),
+        equip('soul trap', hand=lambda: cfg.conjuration_hand.value),
+        *spell_cycles(hand=lambda: cfg.conjuration_hand.value,
+                      spell_cost=lambda: cfg.conjuration_spell_cost.value,
+                      times=lambda: cfg.conjuration_repeat_time.value),
+    ])
+
+TRAIN_ARMOR = Sequence(
+    name="Train Armor",
+    summary="This bot will automatically select the specified healing spell from your favorites (be sure to add it beforehand) and cast it to restore your health while you’re under attack. Before activating the bot, make sure you're engaged in combat to take damage, which will help increase your armor skill. Additionally, ensure you're equipped with either light or heavy armor, depending on which skill you want to level up.",
+    description="Trains the Armor skill by repeatedly taking damage and healing when health is low. Health is polled faster while it is falling, "
+                "and healing starts early when health is predicted to drop below 75% before a cast completes. Stops if health is critically "
+                "low (below 30%) or when the training timer reaches the configured duration.",
+    steps=[
+        Step('focus window', focus_game),
+        equip(healing_spell, hand=lambda: cfg.armor_hand.value),
+        Step('start armor training', start_armor_training),
+        Loop('armor training', until=armor_duration_reached, steps=[
+            Step('read health', read_health),
+            Step('heal', heal, guard=should_heal),
+        ], wait=lambda context: context.values['controller'].next_interval()),  # Poll faster while health is falling
+    ],
+    teardown=lambda context: context.logic.stop_health_pipeline())
+
+SEQUENCES = [TRAIN_ILLUSION, TRAIN_CONJURATION, TRAIN_ARMOR]
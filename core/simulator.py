@@ -0,0 +1,188 @@
+"""
+Headless simulation of the game, to run Logic methods and whole training sequences without Skyrim.
+
+The Simulator stands in for the screen, the input devices, the game window and the clock: grabs return
+the simulated screen, input events are recorded and can change the screen, and every wait advances a
+VirtualClock instead of sleeping. A training sequence that takes minutes in the game runs in a fraction
+of a second, and always makes the same decisions for the same scenario.
+
+Example:
+    simulator = Simulator(blank_screen())
+    simulator.on('mouse_down', 'right', lambda sim: sim.schedule(0.5, heal))
+    with simulator:
+        Logic().train_armor()
+    simulator.input_backend.events  # What the bot did, with the simulated time of each event
+"""
+import logging
+from collections import defaultdict
+import numpy as np
+from core.capture import CaptureBackend
+from core.clock import VirtualClock
+from core.input_backend import RecordingInputBackend
+from core.window_manager import FakeWindowManager, WindowHandleCache
+from core.image_processing import ImageProcessing
+from core.utils import Utils
+from config.config import cfg
+
+
+def blank_screen(width=1920, height=1080, color=(40, 40, 40)):
+    """Return a BGR frame of a single color, to draw a synthetic screen on."""
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = color
+    return frame
+
+
+def draw_bar(frame, region, percentage, color=(20, 20, 180), background=(40, 40, 40)):
+    """
+    Draw a HUD bar filled to a percentage. Like the bars of the game, it shrinks towards its center.
+
+    :param frame: The BGR frame to draw on, modified in place.
+    :param region: A tuple (x, y, width, height) of the bar, in screen coordinates.
+    :param percentage: The fill percentage, 0-100.
+    :param color: The BGR color of the filled part. The default is the red of the health bar.
+    :param background: The BGR color of the empty part.
+    :return: The frame.
+    """
+    x, y, w, h = region
+    filled = int(round(w * min(max(percentage, 0), 100) / 100))
+    left = x + (w - filled) // 2
+    frame[y:y+h, x:x+w] = background
+    frame[y:y+h, left:left+filled] = color
+    return frame
+
+
+class SimulatedCaptureBackend(CaptureBackend):
+    """
+    Capture backend returning the screen of a Simulator.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.grab_count = 0
+
+    def grab(self, region=None, out=None):
+        frame = self.simulator.render()
+        if region is not None:
+            x, y, w, h = region
+            frame = frame[y:y+h, x:x+w]
+
+        self.grab_count += 1
+        self.simulator.clock.sleep(self.simulator.grab_time)
+        if out is not None:
+            out[...] = frame
+            return out
+        return frame.copy()
+
+
+class SimulatedInputBackend(RecordingInputBackend):
+    """
+    Input backend recording the events at the simulated time and passing them to the Simulator.
+    """
+
+    def __init__(self, simulator):
+        super().__init__(simulator.clock)
+        self.simulator = simulator
+
+    def _record(self, kind, value):
+        super()._record(kind, value)
+        self.simulator.handle_input(kind, value)
+
+
+class Simulator:
+    """
+    A scripted stand-in for the game.
+
+    The screen is either a frame or a callable taking the Simulator and returning one, e.g. to draw the
+    health bar from a simulated health value. Scenarios react to the bot with handlers registered by on(),
+    and change the game over time with schedule().
+    """
+    logger = logging.getLogger('Simulator')
+
+    def __init__(self, screen, clock=None, grab_time=0.005, window_title=None):
+        """
+        :param screen: The BGR frame shown, or a callable taking the Simulator and returning it.
+        :param clock: The Clock of the simulation, a new VirtualClock starting at 0 by default.
+            A ScaledClock runs the simulation in (accelerated) real time, e.g. to stop it from another thread.
+        :param grab_time: The simulated time a screen capture takes, in seconds.
+        :param window_title: The title of the simulated game window. Defaults to the configured window name.
+        """
+        self.screen = screen
+        self.clock = clock if clock is not None else VirtualClock()
+        self.grab_time = grab_time
+        self.capture_backend = SimulatedCaptureBackend(self)
+        self.input_backend = SimulatedInputBackend(self)
+        self.window_manager = FakeWindowManager()
+        self.window_manager.add_window(window_title if window_title is not None else cfg.general_window_name.value)
+        self._handlers = defaultdict(list)
+        self._installed = None
+
+    @property
+    def events(self):
+        """The input events sent by the bot, as (simulated time, kind, value)."""
+        return self.input_backend.events
+
+    def on(self, kind, value, handler):
+        """
+        Call a handler when the bot sends an input event.
+
+        :param kind: The event kind, e.g. 'key_down' or 'mouse_down'.
+        :param value: The key or button name, or None for every event of the kind.
+        :param handler: A callable taking the Simulator.
+        """
+        self._handlers[(kind, value)].append(handler)
+        return self
+
+    def schedule(self, delay, callback):
+        """
+        Call a callback once the simulated time has advanced by the delay, even in the middle of a wait.
+        Needs the default VirtualClock.
+
+        :param callback: A callable taking the Simulator.
+        """
+        self.clock.call_at(self.clock.now() + delay, lambda: callback(self))
+        return self
+
+    def show(self, screen, delay=0.0):
+        """Replace the screen, immediately or after a delay (e.g. the time a menu takes to open)."""
+        def change(simulator):
+            simulator.screen = screen
+        if delay > 0:
+            return self.schedule(delay, change)
+        change(self)
+        return self
+
+    def handle_input(self, kind, value):
+        for handler in self._handlers.get((kind, value), []) + self._handlers.get((kind, None), []):
+            handler(self)
+
+    def render(self):
+        """Return the current screen."""
+        return self.screen(self) if callable(self.screen) else self.screen
+
+    def install(self):
+        """
+        Route the screen captures, the input, the window lookups and the waits of the bot to the simulation.
+        """
+        if self._installed is not None:
+            return
+        self._installed = (ImageProcessing.capture_backend, Utils.input_backend, Utils.window_cache, Utils.clock)
+        ImageProcessing.capture_backend = self.capture_backend
+        Utils.input_backend = self.input_backend
+        Utils.window_cache = WindowHandleCache(self.window_manager)
+        Utils.clock = self.clock
+        self.logger.debug("Simulator installed.")
+
+    def uninstall(self):
+        """Restore the backends replaced by install."""
+        if self._installed is None:
+            return
+        ImageProcessing.capture_backend, Utils.input_backend, Utils.window_cache, Utils.clock = self._installed
+        self._installed = None
+        self.logger.debug(f"Simulator uninstalled after {self.clock.now():.2f} simulated seconds.")
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.uninstall()
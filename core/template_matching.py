@@ -0,0 +1,121 @@
+import logging
+import cv2
+import numpy as np
+
+
+class TemplateMatcher:
+    """
+    Matches several templates against one or more search images in a single call.
+
+    Search images are converted to grayscale once, templates that cannot fit in a search
+    image are skipped, and matching stops as soon as a template reaches the threshold.
+    Two methods are available:
+
+    * 'opencv': one cv2.matchTemplate call per template (fastest for a handful of templates).
+    * 'numpy': a stacked normalized cross-correlation computed with NumPy FFTs, matching every
+      template of the same shape in one batch. Results are equivalent to cv2.TM_CCOEFF_NORMED.
+    """
+    logger = logging.getLogger('TemplateMatcher')
+    methods = ('opencv', 'numpy')
+
+    @staticmethod
+    def to_gray(img):
+        if len(img.shape) == 3:
+            return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return img
+
+    @staticmethod
+    def match(images, templates, threshold=None, method='opencv'):
+        """
+        Find the best matching template across the search images.
+
+        :param images: A search image or a list of search images (BGR or grayscale NumPy arrays).
+        :param templates: A list of (label, grayscale template) tuples.
+        :param threshold: Stop as soon as a template reaches this confidence. None matches every template.
+        :param method: 'opencv' or 'numpy'.
+        :return: A dictionary with the best 'label', its 'confidence', 'location' (x, y) and 'image_index',
+                 and 'scores' holding the same information for every template that was evaluated.
+        """
+        if method not in TemplateMatcher.methods:
+            raise ValueError(f"Unknown template matching method: {method}")
+        if isinstance(images, np.ndarray):
+            images = [images]
+
+        result = {'label': None, 'confidence': 0, 'location': None, 'image_index': None, 'scores': {}}
+
+        for image_index, image in enumerate(images):
+            gray_img = TemplateMatcher.to_gray(image)
+            usable = [(label, template) for label, template in templates
+                      if template.shape[0] <= gray_img.shape[0] and template.shape[1] <= gray_img.shape[1]]
+
+            if method == 'numpy':
+                groups = {}
+                for label, template in usable:
+                    groups.setdefault(template.shape, []).append((label, template))
+                batches = list(groups.values())
+            else:
+                batches = [[item] for item in usable]
+
+            for batch in batches:
+                if method == 'numpy':
+                    scores = TemplateMatcher.ncc_numpy(gray_img, np.stack([template for _, template in batch]))
+                else:
+                    scores = [cv2.matchTemplate(gray_img, batch[0][1], cv2.TM_CCOEFF_NORMED)]
+
+                for (label, _), score_map in zip(batch, scores):
+                    _, max_val, _, max_loc = cv2.minMaxLoc(np.asarray(score_map, dtype=np.float32))
+                    TemplateMatcher._record(result, label, float(max_val), tuple(max_loc), image_index)
+
+                if threshold is not None and result['confidence'] >= threshold:
+                    return result
+
+        return result
+
+    @staticmethod
+    def _record(result, label, confidence, location, image_index):
+        previous = result['scores'].get(label)
+        if previous is None or confidence > previous['confidence']:
+            result['scores'][label] = {'confidence': confidence, 'location': location, 'image_index': image_index}
+        if confidence > result['confidence']:
+            result.update(label=label, confidence=confidence, location=location, image_index=image_index)
+
+    @staticmethod
+    def ncc_numpy(gray_img, templates):
+        """
+        Normalized cross-correlation (equivalent to cv2.TM_CCOEFF_NORMED) of a stack of templates.
+
+        :param gray_img: The grayscale search image, shape (H, W).
+        :param templates: The grayscale templates stacked in an array of shape (N, h, w).
+        :return: The score maps in an array of shape (N, H - h + 1, W - w + 1).
+        """
+        image = gray_img.astype(np.float64)
+        templates = templates.astype(np.float64)
+        height, width = image.shape
+        h, w = templates.shape[1:]
+        out_h, out_w = height - h + 1, width - w + 1
+
+        # Zero-mean templates make the correlation independent of the local image mean
+        centered = templates - templates.mean(axis=(1, 2), keepdims=True)
+        template_norms = np.sqrt((centered ** 2).sum(axis=(1, 2)))
+
+        # Correlation of every template with the image in a single batched FFT.
+        # An FFT of the image size is enough since the valid area never wraps around.
+        image_fft = np.fft.rfft2(image)
+        templates_fft = np.fft.rfft2(centered, s=(height, width), axes=(1, 2))
+        correlation = np.fft.irfft2(image_fft * np.conj(templates_fft), s=(height, width), axes=(1, 2))
+        correlation = correlation[:, :out_h, :out_w]
+
+        # Sum and squared sum of every image window using integral images
+        integral = np.pad(image, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+        integral_sq = np.pad(image ** 2, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+        window_sum = integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+        window_sq = integral_sq[h:, w:] - integral_sq[:-h, w:] - integral_sq[h:, :-w] + integral_sq[:-h, :-w]
+        window_var = window_sq - window_sum ** 2 / (h * w)
+        # Flat windows have no variance (up to rounding noise) and score 0, as do flat templates
+        flat = window_var <= 1e-7 * np.maximum(window_sq, 1.0)
+        window_norm = np.sqrt(np.where(flat, 0.0, window_var))
+
+        denominator = window_norm[None, :, :] * template_norms[:, None, None]
+        scores = np.zeros_like(correlation)
+        np.divide(correlation, denominator, out=scores, where=denominator > 0)
+        return np.clip(scores, -1.0, 1.0)
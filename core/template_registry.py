@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+import cv2
+
+
+class TemplateRegistry:
+    """
+    In-memory store of the grayscale template images used for matching.
+
+    Templates are registered once with a name and a file path. They are read from disk the first
+    time they are needed (or immediately when preloaded) and then served from memory, keyed by
+    name and scale. refresh() reloads the templates whose file changed on disk.
+    """
+    logger = logging.getLogger('TemplateRegistry')
+
+    def __init__(self):
+        self._paths = {}
+        self._mtimes = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, path, preload=True):
+        """
+        Register a template image.
+
+        :param name: The name used to look the template up.
+        :param path: The path to the image file.
+        :param preload: If True, load the image right away instead of on first use.
+        """
+        with self._lock:
+            self._paths[name] = str(path)
+            self._invalidate(name)
+        if preload:
+            self.get(name)
+
+    def names(self):
+        return list(self._paths)
+
+    def get(self, name, scale=1.0):
+        """
+        Return the grayscale template, resized by the scale factor if needed.
+
+        :param name: The name the template was registered with.
+        :param scale: The scale factor to apply to the template (e.g. the DPI scale of the game window).
+        :return: The template as a grayscale NumPy array.
+        """
+        key = (name, float(scale))
+        template = self._cache.get(key)
+        if template is not None:
+            return template
+
+        with self._lock:
+            template = self._cache.get(key)
+            if template is None:
+                template = self._load(name, float(scale))
+                self._cache[key] = template
+        return template
+
+    def _load(self, name, scale):
+        if name not in self._paths:
+            raise KeyError(f"Template '{name}' is not registered.")
+
+        base = self._cache.get((name, 1.0))
+        if base is None:
+            path = self._paths[name]
+            base = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if base is None:
+                error_message = f"Failed to load template image at path: {path}"
+                self.logger.error(error_message)
+                raise ValueError(error_message)
+            self._mtimes[name] = os.stat(path).st_mtime_ns
+            self._cache[(name, 1.0)] = base
+            self.logger.debug(f"Loaded template '{name}' with shape {base.shape}")
+
+        if scale == 1.0:
+            return base
+
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        return cv2.resize(base, None, fx=scale, fy=scale, interpolation=interpolation)
+
+    def _invalidate(self, name):
+        for key in [key for key in self._cache if key[0] == name]:
+            del self._cache[key]
+        self._mtimes.pop(name, None)
+
+    def invalidate(self, name=None):
+        """
+        Drop the cached images of one template, or of all templates when no name is given.
+        """
+        with self._lock:
+            for template_name in ([name] if name else list(self._paths)):
+                self._invalidate(template_name)
+
+    def refresh(self):
+        """
+        Invalidate the templates whose file changed on disk since they were loaded.
+
+        :return: The names of the templates that were invalidated.
+        """
+        changed = []
+        with self._lock:
+            for name, path in self._paths.items():
+                loaded_mtime = self._mtimes.get(name)
+                if loaded_mtime is None:
+                    continue
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    mtime = None
+                if mtime != loaded_mtime:
+                    self._invalidate(name)
+                    changed.append(name)
+
+        for name in changed:
+            self.logger.info(f"Template '{name}' changed on disk, it will be reloaded.")
+        return changed
+
+
+# Create the global template registry for the app
+template_registry = TemplateRegistry()
@@ -0,0 +1,198 @@
+"""
+Lightweight timing of the stages of the bot: captures, OCR, analyzers, window focus, input and waits.
+
+Stages are timed with the traced decorator or the span context manager of the shared tracer:
+
+    @traced('ocr')
+    def ocr_extract_text(image, config=None): ...
+
+    with tracer.span('sleep'):
+        clock.sleep(5)
+
+While the tracer is disabled a traced call costs a single attribute check. Once enabled, every call
+appends a Span to a bounded ring buffer, which keeps the latest spans without a lock: appending to a
+deque is atomic, so the worker threads never wait on each other or on the reader.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple
+import numpy as np
+
+Span = namedtuple('Span', ['stage', 'start', 'duration', 'thread'])  # Times in seconds of time.perf_counter
+
+
+class _SpanContext:
+    __slots__ = ('tracer', 'stage', 'start')
+
+    def __init__(self, tracer, stage):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.tracer.record(self.stage, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Records the duration of the stages of the bot and summarizes them as percentiles.
+    """
+    percentiles = (50, 95, 99)
+
+    def __init__(self, capacity=65536, enabled=False):
+        """
+        :param capacity: The number of spans kept, the oldest ones are dropped first.
+        :param enabled: Whether spans are recorded.
+        """
+        self.enabled = enabled
+        self.spans = deque(maxlen=capacity)
+        self.origin = time.perf_counter()  # Time 0 of the exported traces
+
+    @property
+    def capacity(self):
+        return self.spans.maxlen
+
+    def record(self, stage, start, duration):
+        """Add a span measured elsewhere, e.g. from time.perf_counter values."""
+        self.spans.append(Span(stage, start, duration, threading.get_ident()))
+
+    def span(self, stage):
+        """
+        Return a context manager timing its block as a stage. Does nothing while the tracer is disabled.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _SpanContext(self, stage)
+
+    def traced(self, stage):
+        """
+        Decorator timing every call of a function as a stage.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(stage, start, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def clear(self):
+        self.spans.clear()
+        self.origin = time.perf_counter()
+
+    def snapshot(self, since=None):
+        """
+        Return a copy of the recorded spans, oldest first.
+
+        :param since: If given, only the spans that started at or after this time.perf_counter value.
+        """
+        spans = self.spans.copy()  # Copied in one step, appends from other threads cannot interleave
+        if since is not None:
+            spans = [span for span in spans if span.start >= since]
+        return list(spans)
+
+    def recent(self, ended_after):
+        """
+        Return the spans that ended at or after a time.perf_counter value, oldest first.
+
+        Spans are recorded when they end, so only the end of the buffer is walked.
+        """
+        recent = []
+        for span in reversed(self.spans.copy()):
+            if span.start + span.duration < ended_after:
+                break
+            recent.append(span)
+        recent.reverse()
+        return recent
+
+    def stats(self, spans=None):
+        """
+        Summarize the spans per stage.
+
+        :param spans: The spans to summarize, every recorded span by default.
+        :return: A dictionary mapping stage names to dictionaries with the count, the total time,
+            the mean, the max and the p50/p95/p99 durations, in milliseconds.
+        """
+        if spans is None:
+            spans = self.snapshot()
+        durations = {}
+        for span in spans:
+            durations.setdefault(span.stage, []).append(span.duration)
+
+        stats = {}
+        for stage, values in sorted(durations.items()):
+            values = np.array(values) * 1000
+            stage_stats = {'count': len(values), 'total': float(values.sum()), 'mean': float(values.mean()), 'max': float(values.max())}
+            for percentile, value in zip(self.percentiles, np.percentile(values, self.percentiles)):
+                stage_stats[f'p{percentile}'] = float(value)
+            stats[stage] = stage_stats
+        return stats
+
+    def summary(self):
+        """Return the stats as lines of text, one per stage."""
+        return [f"{stage}: {s['count']} calls, p50 {s['p50']:.1f} ms, p95 {s['p95']:.1f} ms, p99 {s['p99']:.1f} ms, max {s['max']:.1f} ms"
+                for stage, s in self.stats().items()]
+
+    def export_json(self, path):
+        """
+        Write the stats and the spans to a JSON file.
+
+        :return: The path of the file.
+        """
+        spans = self.snapshot()
+        data = {
+            'stats': self.stats(spans),
+            'spans': [{'stage': span.stage, 'start': span.start - self.origin, 'duration': span.duration, 'thread': span.thread}
+                      for span in spans],
+        }
+        return self._write(path, data)
+
+    def export_chrome_trace(self, path):
+        """
+        Write the spans to a file in the Chrome trace event format, to open in chrome://tracing or Perfetto.
+
+        :return: The path of the file.
+        """
+        pid = os.getpid()
+        events = [{'name': span.stage, 'ph': 'X', 'ts': (span.start - self.origin) * 1e6, 'dur': span.duration * 1e6,
+                   'pid': pid, 'tid': span.thread}
+                  for span in self.snapshot()]
+        return self._write(path, {'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+    def _write(self, path, data):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+        return path
+
+
+tracer = Tracer()  # Shared tracer of the bot, enabled by the general_tracing setting
+
+
+def traced(stage):
+    """Decorator timing every call of a function as a stage of the shared tracer."""
+    return tracer.traced(stage)
@@ -1,33 +1,110 @@
 from PyQt5.QtCore import QRunnable
 import logging
+import threading
+import time
+from core.template_registry import template_registry
+from core.image_processing import ImageProcessing
+from core.cancellation import CancellationToken
+from core.exceptions import OperationCancelledException
+from core.utils import Utils
+from core.tracing import tracer
+from core.performance import PerformanceReporter
+from core.app_data_manager import app_data_manager
+from config.config import cfg
 
 
 class TrainingRunnable(QRunnable):
-    def __init__(self, logic, training_function, finished_signal):
+    stop_latency_target = 0.1  # Seconds between stop() and the end of the sequence above which a warning is logged
+
+    def __init__(self, logic, training_function, finished_signal, metrics_signal=None):
         super().__init__()
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logic = logic
         self.training_function = training_function
         self._is_running = True
         self.finished_signal = finished_signal  # Pass the signal directly
+        self.metrics_signal = metrics_signal  # Emitted with the PerformanceMetrics of the run about once a second
+        self.cancel_token = CancellationToken()
+        self.stop_latency = None  # Seconds the sequence took to end after stop(), once stopped
 
     def run(self):
         self.logic.current_thread = self  # This allows the logic to check if it should stop
+        self.logic.clock.resume()  # Waits may still be interrupted by the previous stop
+        Utils.set_cancel_token(self.cancel_token)
+        self.cancel_token.add_callback(self.logic.clock.interrupt)  # Wake up the sequence instead of letting it sleep out its current delay
         self.logger.debug(f"Starting training sequence: {self.training_function.__name__}")
+        template_registry.refresh()  # Pick up template images that changed since the last run
+        tracer.enabled = cfg.general_tracing.value or self.metrics_signal is not None
+        tracer.clear()
+        reporter = None
+        if self.metrics_signal is not None:
+            reporter = PerformanceReporter(self.metrics_signal.emit, thread=threading.get_ident())
+            reporter.start()
+        self.logic.reset_sequence_state()  # The game may have changed since the last run
         try:
             result = self.training_function()
             if not result:
                 self.logger.debug("Training sequence ended early.")
+        except OperationCancelledException:
+            self.logger.debug("Training sequence cancelled.")
         except Exception as e:
             self.logic.logger.error(f"Error during {self.training_function.__name__}: {str(e)}")
         finally:
             self._is_running = False
+            self.record_stop_latency()
+            if reporter is not None:
+                reporter.stop()
+            Utils.set_cancel_token(None)
+            self.logic.clock.resume()  # The quicksave below needs its waits
+            self.logic.close_favorites_menu_if_open()  # Left open if the run was stopped while equipping a favorite
             self.logic.quicksave()
             self.logic.open_menu()
+            self.save_caches()
+            self.save_trace()
             self.logger.debug("Finished running training sequence")
             self.finished_signal.emit()  # Emit the finished signal
 
     def stop(self):
+        """
+        Ask the training sequence to stop, without waiting for it. The finished signal is emitted once it has.
+        """
         self._is_running = False
+        self.cancel_token.cancel()
         self.logger.debug("Training sequence stopped.")
 
+    def record_stop_latency(self):
+        """Measure how long the sequence took to end after stop() was called."""
+        self.stop_latency = self.cancel_token.elapsed()
+        if self.stop_latency is None:
+            return
+        message = f"Training sequence ended {self.stop_latency * 1000:.0f} ms after the stop request."
+        if self.stop_latency > self.stop_latency_target:
+            self.logger.warning(message)
+        else:
+            self.logger.debug(message)
+
+    def save_caches(self):
+        """Save the OCR results and favorite signatures learned during the run."""
+        ocr_cache = ImageProcessing.get_ocr_cache()
+        recognizer = ImageProcessing.get_favorite_recognizer()
+        self.logger.debug(f"OCR cache statistics: {ocr_cache.stats()}")
+        self.logger.debug(f"Favorite recognizer: {len(recognizer)} names, {recognizer.hits} hits, {recognizer.misses} misses")
+        try:
+            ocr_cache.save()
+            recognizer.save()
+        except OSError as e:
+            self.logger.error(f"Failed to save the OCR caches: {e}")
+
+    def save_trace(self):
+        """Log the stage timings of the run and save them as a Chrome trace, when tracing is enabled."""
+        tracer.enabled = False
+        if not cfg.general_tracing.value:
+            return
+        for line in tracer.summary():
+            self.logger.debug(line)
+        name = f"{self.training_function.__name__}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        try:
+            path = tracer.export_chrome_trace(app_data_manager.get_file_path(f'traces/{name}'))
+            self.logger.info(f"Trace saved to {path}")
+        except OSError as e:
+            self.logger.error(f"Failed to save the trace: {e}")
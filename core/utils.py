@@ -2,15 +2,21 @@ import pyautogui
 import time
 import ctypes
 import pygetwindow as gw
-from pywinauto import application
-from pywinauto.findwindows import ElementNotFoundError, ElementAmbiguousError
 import logging
 from screeninfo import get_monitors
 from core.exceptions import *
-import keyboard
+from core.window_manager import WindowManager, Win32WindowManager, WindowHandleCache
+from core.input_backend import InputBatch, Win32InputBackend
+from core.clock import SystemClock
+from core.cancellation import CancellationToken
+from core.tracing import traced
 
 class Utils:
     logger = logging.getLogger('Utils')  # Static logger
+    window_cache = WindowHandleCache(Win32WindowManager())  # Game window handle, resolved once per run
+    input_backend = None  # Shared InputBackend, created on first use
+    clock = SystemClock()  # Time source of every wait, replaced by a VirtualClock in simulations
+    cancel_token = CancellationToken()  # Token of the running training sequence
 
     @staticmethod
     def relative_to_absolute_coords(x, y):
@@ -49,32 +55,87 @@ class Utils:
         return absolute_x, absolute_y
 
     @staticmethod
+    def set_window_manager(window_manager: WindowManager):
+        """
+        Replace the window manager used to find and focus windows (e.g. with a FakeWindowManager in tests).
+        """
+        Utils.window_cache = WindowHandleCache(window_manager)
+
+    @staticmethod
+    def get_input_backend():
+        """
+        Return the active input backend, creating the default Win32 backend on first use.
+        """
+        if Utils.input_backend is None:
+            Utils.input_backend = Win32InputBackend(Utils.clock)
+        return Utils.input_backend
+
+    @staticmethod
+    def set_input_backend(backend):
+        """
+        Replace the input backend used to send keys and clicks (e.g. with a RecordingInputBackend in tests).
+
+        :param backend: The InputBackend instance to use, or None to go back to the default backend.
+        """
+        previous = Utils.input_backend
+        if previous is not None and previous is not backend:
+            previous.close()
+        Utils.input_backend = backend
+
+    @staticmethod
+    def get_clock():
+        return Utils.clock
+
+    @staticmethod
+    def set_clock(clock):
+        """
+        Replace the clock used by the waits (e.g. with a VirtualClock in a simulation).
+
+        :param clock: The Clock instance to use, or None to go back to the system clock.
+        """
+        Utils.clock = clock if clock is not None else SystemClock()
+        if Utils.input_backend is not None:
+            Utils.input_backend.clock = Utils.clock
+
+    @staticmethod
+    def get_cancel_token():
+        return Utils.cancel_token
+
+    @staticmethod
+    def set_cancel_token(token):
+        """
+        Set the token the waits, captures and OCR requests check, while a training sequence runs.
+
+        :param token: The CancellationToken of the run, or None once it is over.
+        """
+        Utils.cancel_token = token if token is not None else CancellationToken()
+
+    @staticmethod
+    def check_cancelled():
+        """
+        Raise OperationCancelledException if the running training sequence was stopped.
+        """
+        Utils.cancel_token.raise_if_cancelled()
+
+    @staticmethod
+    @traced('focus_window')
     def focus_window(window_title):
         """
         Brings a window with the given title to the foreground and focuses on it.
+        The window handle is cached, so repeated calls are cheap while the window stays in focus.
         """
         try:
-            # Connect to the application with the specified window title
-            app = application.Application().connect(title_re=window_title)
-            window = app.window(title=window_title)
-            app_dialog = app.top_window()
-
-            if app_dialog.is_minimized():
-                app_dialog.restore()
-
-            app_dialog.set_focus()
-            hwnd = app_dialog.handle
-            ctypes.windll.user32.SetForegroundWindow(hwnd)
-            Utils.logger.debug(f"Window '{window_title}' is now in focus.")
+            Utils.window_cache.focus(window_title)
             return True
 
-        except ElementNotFoundError:
+        except WindowNotFoundException:
             Utils.logger.error(f"No window found with the title: {window_title}")
             return False
-        except ElementAmbiguousError:
+        except WindowAmbiguousException:
             Utils.logger.error(f"Multiple windows found with the title: {window_title}")
             return False
         except Exception as e:
+            Utils.window_cache.invalidate()
             Utils.logger.exception(f"An unexpected error occurred while focusing the window: {str(e)}")
             return False
 
@@ -85,7 +146,7 @@ class Utils:
         :param key_code: The virtual-key code of the key to press.
         """
         ctypes.windll.user32.keybd_event(key_code, 0, 0, 0)  # Key down
-        time.sleep(0.05)
+        Utils.get_clock().sleep(0.05)
         ctypes.windll.user32.keybd_event(key_code, 0, 2, 0)  # Key up
 
     @staticmethod
@@ -108,7 +169,31 @@ class Utils:
     @staticmethod
     def press_key_with_delay(key, delay=0.2):
         """
-        Press a key using the keyboard module with a delay.
+        Press a key through the input backend, then wait for the delay.
+        """
+        Utils.get_input_backend().send(InputBatch().press(key).wait(delay))
+
+    @staticmethod
+    @traced('wait')
+    def wait_until(predicate, timeout, interval=0.02):
+        """
+        Poll a predicate until it returns a truthy value or the timeout expires.
+
+        :param predicate: A callable without arguments.
+        :param timeout: The maximum time to wait in seconds.
+        :param interval: The time between two polls in seconds.
+        :return: The last value returned by the predicate, which is falsy on timeout or when the clock is interrupted.
+        :raises OperationCancelledException: If the training sequence is stopped during the wait.
         """
-        keyboard.press_and_release(key)
-        time.sleep(delay)
+        clock = Utils.get_clock()
+        deadline = clock.now() + timeout
+        while True:
+            result = predicate()
+            if result:
+                return result
+            remaining = deadline - clock.now()
+            if remaining <= 0:
+                return result
+            if not clock.sleep(min(interval, remaining)):
+                Utils.check_cancelled()
+                return result
@@ -0,0 +1,215 @@
+import ctypes
+import logging
+import re
+from abc import ABC, abstractmethod
+from core.exceptions import WindowNotFoundException, WindowAmbiguousException
+
+
+class WindowManager(ABC):
+    """
+    Minimal interface over the operating system's window functions.
+
+    Handles are opaque values returned by find_window and passed back to the other methods.
+    """
+
+    @abstractmethod
+    def find_window(self, window_title):
+        """
+        Resolve the handle of the window matching the title.
+
+        :param window_title: Regular expression matched against the window titles.
+        :return: The window handle.
+        :raises WindowNotFoundException: If no window matches.
+        :raises WindowAmbiguousException: If more than one window matches.
+        """
+
+    @abstractmethod
+    def is_window(self, handle):
+        """Return True if the handle still refers to an existing window."""
+
+    @abstractmethod
+    def get_rect(self, handle):
+        """Return the window rectangle as a tuple (left, top, right, bottom)."""
+
+    @abstractmethod
+    def is_minimized(self, handle):
+        """Return True if the window is minimized."""
+
+    @abstractmethod
+    def is_foreground(self, handle):
+        """Return True if the window is the current foreground window."""
+
+    @abstractmethod
+    def restore(self, handle):
+        """Restore a minimized window."""
+
+    @abstractmethod
+    def set_focus(self, handle):
+        """Bring the window to the foreground and give it the keyboard focus."""
+
+
+class Win32WindowManager(WindowManager):
+    """
+    Window manager using pywinauto to resolve the window once and plain user32 calls afterwards.
+    """
+    SW_RESTORE = 9
+
+    @property
+    def user32(self):
+        return ctypes.windll.user32
+
+    def find_window(self, window_title):
+        from pywinauto import findwindows
+        try:
+            return findwindows.find_window(title_re=window_title)
+        except findwindows.ElementNotFoundError:
+            raise WindowNotFoundException(window_title)
+        except findwindows.ElementAmbiguousError:
+            raise WindowAmbiguousException(window_title)
+
+    def is_window(self, handle):
+        return bool(self.user32.IsWindow(handle))
+
+    def get_rect(self, handle):
+        from ctypes import wintypes
+        rect = wintypes.RECT()
+        self.user32.GetWindowRect(handle, ctypes.byref(rect))
+        return rect.left, rect.top, rect.right, rect.bottom
+
+    def is_minimized(self, handle):
+        return bool(self.user32.IsIconic(handle))
+
+    def is_foreground(self, handle):
+        return self.user32.GetForegroundWindow() == handle
+
+    def restore(self, handle):
+        self.user32.ShowWindow(handle, self.SW_RESTORE)
+
+    def set_focus(self, handle):
+        from pywinauto.controls.hwndwrapper import HwndWrapper
+        HwndWrapper(handle).set_focus()
+        self.user32.SetForegroundWindow(handle)
+
+
+class FakeWindowManager(WindowManager):
+    """
+    In-memory window manager for tests. Windows are added with add_window and can be
+    moved, minimized or closed to simulate what happens to the game window.
+    """
+
+    def __init__(self):
+        self.windows = {}
+        self.foreground = None
+        self._next_handle = 1
+        self.find_calls = 0
+        self.focus_calls = 0
+
+    def add_window(self, window_title, rect=(0, 0, 1920, 1080)):
+        handle = self._next_handle
+        self._next_handle += 1
+        self.windows[handle] = {'title': window_title, 'rect': tuple(rect), 'minimized': False}
+        return handle
+
+    def move_window(self, handle, rect):
+        self.windows[handle]['rect'] = tuple(rect)
+
+    def minimize_window(self, handle):
+        self.windows[handle]['minimized'] = True
+        if self.foreground == handle:
+            self.foreground = None
+
+    def close_window(self, handle):
+        del self.windows[handle]
+        if self.foreground == handle:
+            self.foreground = None
+
+    def find_window(self, window_title):
+        self.find_calls += 1
+        matches = [handle for handle, window in self.windows.items() if re.match(window_title, window['title'])]
+        if not matches:
+            raise WindowNotFoundException(window_title)
+        if len(matches) > 1:
+            raise WindowAmbiguousException(window_title)
+        return matches[0]
+
+    def is_window(self, handle):
+        return handle in self.windows
+
+    def get_rect(self, handle):
+        return self.windows[handle]['rect']
+
+    def is_minimized(self, handle):
+        return self.windows[handle]['minimized']
+
+    def is_foreground(self, handle):
+        return self.foreground == handle
+
+    def restore(self, handle):
+        self.windows[handle]['minimized'] = False
+
+    def set_focus(self, handle):
+        self.focus_calls += 1
+        self.foreground = handle
+
+
+class WindowHandleCache:
+    """
+    Keeps the handle of the game window between calls so it is resolved once per run.
+
+    The handle is only looked up again when the window no longer exists, and the window is
+    only re-focused when it lost the foreground, was minimized or moved.
+    """
+    logger = logging.getLogger('WindowHandleCache')
+
+    def __init__(self, window_manager: WindowManager):
+        self.window_manager = window_manager
+        self.window_title = None
+        self.handle = None
+        self.rect = None
+
+    def invalidate(self):
+        """Forget the cached handle so the next call resolves the window again."""
+        self.handle = None
+        self.rect = None
+
+    def get_handle(self, window_title):
+        """
+        Return the cached handle for the window, resolving it if it is missing or no longer valid.
+        """
+        if window_title != self.window_title:
+            self.invalidate()
+            self.window_title = window_title
+
+        if self.handle is None or not self.window_manager.is_window(self.handle):
+            if self.handle is not None:
+                self.logger.info(f"Window '{window_title}' was lost, resolving it again.")
+            self.handle = self.window_manager.find_window(window_title)
+            self.rect = None
+            self.logger.debug(f"Resolved window '{window_title}' to handle {self.handle}.")
+
+        return self.handle
+
+    def focus(self, window_title):
+        """
+        Make sure the window is in the foreground, doing as little work as possible.
+
+        :param window_title: Regular expression matched against the window titles.
+        :return: The window handle.
+        """
+        wm = self.window_manager
+        handle = self.get_handle(window_title)
+
+        if wm.is_minimized(handle):
+            self.logger.debug(f"Window '{window_title}' is minimized, restoring it.")
+            wm.restore(handle)
+        else:
+            rect = wm.get_rect(handle)
+            if rect == self.rect and wm.is_foreground(handle):
+                return handle
+            if self.rect is not None and rect != self.rect:
+                self.logger.debug(f"Window '{window_title}' moved to {rect}.")
+
+        wm.set_focus(handle)
+        self.rect = wm.get_rect(handle)
+        self.logger.debug(f"Window '{window_title}' is now in focus.")
+        return handle
@@ -3,7 +3,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QThreadPool, pyqtSlot
 from qfluentwidgets import (
-    ListWidget, TogglePushButton, ExpandLayout, SettingCardGroup, TextEdit, isDarkTheme, setTheme, Theme
+    ListWidget, TogglePushButton, PushButton, ExpandLayout, SettingCardGroup, PlainTextEdit, isDarkTheme, setTheme, Theme
 )
 from qfluentwidgets import FluentIcon as FIF
 import logging
@@ -19,6 +19,7 @@ from importlib import resources
 
 class BotInterface(QWidget):
     finished_signal = pyqtSignal()  # Declare the signal here
+    metrics_signal = pyqtSignal(object)  # PerformanceMetrics of the running sequence, about once a second
     
     def __init__(self, parent=None):
         super().__init__(parent=parent)
@@ -35,6 +36,7 @@ class BotInterface(QWidget):
         # StyleSheet.BOT_INTERFACE.apply(self)
         self.connect_signals()
         self.apply_styles()
+        self._update_queue_buttons()
         # self._setup_logger_widget()
 
     def init_widgets(self):
@@ -48,6 +50,8 @@ class BotInterface(QWidget):
         self._setup_bot_list_widget()
         self.bot_list_widget.setObjectName("list")
         self.play_button_widget = TogglePushButton(FIF.PLAY, 'Start', self.container_widget)
+        self.queue_button_widget = PushButton(FIF.ADD, 'Add to queue', self.container_widget)
+        self.clear_queue_button_widget = PushButton(FIF.DELETE, 'Clear queue', self.container_widget)
         
         # Bot settings widgets
         self.scroll_widget = QWidget(self.container_widget)
@@ -58,13 +62,13 @@ class BotInterface(QWidget):
         self.expand_layout.addWidget(self.personal_group)
 
         # Log widget
-        self.log_text_edit = TextEdit(self.container_widget)
+        self.log_text_edit = PlainTextEdit(self.container_widget)
         self.log_text_edit.setObjectName("textedit")
         self.log_text_edit.setReadOnly(True)
         self.log_text_edit.setPlaceholderText("Log output will appear here...")
 
         # Setup logger
-        self.text_edit_logger = TextEditLogger(self.log_text_edit)
+        self.text_edit_logger = TextEditLogger(self.log_text_edit, cfg.gui_logFlushInterval.value, cfg.gui_logMaxLines.value)
         logging.getLogger().addHandler(self.text_edit_logger)
 
         self.overlay = DarkOverlay(self)
@@ -97,6 +101,9 @@ class BotInterface(QWidget):
         self.bot_selection_layout.addSpacing(12)
         self.bot_selection_layout.addWidget(self.bot_list_widget)
         self.bot_selection_layout.addWidget(self.play_button_widget)
+        self.bot_selection_layout.addSpacing(6)
+        self.bot_selection_layout.addWidget(self.queue_button_widget)
+        self.bot_selection_layout.addWidget(self.clear_queue_button_widget)
 
         # Layout for bot settings and log output
         self.vertical_layout = QVBoxLayout()
@@ -119,8 +126,12 @@ class BotInterface(QWidget):
     def connect_signals(self):
         self.bot_list_widget.itemClicked.connect(self.select_bot_sequence)
         self.play_button_widget.toggled.connect(self.toggle_action)
+        self.queue_button_widget.clicked.connect(self.add_to_queue)
+        self.clear_queue_button_widget.clicked.connect(self.clear_queue)
         self.finished_signal.connect(self.on_training_finished)  # Connect the signal
         cfg.themeChanged.connect(self.__onThemeChanged)
+        cfg.gui_logMaxLines.valueChanged.connect(self.text_edit_logger.set_max_lines)
+        cfg.gui_logFlushInterval.valueChanged.connect(self.text_edit_logger.set_flush_interval)
 
     def apply_styles(self):
         """ set style sheet """
@@ -203,36 +214,82 @@ class BotInterface(QWidget):
             current_item = self.bot_list_widget.currentItem()
             if current_item:
                 sequence_name = current_item.text().replace(" ", "_").lower()
-                self.logger.info(f"Starting training sequence: {sequence_name}")
+                if self.logic.job_queue.pending():
+                    # Queued jobs take precedence over the selected sequence
+                    self.logger.info(f"Starting the job queue ({len(self.logic.job_queue.pending())} jobs)")
+                    training_function = self.logic.run_jobs
+                else:
+                    self.logger.info(f"Starting training sequence: {sequence_name}")
+                    training_function = getattr(self.logic, sequence_name)
 
                 # Create the runnable and start it
-                self.current_runnable = TrainingRunnable(self.logic, getattr(self.logic, sequence_name), self.finished_signal)
+                self.current_runnable = TrainingRunnable(self.logic, training_function, self.finished_signal, self.metrics_signal)
                 self.current_runnable.logger.addHandler(self.text_edit_logger)
                 self.thread_pool.start(self.current_runnable)
             else:
                 self.logger.error("No bot sequence selected.")
                 self.play_button_widget.setChecked(False)
-                self.play_button_widget.setText('Start')
+                self._update_queue_buttons()
         else:
-            self.play_button_widget.setText('Start')
             self.logger.info("Stopping the training sequence...")
             if self.current_runnable:
+                # Do not wait for the runnable here: it quicksaves before finishing, and on_training_finished
+                # re-enables the button once it is done
+                self.play_button_widget.setText('Stopping...')
+                self.play_button_widget.setEnabled(False)
                 self.current_runnable.stop()
-                self.thread_pool.waitForDone()
+            else:
+                self._update_queue_buttons()
 
     @pyqtSlot()
     def on_training_finished(self):
+        self.play_button_widget.blockSignals(True)  # The sequence is already over, do not stop it again
         self.play_button_widget.setChecked(False)
+        self.play_button_widget.blockSignals(False)
+        self.play_button_widget.setEnabled(True)
         self.play_button_widget.setText('Start')
         self.logger.info("Training sequence finished.")
         self.current_runnable = None
+        self._update_queue_buttons()
+
+    def add_to_queue(self):
+        """Queue the selected sequence with its current settings."""
+        current_item = self.bot_list_widget.currentItem()
+        if not current_item:
+            self.logger.error("No bot sequence selected.")
+            return
+        self.logic.job_queue.add(current_item.text().replace(" ", "_").lower())
+        self._update_queue_buttons()
+
+    def clear_queue(self):
+        self.logic.job_queue.clear()
+        self.logger.info("Job queue cleared.")
+        self._update_queue_buttons()
+
+    def _update_queue_buttons(self):
+        """Show on the start button whether it runs the job queue or the selected bot."""
+        pending = self.logic.job_queue.pending()
+        self.clear_queue_button_widget.setText(f'Clear queue ({len(pending)})' if pending else 'Clear queue')
+        if pending:
+            jobs = '\n'.join(f"{position + 1}. {job.describe()}" for position, job in enumerate(pending))
+            self.play_button_widget.setToolTip(f"Runs the queued jobs instead of the selected bot:\n{jobs}\nClear the queue to run the selected bot.")
+        else:
+            self.play_button_widget.setToolTip("Runs the selected bot.")
+        if self.play_button_widget.isChecked():
+            self.play_button_widget.setText('Stop')
+        else:
+            self.play_button_widget.setText(f'Start queue ({len(pending)})' if pending else 'Start')
 
     def toggle_hotkey_action(self):
         """Simulate the press of the start/stop button when the hotkey is pressed."""
+        if not self.play_button_widget.isEnabled():
+            return  # Still stopping
         self.play_button_widget.setChecked(not self.play_button_widget.isChecked())
 
     def closeEvent(self, event):
         keyboard.unhook_all_hotkeys()
+        if self.current_runnable:
+            self.current_runnable.stop()
         event.accept()
 
     def resizeEvent(self, event):
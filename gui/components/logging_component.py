@@ -1,17 +1,52 @@
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QTimer
+from collections import deque
 import logging
 
 class TextEditLogger(logging.Handler, QObject):
-    appendText = pyqtSignal(str)
+    """
+    Logging handler writing the records to a plain text widget, from any thread.
 
-    def __init__(self, widget):
+    Records are only buffered when they are emitted. A timer of the GUI thread writes the buffer to the
+    widget every flush_interval milliseconds in a single append, so a burst of DEBUG records costs one
+    update of the widget instead of one per record. The widget keeps the last max_lines lines.
+    """
+
+    def __init__(self, widget, flush_interval=100, max_lines=5000):
+        """
+        :param widget: The QPlainTextEdit showing the log.
+        :param flush_interval: The time between two writes to the widget, in milliseconds.
+        :param max_lines: The number of lines kept, the oldest ones are removed first.
+        """
         super().__init__()
         QObject.__init__(self)
         self.widget = widget
         self.setLevel(logging.DEBUG)
         self.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(name)s: %(message)s'))
-        self.appendText.connect(self.widget.append)
+        # Appends are atomic, the worker threads do not take a lock. The deque is never replaced, so no record
+        # is lost; its maxlen only bounds the records waiting for the next write
+        self.buffer = deque(maxlen=max_lines)
+        self.set_max_lines(max_lines)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.write_buffer)
+        self.set_flush_interval(flush_interval)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.appendText.emit(msg)
\ No newline at end of file
+        try:
+            self.buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def write_buffer(self):
+        """Append the buffered records to the widget. Runs in the GUI thread."""
+        lines = []
+        while self.buffer:
+            lines.append(self.buffer.popleft())
+        if lines:
+            self.widget.appendPlainText('\n'.join(lines))
+
+    def set_flush_interval(self, flush_interval):
+        self.timer.start(flush_interval)
+
+    def set_max_lines(self, max_lines):
+        self.widget.setMaximumBlockCount(max_lines)
@@ -7,6 +7,7 @@ from qfluentwidgets import (NavigationItemPosition, FluentWindow, SplashScreen)
 from qfluentwidgets import FluentIcon as FIF
 from gui.setting_interface import SettingInterface
 from gui.bot_interface import BotInterface
+from gui.performance_interface import PerformanceInterface
 from config.config import cfg
 
 class MainWindow(FluentWindow):
@@ -18,6 +19,9 @@ class MainWindow(FluentWindow):
         # create sub interface
         self.botInterface = BotInterface(self)
         self.settingInterface = SettingInterface(self)  # Use the ParameterPage class
+        self.performanceInterface = PerformanceInterface(self)
+        self.botInterface.metrics_signal.connect(self.performanceInterface.update_metrics)
+        self.botInterface.finished_signal.connect(self.performanceInterface.on_training_finished)
 
 
         # enable acrylic effect
@@ -29,6 +33,7 @@ class MainWindow(FluentWindow):
 
     def initNavigation(self):
         self.addSubInterface(self.botInterface, FIF.ROBOT, self.tr('Bot'))
+        self.addSubInterface(self.performanceInterface, FIF.SPEED_HIGH, self.tr('Performance'))
         # self.addSubInterface(self.configInterface, FIF.SETTING, self.tr('Logic Settings'))
         self.addSubInterface(self.settingInterface, FIF.SETTING, self.tr('Gui Settings'), NavigationItemPosition.BOTTOM)
 
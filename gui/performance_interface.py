@@ -0,0 +1,122 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGridLayout, QHBoxLayout
+from PyQt5.QtCore import Qt, pyqtSlot
+from qfluentwidgets import SimpleCardWidget, BodyLabel, CaptionLabel, TitleLabel, ProgressBar, isDarkTheme
+from config.config import cfg
+from gui.components.custom_qfluentwidgets import CustomTitleLabel
+from importlib import resources
+
+
+class MetricCard(SimpleCardWidget):
+    """A card showing a single value with its name and unit."""
+
+    def __init__(self, title, unit, parent=None):
+        super().__init__(parent=parent)
+        self.unit = unit
+        self.title_label = CaptionLabel(title, self)
+        self.value_label = TitleLabel('-', self)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 12, 16, 12)
+        layout.addWidget(self.title_label)
+        layout.addWidget(self.value_label)
+
+    def set_value(self, value, decimals=1):
+        self.value_label.setText('-' if value is None else f"{value:.{decimals}f} {self.unit}")
+
+
+class PerformanceInterface(QWidget):
+    """
+    Live throughput of the running sequence, from the PerformanceMetrics sent by the TrainingRunnable.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.setObjectName("PerformanceInterface")
+
+        self.init_widgets()
+        self.init_layout()
+        self.connect_signals()
+        self.apply_styles()
+
+    def init_widgets(self):
+        self.container_widget = QWidget(self)
+        self.container_widget.setObjectName("container_widget")
+
+        self.title_label = CustomTitleLabel('Performance', self.container_widget)
+        self.status_label = BodyLabel('No sequence running.', self.container_widget)
+
+        self.cycles_card = MetricCard('Cycles', 'per min', self.container_widget)
+        self.capture_card = MetricCard('Captures', 'fps', self.container_widget)
+        self.ocr_card = MetricCard('OCR latency (median)', 'ms', self.container_widget)
+        self.health_card = MetricCard('Health polls', 'per s', self.container_widget)
+
+        self.split_label = CustomTitleLabel('Time split', self.container_widget)
+        self.split_bars = {}
+        for activity in ('sleeping', 'acting', 'analyzing'):
+            label = BodyLabel(activity.capitalize(), self.container_widget)
+            bar = ProgressBar(self.container_widget)
+            bar.setRange(0, 100)
+            bar.setValue(0)
+            value_label = BodyLabel('-', self.container_widget)
+            self.split_bars[activity] = (label, bar, value_label)
+
+    def init_layout(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+        self.main_layout.addWidget(self.container_widget)
+
+        container_layout = QVBoxLayout(self.container_widget)
+        container_layout.setContentsMargins(20, 20, 20, 10)
+        container_layout.setAlignment(Qt.AlignTop)
+        container_layout.addWidget(self.title_label)
+        container_layout.addSpacing(4)
+        container_layout.addWidget(self.status_label)
+        container_layout.addSpacing(12)
+
+        cards_layout = QGridLayout()
+        cards_layout.setSpacing(12)
+        cards_layout.addWidget(self.cycles_card, 0, 0)
+        cards_layout.addWidget(self.capture_card, 0, 1)
+        cards_layout.addWidget(self.ocr_card, 1, 0)
+        cards_layout.addWidget(self.health_card, 1, 1)
+        container_layout.addLayout(cards_layout)
+
+        container_layout.addSpacing(24)
+        container_layout.addWidget(self.split_label)
+        container_layout.addSpacing(8)
+        for label, bar, value_label in self.split_bars.values():
+            row = QHBoxLayout()
+            label.setFixedWidth(90)
+            value_label.setFixedWidth(50)
+            value_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            row.addWidget(label)
+            row.addWidget(bar, stretch=1)
+            row.addWidget(value_label)
+            container_layout.addLayout(row)
+
+    def connect_signals(self):
+        cfg.themeChanged.connect(self.apply_styles)
+
+    def apply_styles(self):
+        """ set style sheet """
+        theme = 'dark' if isDarkTheme() else 'light'
+        qss_path = str(resources.files('gui.resources.qss') / theme / 'performance_interface.qss')
+        with open(qss_path, encoding='utf-8') as f:
+            self.setStyleSheet(f.read())
+
+    @pyqtSlot(object)
+    def update_metrics(self, metrics):
+        """Show a PerformanceMetrics."""
+        self.status_label.setText(f"Last {metrics.window:.0f} seconds of the running sequence.")
+        self.cycles_card.set_value(metrics.cycles_per_minute)
+        self.capture_card.set_value(metrics.capture_fps)
+        self.ocr_card.set_value(metrics.ocr_latency, decimals=0)
+        self.health_card.set_value(metrics.health_polls)
+        for activity, (_, bar, value_label) in self.split_bars.items():
+            percentage = min(getattr(metrics, activity) * 100, 100)
+            bar.setValue(int(round(percentage)))
+            value_label.setText(f"{percentage:.0f}%")
+
+    @pyqtSlot()
+    def on_training_finished(self):
+        self.status_label.setText("Last run, the values cover its final seconds.")
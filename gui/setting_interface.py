@@ -1,6 +1,6 @@
 from config.config import cfg
 from qfluentwidgets import (
-    SettingCardGroup, SwitchSettingCard, OptionsSettingCard, ScrollArea,
+    SettingCardGroup, SwitchSettingCard, OptionsSettingCard, RangeSettingCard, ScrollArea,
     ExpandLayout, Theme, InfoBar, CustomColorSettingCard, setTheme, setThemeColor, isDarkTheme
 )
 from qfluentwidgets import FluentIcon as FIF
@@ -71,6 +71,12 @@ class SettingInterface(ScrollArea):
         card = cfg.gui_minimizeToTray
         self.minimizetotray_card = SwitchSettingCard(card.icon, card.name, content=card.content, configItem=card, parent=self.mainpanel_group)
 
+        card = cfg.gui_logMaxLines
+        self.logmaxlines_card = RangeSettingCard(card, card.icon, card.name, card.content, parent=self.mainpanel_group)
+
+        card = cfg.gui_logFlushInterval
+        self.logflushinterval_card = RangeSettingCard(card, card.icon, card.name, card.content, parent=self.mainpanel_group)
+
         # Bot panel section
         self.logic_group = SettingCardGroup(self.tr('Logic'), self.scroll_widget)
         GuiUtils.generate_Card_from_config("General", self.logic_group)
@@ -95,6 +101,8 @@ class SettingInterface(ScrollArea):
 
         # Add cards to the Main panel group
         self.mainpanel_group.addSettingCard(self.minimizetotray_card)
+        self.mainpanel_group.addSettingCard(self.logmaxlines_card)
+        self.mainpanel_group.addSettingCard(self.logflushinterval_card)
 
         # Configure the layout for the ExpandLayout in scrollWidget
         self.expand_layout.setSpacing(28)
@@ -2,12 +2,17 @@
 import os
 icon_path = os.path.abspath('gui/resources/icons/skyrim.ico')
 
+# Bundle tesserocr with its English language data, so OCR runs in process instead of starting tesseract for every image
+import tesserocr
+tessdata_path, _ = tesserocr.get_languages()
+tessdata = [(os.path.join(tessdata_path, 'eng.traineddata'), 'tessdata')]
+
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('gui/resources', 'gui/resources'), ('core/assets','core/assets'), ('tests/assets','tests/assets')],
-    hiddenimports=['comtypes', 'comtypes.stream','PyQt5.QtMultimedia', 'PyQt5.QtMultimediaWidgets'],
+    datas=[('gui/resources', 'gui/resources'), ('core/assets','core/assets'), ('tests/assets','tests/assets')] + tessdata,
+    hiddenimports=['tesserocr', 'comtypes', 'comtypes.stream','PyQt5.QtMultimedia', 'PyQt5.QtMultimediaWidgets'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,79 @@
+import cv2
+import numpy as np
+from core.bar_analyzer import BarAnalyzer, BarSpec, widest_run
+from core.capture import ReplayCaptureBackend
+from core.frame_snapshot import FrameSnapshot
+import pytest
+
+HEALTH_REGION = (774, 1006, 375, 19)
+MAGICKA_REGION = (60, 1006, 375, 19)
+STAMINA_REGION = (1490, 1006, 375, 19)
+
+def draw_bar(frame, region, fill, color, centered=False):
+    """Draw a bar filled to the given fraction, from the left or shrinking towards the center."""
+    x, y, w, h = region
+    frame[y:y+h, x:x+w] = (30, 30, 30)
+    length = int(round(w * fill))
+    start = x + (w - length) // 2 if centered else x
+    frame[y + 4:y + h - 4, start:start + length] = color
+
+@pytest.fixture
+def frame():
+    """A synthetic screen with the health bar at 60%, magicka at 25% and stamina at 90%."""
+    frame = np.full((1080, 1920, 3), 80, dtype=np.uint8)
+    draw_bar(frame, HEALTH_REGION, 0.6, (30, 30, 190), centered=True)
+    draw_bar(frame, MAGICKA_REGION, 0.25, (200, 110, 40))
+    draw_bar(frame, STAMINA_REGION, 0.9, (60, 180, 60))
+    return frame
+
+@pytest.fixture
+def analyzer():
+    return BarAnalyzer([BarSpec.health(HEALTH_REGION), BarSpec.magicka(MAGICKA_REGION), BarSpec.stamina(STAMINA_REGION)])
+
+@pytest.mark.parametrize("mask,max_gap,expected", [
+    ([0, 0, 0], 5, 0),
+    ([1, 1, 0, 1, 1], 0, 2),
+    ([1, 1, 0, 1, 1], 1, 5),
+    ([1, 0, 0, 0, 1, 1, 1, 1], 2, 4),
+])
+def test_widest_run(mask, max_gap, expected):
+    assert widest_run(np.array(mask, dtype=bool), max_gap) == expected
+
+def test_analyze_all_bars(frame, analyzer):
+    results = analyzer.analyze(frame)
+    assert results['health'] == pytest.approx(60, abs=1)
+    assert results['magicka'] == pytest.approx(25, abs=1)
+    assert results['stamina'] == pytest.approx(90, abs=1)
+
+def test_analyze_snapshot(frame, analyzer):
+    snapshot = FrameSnapshot.capture(ReplayCaptureBackend([frame]), analyzer.regions)
+    assert analyzer.analyze(snapshot) == analyzer.analyze(frame)
+
+def test_empty_bar(analyzer):
+    frame = np.full((1080, 1920, 3), 30, dtype=np.uint8)
+    assert analyzer.analyze(frame) == {'health': 0.0, 'magicka': 0.0, 'stamina': 0.0}
+
+def test_vertical_bar():
+    frame = np.full((200, 40, 3), 30, dtype=np.uint8)
+    frame[150:200, 10:30] = (200, 110, 40)  # Filled from the bottom to a quarter of the height
+    analyzer = BarAnalyzer([BarSpec('magicka', (0, 0, 40, 200), [(95, 130)], orientation='vertical')])
+    assert analyzer.analyze(frame)['magicka'] == pytest.approx(25)
+
+def test_color_table_matches_hsv_conversion():
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (20000, 1, 3), dtype=np.uint8)
+    hsv = cv2.cvtColor(pixels, cv2.COLOR_BGR2HSV).reshape(-1, 3)
+    expected = (((hsv[:, 0] <= 10) | (hsv[:, 0] >= 170)) & (hsv[:, 1] >= 70) & (hsv[:, 2] >= 50))
+
+    table = BarAnalyzer.color_table(((0, 10), (170, 179)), 70, 50)
+    result = table[BarAnalyzer.lut_index(pixels.reshape(-1, 3))].astype(bool)
+    # Quantization only changes the result for colors right at the range boundaries
+    assert np.mean(result == expected) > 0.97
+
+def test_invalid_specs():
+    with pytest.raises(ValueError):
+        BarSpec('health', HEALTH_REGION, [(0, 10)], orientation='diagonal')
+    with pytest.raises(ValueError):
+        BarAnalyzer([BarSpec.health(HEALTH_REGION), BarSpec.health(MAGICKA_REGION)])
+    with pytest.raises(ValueError):
+        BarAnalyzer([BarSpec(f'bar{i}', HEALTH_REGION, [(0, 10)]) for i in range(9)])
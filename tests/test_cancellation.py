@@ -0,0 +1,51 @@
+import threading
+import time
+from concurrent.futures import Future
+from core.cancellation import CancellationToken
+from core.exceptions import OperationCancelledException
+import pytest
+
+@pytest.fixture
+def token():
+    return CancellationToken()
+
+def test_cancel_runs_callbacks_once(token):
+    calls = []
+    token.add_callback(lambda: calls.append('a'))
+    remove = token.add_callback(lambda: calls.append('removed'))
+    remove()
+    token.cancel()
+    token.cancel()
+    assert calls == ['a']
+    assert token.cancelled
+    assert token.elapsed() >= 0
+
+def test_callback_added_after_cancel_runs_at_once(token):
+    token.cancel()
+    calls = []
+    token.add_callback(lambda: calls.append(True))
+    assert calls == [True]
+
+def test_raise_if_cancelled(token):
+    token.raise_if_cancelled()
+    token.cancel()
+    with pytest.raises(OperationCancelledException):
+        token.raise_if_cancelled()
+
+def test_wait_for_result(token):
+    future = Future()
+    threading.Timer(0.01, future.set_result, ['text']).start()
+    assert token.wait_for(future, timeout=1) == 'text'
+
+def test_wait_for_timeout(token):
+    with pytest.raises(TimeoutError):
+        token.wait_for(Future(), timeout=0.01)
+
+def test_cancel_ends_wait_for(token):
+    future = Future()
+    threading.Timer(0.02, token.cancel).start()
+    start = time.perf_counter()
+    with pytest.raises(OperationCancelledException):
+        token.wait_for(future)
+    assert time.perf_counter() - start < 0.1
+    assert future.cancelled()
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+from core.capture import ReplayCaptureBackend
+from pathlib import Path
+import pytest
+
+@pytest.fixture(scope="module")
+def assets_path():
+    """Define the base path to the assets directory."""
+    return Path(__file__).parent / 'assets'
+
+@pytest.fixture
+def frames():
+    """Two small synthetic frames with different colors."""
+    first = np.zeros((20, 30, 3), dtype=np.uint8)
+    second = np.full((20, 30, 3), 255, dtype=np.uint8)
+    return [first, second]
+
+def test_replay_grab_region(assets_path):
+    frame = cv2.imread(str(assets_path / 'menu_open.png'))
+    backend = ReplayCaptureBackend([assets_path / 'menu_open.png'])
+    region = (10, 5, 40, 25)
+    img = backend.grab(region)
+    assert img.shape == (25, 40, 3)
+    assert np.array_equal(img, frame[5:30, 10:50])
+
+def test_replay_full_frame_is_a_copy(frames):
+    backend = ReplayCaptureBackend(frames)
+    img = backend.grab()
+    img[...] = 7
+    assert backend.grab().max() == 0
+
+def test_replay_grab_into_buffer(frames):
+    backend = ReplayCaptureBackend(frames)
+    out = np.empty((4, 6, 3), dtype=np.uint8)
+    backend.set_frame(1)
+    result = backend.grab((0, 0, 6, 4), out=out)
+    assert result is out
+    assert out.min() == 255
+
+@pytest.mark.parametrize("loop,expected", [(True, [0, 255, 0]), (False, [0, 255, 255])])
+def test_replay_advance_on_grab(frames, loop, expected):
+    backend = ReplayCaptureBackend(frames, loop=loop, advance_on_grab=True)
+    values = [int(backend.grab()[0, 0, 0]) for _ in range(3)]
+    assert values == expected
+    assert backend.grab_count == 3
+
+def test_replay_requires_frames():
+    with pytest.raises(ValueError):
+        ReplayCaptureBackend([])
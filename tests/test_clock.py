@@ -0,0 +1,70 @@
+import threading
+import time
+from core.clock import SystemClock, ScaledClock, VirtualClock
+import pytest
+
+def interrupt_after(clock, delay):
+    timer = threading.Timer(delay, clock.interrupt)
+    timer.start()
+    return timer
+
+def test_virtual_clock_advances_on_sleep():
+    clock = VirtualClock(start=10)
+    start = time.perf_counter()
+    assert clock.sleep(60 * 1000)
+    assert clock.now() == 10 + 60 * 1000
+    assert time.perf_counter() - start < 0.1
+
+def test_virtual_clock_sleep_until():
+    clock = VirtualClock()
+    assert clock.sleep_until(5)
+    assert clock.sleep_until(2)  # Already passed
+    assert clock.now() == 5
+
+def test_scaled_clock():
+    clock = ScaledClock(scale=20)
+    start = time.perf_counter()
+    assert clock.sleep(1)
+    assert time.perf_counter() - start == pytest.approx(0.05, abs=0.03)
+    assert clock.now() >= 1
+
+def test_scaled_clock_rejects_bad_scale():
+    with pytest.raises(ValueError):
+        ScaledClock(scale=0)
+
+@pytest.mark.parametrize("clock", [SystemClock(), ScaledClock(scale=2)])
+def test_interrupt_wakes_sleep(clock):
+    timer = interrupt_after(clock, 0.02)
+    start = time.perf_counter()
+    assert not clock.sleep(5)
+    assert time.perf_counter() - start < 0.1
+    timer.join()
+
+@pytest.mark.parametrize("clock", [SystemClock(), VirtualClock()])
+def test_interrupted_clock_does_not_wait_until_resumed(clock):
+    clock.interrupt()
+    before = clock.now()
+    assert not clock.sleep(5)
+    assert not clock.sleep_until(clock.now() + 5)
+    assert clock.now() - before < 0.1
+    clock.resume()
+    assert clock.sleep(0.001)
+
+def test_system_clock_sleep_until_is_precise():
+    clock = SystemClock()
+    deadline = clock.now() + 0.01
+    assert clock.sleep_until(deadline)
+    assert clock.now() - deadline < 0.002
+
+def test_virtual_clock_alarm_interrupts_sleep():
+    clock = VirtualClock()
+    fired = []
+    clock.call_at(3, lambda: fired.append(clock.now()))
+    clock.call_at(2, lambda: (fired.append(clock.now()), clock.interrupt()))
+    assert not clock.sleep(10)
+    assert fired == [2]
+    assert clock.now() == 2
+    clock.resume()
+    assert clock.sleep(10)
+    assert fired == [2, 3]
+    assert clock.now() == 12
@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+from core.favorite_recognizer import FavoriteNameRecognizer
+import pytest
+
+def render_name(text, offset=(10, 30), noise=0):
+    """Render a favorite name like the game does (light text on a dark strip) and threshold it."""
+    img = np.full((43, 395), 30, dtype=np.uint8)
+    cv2.putText(img, text, offset, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 230, 2)
+    if noise:
+        rng = np.random.default_rng(noise)
+        img = cv2.add(img, rng.integers(0, 20, img.shape, dtype=np.uint8))
+    _, thresh_img = cv2.threshold(img, 150, 255, cv2.THRESH_BINARY_INV)
+    return thresh_img
+
+class CountingOcr:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def __call__(self, img):
+        self.calls += 1
+        return self.text
+
+def test_second_read_skips_ocr():
+    recognizer = FavoriteNameRecognizer()
+    ocr = CountingOcr('Muffle\n')
+    assert recognizer.recognize(render_name('Muffle'), ocr) == 'Muffle\n'
+    assert recognizer.recognize(render_name('Muffle'), ocr) == 'Muffle\n'
+    assert ocr.calls == 1
+    assert (recognizer.hits, recognizer.misses) == (1, 1)
+
+def test_matches_shifted_and_noisy_name():
+    recognizer = FavoriteNameRecognizer()
+    recognizer.learn(render_name('Soul Trap'), 'Soul Trap')
+    assert recognizer.lookup(render_name('Soul Trap', offset=(14, 32), noise=3)) == 'Soul Trap'
+
+@pytest.mark.parametrize("known,other", [
+    ('Healing', 'Healing Hands'),
+    ('Muffle', 'Fast Healing'),
+    ('Elven Dagger (2)', 'Elven Dagger (3)'),
+])
+def test_different_names_do_not_match(known, other):
+    recognizer = FavoriteNameRecognizer()
+    recognizer.learn(render_name(known), known)
+    assert recognizer.lookup(render_name(other)) is None
+
+def test_forget_misread_name():
+    recognizer = FavoriteNameRecognizer()
+    recognizer.learn(render_name('Muffle'), 'Mufflc')
+    recognizer.learn(render_name('Soul Trap'), 'Soul Trap')
+    assert recognizer.forget(render_name('Muffle', offset=(12, 31))) == 'Mufflc'
+    assert recognizer.lookup(render_name('Muffle')) is None
+    assert recognizer.lookup(render_name('Soul Trap')) == 'Soul Trap'
+    assert recognizer.forget(render_name('Muffle')) is None
+
+    ocr = CountingOcr('Muffle')
+    assert recognizer.recognize(render_name('Muffle'), ocr) == 'Muffle'
+    assert ocr.calls == 1
+
+def test_forgotten_name_is_not_saved(tmp_path):
+    path = tmp_path / 'favorite_signatures.json'
+    recognizer = FavoriteNameRecognizer(path=path)
+    recognizer.learn(render_name('Muffle'), 'Mufflc')
+    recognizer.forget(render_name('Muffle'))
+    recognizer.save()
+    loaded = FavoriteNameRecognizer(path=path)
+    assert loaded.load() == 0
+
+def test_empty_text_is_not_learned():
+    recognizer = FavoriteNameRecognizer()
+    recognizer.learn(render_name('Muffle'), '  \n')
+    recognizer.learn(np.full((43, 395), 255, dtype=np.uint8), 'Muffle')
+    assert len(recognizer) == 0
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / 'favorite_signatures.json'
+    recognizer = FavoriteNameRecognizer(path=path)
+    recognizer.learn(render_name('Muffle'), 'Muffle')
+    recognizer.learn(render_name('Soul Trap'), 'Soul Trap')
+    recognizer.save()
+
+    loaded = FavoriteNameRecognizer(path=path)
+    assert loaded.load() == 2
+    assert loaded.lookup(render_name('Soul Trap')) == 'Soul Trap'
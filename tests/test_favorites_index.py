@@ -0,0 +1,57 @@
+from core.favorites_index import FavoritesIndex
+import pytest
+
+@pytest.fixture
+def entries():
+    return ["elven bow of shocks", "elven dagger (2)", "healing", "muffle", "elven boots of eminent sneaking"]
+
+def test_find_and_index_of(entries):
+    index = FavoritesIndex()
+    index.update(entries)
+    assert index.is_valid()
+    assert index.find('muffle') == 3
+    assert index.find('elven dagger') == 1
+    assert index.find('soul trap') is None
+    assert index.index_of('healing ') == 2
+    assert index.index_of('heal') is None
+
+def test_invalidate_removes_saved_index(entries, tmp_path):
+    path = tmp_path / 'favorites_index.json'
+    index = FavoritesIndex(path)
+    index.update(entries)
+    index.save()
+    assert path.exists()
+    index.invalidate()
+    assert not index.is_valid()
+    assert not path.exists()
+
+def test_invalidate_without_saved_index(entries, tmp_path):
+    index = FavoritesIndex(tmp_path / 'favorites_index.json')
+    index.update(entries)
+    index.invalidate()
+    assert not index.is_valid()
+
+def test_invalidate_keeps_going_if_the_file_cannot_be_deleted(entries, tmp_path):
+    path = tmp_path / 'favorites_index.json'
+    path.mkdir()  # os.remove fails on a directory, like on a locked file
+    index = FavoritesIndex(path)
+    index.update(entries)
+    index.invalidate()
+    assert not index.is_valid()
+
+def test_save_and_load(entries, tmp_path):
+    path = tmp_path / 'favorites_index.json'
+    index = FavoritesIndex(path)
+    index.update(entries)
+    index.save()
+
+    loaded = FavoritesIndex(path)
+    assert loaded.load() == 5
+    assert loaded.entries == entries
+
+def test_load_corrupted_file(tmp_path):
+    path = tmp_path / 'favorites_index.json'
+    path.write_text('{not json')
+    index = FavoritesIndex(path)
+    assert index.load() == 0
+    assert not index.is_valid()
@@ -0,0 +1,101 @@
+import threading
+import time
+import numpy as np
+from core.capture import ReplayCaptureBackend
+from core.frame_pipeline import FrameRingBuffer, CapturePipeline
+import pytest
+
+@pytest.fixture
+def frames():
+    """Synthetic frames whose pixel value is their index."""
+    return [np.full((10, 20, 3), value, dtype=np.uint8) for value in range(5)]
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+def test_ring_buffer_needs_two_slots():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(1, (4, 4, 3))
+
+def test_ring_buffer_reader_gets_newest_frame():
+    buffer = FrameRingBuffer(3, (2, 2))
+    for value in (1, 2):
+        slot = buffer.acquire_write()
+        buffer.frames[slot] = value
+        buffer.publish(slot, float(value))
+
+    slot, sequence, timestamp = buffer.acquire_latest(timeout=0)
+    assert sequence == 2 and timestamp == 2.0
+    assert buffer.frames[slot].max() == 2
+    assert buffer.skipped == 1
+    buffer.release(slot)
+
+    # Already claimed, no new frame
+    assert buffer.acquire_latest(timeout=0) is None
+
+def test_ring_buffer_never_overwrites_pinned_or_latest_frame():
+    buffer = FrameRingBuffer(2, (2, 2))
+    slot = buffer.acquire_write()
+    buffer.publish(slot, 0.0)
+    pinned, _, _ = buffer.acquire_latest(timeout=0)
+
+    other = buffer.acquire_write()
+    assert other != pinned
+    buffer.publish(other, 1.0)
+
+    # One slot is pinned, the other holds the newest frame
+    assert buffer.acquire_write() is None
+    assert buffer.dropped == 1
+
+    buffer.release(pinned)
+    assert buffer.acquire_write() == pinned
+
+def test_ring_buffer_close_wakes_readers():
+    buffer = FrameRingBuffer(2, (2, 2))
+    results = []
+    reader = threading.Thread(target=lambda: results.append(buffer.acquire_latest()))
+    reader.start()
+    buffer.close()
+    reader.join(timeout=1)
+    assert results == [None]
+
+def test_pipeline_publishes_analyzed_state(frames):
+    backend = ReplayCaptureBackend(frames, advance_on_grab=True)
+    with CapturePipeline(backend, (0, 0, 20, 10), {'value': lambda frame: int(frame[0, 0, 0])}, fps=200) as pipeline:
+        assert wait_for(lambda: pipeline.analyzed >= 3)
+        state = pipeline.latest_state()
+        assert state.values['value'] in range(5)
+        assert state.sequence >= 3
+
+    assert not pipeline.running
+    stats = pipeline.stats()
+    assert stats['captured'] >= stats['analyzed'] >= 3
+
+def test_pipeline_latest_state_max_age(frames):
+    pipeline = CapturePipeline(ReplayCaptureBackend(frames), (0, 0, 20, 10), {'value': lambda frame: 0}, fps=200)
+    assert pipeline.latest_state() is None
+    with pipeline:
+        assert wait_for(lambda: pipeline.latest_state() is not None)
+    time.sleep(0.05)
+    assert pipeline.latest_state() is not None
+    assert pipeline.latest_state(max_age=0.01) is None
+
+def test_pipeline_drops_frames_under_backpressure(frames):
+    def slow_analyzer(frame):
+        time.sleep(0.05)
+        return 0
+
+    with CapturePipeline(ReplayCaptureBackend(frames), (0, 0, 20, 10), {'value': slow_analyzer}, fps=500) as pipeline:
+        assert wait_for(lambda: pipeline.analyzed >= 2)
+    stats = pipeline.stats()
+    assert stats['skipped'] + stats['dropped'] > 0
+    assert stats['analyzed'] < stats['captured']
+
+def test_pipeline_rejects_invalid_frame_rate(frames):
+    with pytest.raises(ValueError):
+        CapturePipeline(ReplayCaptureBackend(frames), (0, 0, 20, 10), {}, fps=0)
@@ -0,0 +1,49 @@
+import numpy as np
+from core.capture import ReplayCaptureBackend
+from core.frame_snapshot import FrameSnapshot
+import pytest
+
+@pytest.fixture
+def screen():
+    """A synthetic 1920x1080 screen where every pixel encodes its coordinates."""
+    ys, xs = np.mgrid[0:1080, 0:1920]
+    return np.dstack([xs % 256, ys % 256, (xs // 256) + (ys // 256) * 8]).astype(np.uint8)
+
+@pytest.fixture
+def regions():
+    """The default regions from the config: health bar, favorite name, menu, favorite equip."""
+    return [(774, 1006, 375, 19), (7, 791, 395, 43), (517, 82, 96, 43), (402, 798, 29, 35)]
+
+def test_bounding_box():
+    assert FrameSnapshot.bounding_box([(10, 20, 5, 5), (0, 30, 5, 10)]) == (0, 20, 15, 20)
+
+def test_plan_merges_close_regions_only(regions):
+    boxes = FrameSnapshot.plan(regions)
+    # The favorite name and equip icon share one grab, the others are too far apart
+    assert len(boxes) == 3
+    assert (7, 791, 424, 43) in boxes
+    for region in regions:
+        assert any(FrameSnapshot.bounding_box([box, region]) == box for box in boxes)
+
+def test_plan_removes_duplicates():
+    assert FrameSnapshot.plan([(0, 0, 10, 10), [0, 0, 10, 10]]) == [(0, 0, 10, 10)]
+
+def test_capture_matches_direct_grabs(screen, regions):
+    backend = ReplayCaptureBackend([screen])
+    snapshot = FrameSnapshot.capture(backend, regions)
+    assert backend.grab_count == 3
+    for region in regions:
+        assert np.array_equal(snapshot.crop(region), backend.grab(region))
+
+def test_crop_returns_views(screen, regions):
+    snapshot = FrameSnapshot.capture(ReplayCaptureBackend([screen]), regions)
+    name = snapshot.crop(regions[1])
+    icon = snapshot.crop(regions[3])
+    assert name.base is not None and name.base is icon.base
+
+def test_crop_outside_snapshot(screen, regions):
+    snapshot = FrameSnapshot.capture(ReplayCaptureBackend([screen]), regions[:1])
+    assert regions[0] in snapshot
+    assert regions[1] not in snapshot
+    with pytest.raises(ValueError):
+        snapshot.crop(regions[1])
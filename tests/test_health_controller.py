@@ -0,0 +1,66 @@
+import math
+from core.health_controller import HealthController
+import pytest
+
+@pytest.fixture
+def controller():
+    return HealthController(heal_threshold=75, critical_threshold=30, min_interval=0.05, max_interval=1.0, max_drop=2.0, window=2.0)
+
+def feed(controller, values, start=0.0, step=0.1):
+    for i, value in enumerate(values):
+        controller.add_sample(value, timestamp=start + i * step)
+
+def test_no_samples(controller):
+    assert controller.health is None
+    assert controller.rate() == 0.0
+    assert controller.time_to(75) == math.inf
+    assert not controller.should_heal(lead_time=10)
+    assert not controller.is_critical()
+    assert controller.next_interval() == 0.05
+
+def test_single_sample_polls_soon(controller):
+    feed(controller, [80])
+    assert controller.next_interval() == 0.05
+    feed(controller, [80], start=0.05)
+    assert controller.next_interval() == 1.0
+
+def test_stable_health_backs_off(controller):
+    feed(controller, [100] * 10)
+    assert controller.rate() == 0.0
+    assert controller.next_interval() == 1.0
+    assert not controller.should_heal(lead_time=4)
+
+def test_rate_of_falling_health(controller):
+    feed(controller, [100, 99, 98, 97, 96])  # -10 % per second
+    assert controller.rate() == pytest.approx(-10)
+    assert controller.time_to(75) == pytest.approx(2.1)
+
+@pytest.mark.parametrize("per_sample,expected_interval", [
+    (-0.1, 1.0),   # -1 %/s: 2 % takes 2 s, capped at the max interval
+    (-1, 0.2),     # -10 %/s
+    (-5, 0.05),    # -50 %/s: faster than the min interval allows
+])
+def test_poll_interval_follows_damage_rate(controller, per_sample, expected_interval):
+    feed(controller, [100 + i * per_sample for i in range(5)])
+    assert controller.next_interval() == pytest.approx(expected_interval)
+
+def test_heals_ahead_of_threshold(controller):
+    feed(controller, [95, 93, 91, 89, 87])  # -20 %/s, 0.6 s from the threshold
+    assert not controller.should_heal(lead_time=0.5)
+    assert controller.should_heal(lead_time=1.0)
+
+def test_heals_below_threshold(controller):
+    feed(controller, [74])
+    assert controller.should_heal()
+
+def test_old_samples_leave_the_window(controller):
+    feed(controller, [100, 50], step=0.1)
+    controller.add_sample(50, timestamp=5.0)
+    assert len(controller.samples) == 1
+    assert controller.rate() == 0.0
+
+def test_critical_and_reset(controller):
+    feed(controller, [29])
+    assert controller.is_critical()
+    controller.reset()
+    assert controller.health is None
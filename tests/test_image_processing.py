@@ -1,5 +1,7 @@
 import cv2
+import numpy as np
 from core.image_processing import ImageProcessing  # Import the static class
+from core.capture import ReplayCaptureBackend
 from config.config import cfg
 from pathlib import Path
 import pytest
@@ -53,6 +55,36 @@ def test_analyze_health(img_paths, img_key, expected_percentage):
     health_percentage = ImageProcessing.analyze_health(health_image)
     assert round(health_percentage, 2) == pytest.approx(expected_percentage, abs=4.0)
 
+@pytest.mark.parametrize("img_key,expected_percentage", [
+    ('healthbar_99', 99),
+    ('healthbar_75', 75),
+    ('healthbar_50', 50),
+    ('healthbar_25', 25)
+])
+def test_analyze_health_fast(img_paths, img_key, expected_percentage):
+    # The fast path stays behind general_health_fast_path until it is checked against recordings of the game
+    if not img_paths[img_key].exists():
+        pytest.skip(f"Recording {img_paths[img_key].name} is not available")
+    health_image = ImageProcessing.crop_image(
+        load_image(img_paths[img_key]), cfg.general_region_healtbar.value
+    )
+    health_percentage = ImageProcessing.analyze_health_fast(health_image)
+    assert health_percentage == pytest.approx(expected_percentage, abs=4.0)
+    assert health_percentage == pytest.approx(ImageProcessing.analyze_health(health_image), abs=4.0)
+
+@pytest.mark.parametrize("expected_percentage", [100, 80, 50, 10])
+def test_analyze_health_fast_synthetic(expected_percentage):
+    width = 375
+    bar_width = width * expected_percentage // 100
+    start = (width - bar_width) // 2
+    img = np.full((19, width, 3), 40, dtype=np.uint8)
+    img[4:15, start:start + bar_width] = (20, 20, 180)
+    img[9, start + bar_width // 3] = 40
+    assert ImageProcessing.analyze_health_fast(img) == pytest.approx(expected_percentage, abs=0.5)
+
+def test_analyze_health_fast_empty_bar():
+    assert ImageProcessing.analyze_health_fast(np.full((19, 375, 3), 40, dtype=np.uint8)) == 0
+
 def test_analyze_menu(img_paths):
     img = ImageProcessing.crop_image(
         load_image(img_paths['menu_open']), cfg.general_region_menu.value
@@ -82,3 +114,93 @@ def test_analyze_favorite_name(img_paths, img_key, expected_selection):
 def test_analyze_favorite_equip(img_paths, img_key, expected_selection):
     favorite_selection = ImageProcessing.analyze_favorite_equip(str(img_paths[img_key]))
     assert favorite_selection == expected_selection
+
+@pytest.mark.parametrize("img_key,expected_selection", [
+    ('fav_left', "l"),
+    ('fav_right', "r"),
+    ('fav_both', "lr")
+])
+def test_analyze_favorite_equip_offset_hud(img_paths, img_key, expected_selection):
+    # The search margin finds the icon when the HUD is a few pixels off the configured region
+    img = np.roll(load_image(img_paths[img_key]), (6, -5), axis=(0, 1))
+    assert ImageProcessing.analyze_favorite_equip(img) == expected_selection
+
+@pytest.mark.parametrize("img_key,expected_selection", [
+    ('fav_left', "l"),
+    ('fav_right', "r"),
+    ('fav_both', "lr")
+])
+def test_analyze_favorite_equip_snapshot(img_paths, replay_backend, img_key, expected_selection):
+    backend = replay_backend([img_paths[img_key]])
+    snapshot = ImageProcessing.snapshot([ImageProcessing.favorite_equip_search_region()])
+    assert ImageProcessing.analyze_favorite_equip(snapshot) == expected_selection
+    assert backend.grab_count == 1
+
+def test_favorite_equip_search_region():
+    x, y, w, h = cfg.general_region_favequip.value
+    assert ImageProcessing.favorite_equip_search_region(0) == (x, y, w, h)
+    assert ImageProcessing.favorite_equip_search_region(5) == (x - 5, y - 5, w + 10, h + 10)
+    left, top, _, _ = ImageProcessing.favorite_equip_search_region(10000)
+    assert (left, top) == (0, 0)
+
+@pytest.fixture
+def replay_backend():
+    """Install a replay capture backend for the duration of a test."""
+    def install(frames, **kwargs):
+        backend = ReplayCaptureBackend(frames, **kwargs)
+        ImageProcessing.set_capture_backend(backend)
+        return backend
+    yield install
+    ImageProcessing.set_capture_backend(None)
+
+def test_frame_difference():
+    dark = np.zeros((10, 10, 3), dtype=np.uint8)
+    assert ImageProcessing.frame_difference(dark, dark) == 0
+    assert ImageProcessing.frame_difference(np.full_like(dark, 10), dark) == pytest.approx(10)
+
+def test_wait_until_changed(replay_backend):
+    dark = np.zeros((20, 20, 3), dtype=np.uint8)
+    bright = np.full((20, 20, 3), 200, dtype=np.uint8)
+    backend = replay_backend([dark, dark, dark, bright], loop=False, advance_on_grab=True)
+    assert ImageProcessing.wait_until_changed((0, 0, 20, 20), timeout=1, interval=0)
+    assert backend.grab_count == 4
+
+def test_wait_until_changed_timeout(replay_backend):
+    dark = np.zeros((20, 20, 3), dtype=np.uint8)
+    replay_backend([dark])
+    assert not ImageProcessing.wait_until_changed((0, 0, 20, 20), timeout=0.05, interval=0.01)
+
+def test_wait_until_changed_ignores_other_regions(replay_backend):
+    first = np.zeros((20, 40, 3), dtype=np.uint8)
+    second = first.copy()
+    second[:, 20:] = 255
+    replay_backend([first, second], advance_on_grab=True)
+    assert not ImageProcessing.wait_until_changed((0, 0, 20, 20), timeout=0.05, interval=0.01)
+
+def test_wait_until_stable(replay_backend):
+    frames = [np.full((20, 20, 3), value, dtype=np.uint8) for value in (0, 100, 200)]
+    backend = replay_backend(frames, loop=False, advance_on_grab=True)
+    assert ImageProcessing.wait_until_stable((0, 0, 20, 20), timeout=1, settle=0.05, interval=0.01)
+    assert backend.index == len(frames) - 1
+
+def test_wait_until_stable_timeout(replay_backend):
+    frames = [np.full((20, 20, 3), value, dtype=np.uint8) for value in (0, 200)]
+    replay_backend(frames, advance_on_grab=True)
+    assert not ImageProcessing.wait_until_stable((0, 0, 20, 20), timeout=0.05, settle=0.02, interval=0.001)
+
+
+def test_missing_image_path_is_reported(tmp_path):
+    path = str(tmp_path / 'missing.png')
+    for analyzer in (ImageProcessing.analyze_health, ImageProcessing.analyze_health_fast, ImageProcessing.analyze_favorite_name):
+        with pytest.raises(ValueError, match='missing.png'):
+            analyzer(path)
+
+def test_health_reader_follows_the_setting():
+    fast_path = cfg.general_health_fast_path.value
+    try:
+        cfg.general_health_fast_path.value = False
+        assert ImageProcessing.health_reader() is ImageProcessing.analyze_health
+        cfg.general_health_fast_path.value = True
+        assert ImageProcessing.health_reader() is ImageProcessing.analyze_health_fast
+    finally:
+        cfg.general_health_fast_path.value = fast_path
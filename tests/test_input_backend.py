@@ -0,0 +1,80 @@
+import time
+import threading
+from core.input_backend import InputBatch, InputEvent, RecordingInputBackend
+from core.clock import SystemClock, VirtualClock
+import pytest
+
+@pytest.fixture
+def backend():
+    return RecordingInputBackend()
+
+@pytest.fixture
+def virtual_backend():
+    """Backend whose timestamps are exact, the waits of a batch advance a VirtualClock."""
+    return RecordingInputBackend(VirtualClock())
+
+def test_batch_events():
+    batch = InputBatch().press('a', count=2, interval=0.2, hold=0.05).wait(0.5).click(['left', 'right'], hold=0.1).wait(1)
+    assert batch.events == [
+        InputEvent('key_down', 'a', 0.0),
+        InputEvent('key_up', 'a', 0.05),
+        InputEvent('key_down', 'a', 0.2),
+        InputEvent('key_up', 'a', 0.05),
+        InputEvent('mouse_down', 'left', 0.5),
+        InputEvent('mouse_down', 'right', 0.0),
+        InputEvent('mouse_up', 'left', 0.1),
+        InputEvent('mouse_up', 'right', 0.0),
+        InputEvent('wait', None, 1),
+    ]
+    assert batch.duration == pytest.approx(1.9)
+
+def test_send_keeps_order_and_releases_everything(backend):
+    backend.send(InputBatch().move(10, 20).click('left').press('a', count=3).press('s', count=8).press('enter'))
+    assert [kind for _, kind, _ in backend.events[:3]] == ['move', 'mouse_down', 'mouse_up']
+    assert backend.keys_pressed() == ['a'] * 3 + ['s'] * 8 + ['enter']
+    assert backend.pressed == set()
+
+def test_send_timing(virtual_backend):
+    batch = InputBatch().press('a', count=5, interval=0.02).wait(0.03)
+    virtual_backend.send(batch)
+    timestamps = [timestamp for timestamp, kind, _ in virtual_backend.events if kind == 'key_down']
+    # Deadlines are measured from the start of the batch, so the intervals do not drift
+    assert timestamps == pytest.approx([0.0, 0.02, 0.04, 0.06, 0.08])
+    assert virtual_backend.clock.now() == pytest.approx(0.11)
+
+def test_trailing_wait_is_kept(backend):
+    start = time.perf_counter()
+    backend.send(InputBatch().press('f5').wait(0.05))
+    assert time.perf_counter() - start >= 0.05
+
+@pytest.mark.parametrize("buttons,expected", [
+    ('right', ['right']),
+    (['left', 'right'], ['left', 'right']),
+])
+def test_click_holds_buttons(virtual_backend, buttons, expected):
+    virtual_backend.click(buttons, hold=0.02)
+    downs = [(timestamp, value) for timestamp, kind, value in virtual_backend.events if kind == 'mouse_down']
+    ups = [(timestamp, value) for timestamp, kind, value in virtual_backend.events if kind == 'mouse_up']
+    assert [value for _, value in downs] == expected
+    assert [value for _, value in ups] == expected
+    assert all(timestamp == 0 for timestamp, _ in downs)
+    assert all(timestamp == pytest.approx(0.02) for timestamp, _ in ups)
+    assert virtual_backend.pressed == set()
+
+def test_interrupt_releases_held_buttons():
+    clock = SystemClock()
+    backend = RecordingInputBackend(clock)
+    timer = threading.Timer(0.02, clock.interrupt)
+    timer.start()
+    start = time.perf_counter()
+    assert not backend.send(InputBatch().click(['left', 'right'], hold=5).press('a', count=3, interval=1))
+    timer.join()
+    assert time.perf_counter() - start < 0.1
+    assert [kind for _, kind, _ in backend.events] == ['mouse_down', 'mouse_down', 'mouse_up', 'mouse_up']
+    assert backend.pressed == set()
+
+def test_press_reports_dropped_input(virtual_backend):
+    assert virtual_backend.press('q')
+    virtual_backend.clock.interrupt()
+    assert not virtual_backend.press('q')
+    assert [kind for _, kind, _ in virtual_backend.events] == ['key_down', 'key_up']
@@ -0,0 +1,78 @@
+from core.job_queue import Job, JobQueue, sequence_settings
+from config.config import cfg, HandSelection
+import pytest
+
+@pytest.fixture
+def job_queue(tmp_path):
+    return JobQueue(tmp_path / 'job_queue.json')
+
+def test_sequence_settings():
+    settings = sequence_settings('train_illusion')
+    assert settings['illusion_repeat_time'] is cfg.illusion_repeat_time
+    assert all(item.group == 'train_illusion' for item in settings.values())
+
+def test_add_snapshots_current_settings(job_queue):
+    job = job_queue.add('train_illusion')
+    assert set(job.settings) == set(sequence_settings('train_illusion'))
+    assert job.settings['illusion_repeat_time'] == cfg.illusion_repeat_time.value
+
+def test_add_rejects_settings_of_other_sequences(job_queue):
+    with pytest.raises(ValueError):
+        job_queue.add('train_illusion', {'armor_train_time': 30})
+
+def test_applied_settings_are_restored():
+    repeat_time, hand = cfg.illusion_repeat_time.value, cfg.illusion_hand.value
+    job = Job('train_illusion', {'illusion_repeat_time': 200, 'illusion_hand': HandSelection.BOTH.value})
+    with job.applied_settings():
+        assert cfg.illusion_repeat_time.value == 200
+        assert cfg.illusion_hand.value == HandSelection.BOTH
+    assert (cfg.illusion_repeat_time.value, cfg.illusion_hand.value) == (repeat_time, hand)
+
+def test_queue_order_and_status(job_queue):
+    first = job_queue.add('train_illusion', {'illusion_repeat_time': 200})
+    second = job_queue.add('train_armor', {'armor_train_time': 30})
+    assert job_queue.next_job() is first
+    job_queue.set_status(first, Job.DONE)
+    assert job_queue.next_job() is second
+    assert job_queue.pending() == [second]
+
+def test_running_job_resumes_after_a_crash(job_queue):
+    first = job_queue.add('train_illusion', {'illusion_repeat_time': 200})
+    job_queue.add('train_conjuration', {})
+    job_queue.set_status(first, Job.RUNNING)
+
+    restored = JobQueue(job_queue.path)
+    assert restored.load() == 2
+    job = restored.next_job()
+    assert (job.id, job.sequence, job.status, job.settings) == (first.id, 'train_illusion', Job.PENDING, {'illusion_repeat_time': 200})
+
+def test_prune_removes_finished_jobs(job_queue):
+    done = job_queue.add('train_illusion', {})
+    failed = job_queue.add('train_armor', {})
+    pending = job_queue.add('train_conjuration', {})
+    job_queue.set_status(done, Job.DONE)
+    job_queue.set_status(failed, Job.FAILED)
+    assert job_queue.prune() == 2
+    assert job_queue.jobs == [pending]
+    restored = JobQueue(job_queue.path)
+    restored.load()
+    assert [job.id for job in restored] == [pending.id]
+
+def test_load_drops_finished_jobs_of_earlier_sessions(job_queue):
+    job_queue.set_status(job_queue.add('train_illusion', {}), Job.DONE)
+    job_queue.add('train_armor', {})
+    restored = JobQueue(job_queue.path)
+    assert restored.load() == 1
+    assert len(restored) == 1
+
+def test_clear_keeps_running_job(job_queue):
+    running = job_queue.add('train_armor', {})
+    job_queue.add('train_illusion', {})
+    job_queue.set_status(running, Job.RUNNING)
+    job_queue.clear()
+    assert job_queue.jobs == [running]
+
+def test_load_corrupted_file(job_queue):
+    job_queue.path.write_text('{not json')
+    assert job_queue.load() == 0
+    assert len(job_queue) == 0
@@ -0,0 +1,71 @@
+import numpy as np
+from core.ocr_cache import OcrCache
+import pytest
+
+@pytest.fixture
+def images():
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (43, 395), dtype=np.uint8) for _ in range(3)]
+
+def test_hit_and_miss_counters(images):
+    cache = OcrCache()
+    assert cache.get(images[0]) is None
+    cache.put(images[0], None, 'muffle')
+    assert cache.get(images[0]) == 'muffle'
+    assert cache.get(images[0].copy()) == 'muffle'
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3, 'size': 1}
+
+def test_config_is_part_of_the_key(images):
+    cache = OcrCache()
+    cache.put(images[0], '--psm 7', 'muffle')
+    assert cache.get(images[0]) is None
+    assert cache.get(images[0], '--psm 7') == 'muffle'
+
+def test_lru_eviction(images):
+    cache = OcrCache(max_size=2)
+    cache.put(images[0], None, 'a')
+    cache.put(images[1], None, 'b')
+    cache.get(images[0])
+    cache.put(images[2], None, 'c')
+    assert cache.get(images[1]) is None
+    assert cache.get(images[0]) == 'a'
+    assert len(cache) == 2
+
+def test_zero_size_disables_cache(images):
+    cache = OcrCache(max_size=0)
+    cache.put(images[0], None, 'a')
+    assert cache.get(images[0]) is None
+
+def test_ttl_eviction(images, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('core.ocr_cache.time.time', lambda: now[0])
+    cache = OcrCache(ttl=60)
+    cache.put(images[0], None, 'a')
+    now[0] += 59
+    assert cache.get(images[0]) == 'a'
+    now[0] += 2
+    assert cache.get(images[0]) is None
+    assert len(cache) == 0
+
+def test_perceptual_hash_tolerates_small_changes(images):
+    cache = OcrCache(hash_mode='perceptual')
+    cache.put(images[0], None, 'a')
+    noisy = images[0].copy()
+    noisy[0, 0] ^= 1
+    assert cache.get(noisy) == 'a'
+    assert cache.get(images[1]) is None
+
+def test_save_and_load(images, tmp_path):
+    path = tmp_path / 'ocr_cache.json'
+    cache = OcrCache(path=path)
+    cache.put(images[0], None, 'muffle')
+    cache.put(images[1], '--psm 7', 'soul trap')
+    cache.save()
+
+    loaded = OcrCache(path=path)
+    assert loaded.load() == 2
+    assert loaded.get(images[0]) == 'muffle'
+    assert loaded.get(images[1], '--psm 7') == 'soul trap'
+
+def test_load_missing_file(tmp_path):
+    assert OcrCache(path=tmp_path / 'missing.json').load() == 0
@@ -0,0 +1,96 @@
+import threading
+import numpy as np
+from core import ocr_service
+from core.ocr_service import OcrService, OcrEngine, FakeOcrEngine, TesseractProcessEngine, default_engine_factory
+from core.exceptions import OcrError
+import pytest
+
+class BlockingEngine(OcrEngine):
+    """Engine that waits for an event before answering, to keep the workers busy."""
+    def __init__(self, release):
+        self.release = release
+
+    def image_to_string(self, image, config=None):
+        self.release.wait()
+        return 'done'
+
+@pytest.fixture
+def images():
+    return [np.full((10, 20), value, dtype=np.uint8) for value in (0, 128, 255)]
+
+def test_extract_uses_engine(images):
+    engine = FakeOcrEngine(default='unknown')
+    engine.add_response(images[0], 'Quests')
+    service = OcrService(lambda: engine)
+    try:
+        assert service.extract(images[0]) == 'Quests'
+        assert service.extract(images[1], config='--psm 7') == 'unknown'
+        assert engine.calls[1] == (FakeOcrEngine.digest(images[1]), '--psm 7')
+    finally:
+        service.close()
+
+def test_each_worker_owns_an_engine(images):
+    engines = []
+    lock = threading.Lock()
+
+    def factory():
+        engine = FakeOcrEngine(default='text')
+        with lock:
+            engines.append(engine)
+        return engine
+
+    service = OcrService(factory, workers=3)
+    futures = [service.submit(image) for image in images * 4]
+    assert [future.result(timeout=5) for future in futures] == ['text'] * 12
+    service.close()
+    assert len(engines) == 3
+    assert sum(len(engine.calls) for engine in engines) == 12
+
+def test_queue_is_bounded(images):
+    release = threading.Event()
+    service = OcrService(lambda: BlockingEngine(release), workers=1, max_queue=1)
+    try:
+        first = service.submit(images[0])
+        # Wait until the worker picked up the first request so the queue is empty again
+        while not first.running():
+            pass
+        service.submit(images[1])
+        with pytest.raises(OcrError):
+            service.submit(images[2], timeout=0.05)
+    finally:
+        release.set()
+        service.close()
+
+def test_engine_start_failure(images):
+    def factory():
+        raise RuntimeError("tesseract is not installed")
+
+    service = OcrService(factory)
+    try:
+        with pytest.raises(OcrError):
+            service.extract(images[0], timeout=5)
+    finally:
+        service.close()
+
+def test_submit_after_close(images):
+    service = OcrService(FakeOcrEngine)
+    service.close()
+    with pytest.raises(OcrError):
+        service.submit(images[0])
+
+@pytest.mark.parametrize("error", [ImportError("No module named 'tesserocr'"), RuntimeError("Failed to init API, possibly an invalid tessdata path")])
+def test_default_engine_falls_back_to_the_executable(monkeypatch, error):
+    def failing_engine():
+        raise error
+
+    monkeypatch.setattr(ocr_service, 'TesserocrEngine', failing_engine)
+    engine = default_engine_factory()
+    assert isinstance(engine, TesseractProcessEngine)
+
+def test_bundled_tessdata_path(monkeypatch, tmp_path):
+    monkeypatch.delattr(ocr_service.sys, '_MEIPASS', raising=False)
+    assert ocr_service.bundled_tessdata_path() is None
+    monkeypatch.setattr(ocr_service.sys, '_MEIPASS', str(tmp_path), raising=False)
+    assert ocr_service.bundled_tessdata_path() is None
+    (tmp_path / 'tessdata').mkdir()
+    assert ocr_service.bundled_tessdata_path() == str(tmp_path / 'tessdata')
@@ -0,0 +1,69 @@
+import threading
+from core.tracing import Tracer, Span
+from core.performance import PerformanceReporter, activity_times, compute_metrics
+import pytest
+
+
+def span(stage, start, duration, thread=1):
+    return Span(stage, start, duration, thread)
+
+
+def test_nested_spans_are_not_counted_twice():
+    spans = [
+        span('wait', 0.0, 2.0),
+        span('capture', 0.5, 0.1),
+        span('focus_window', 0.5, 0.02),
+        span('input', 3.0, 1.0),
+        span('cycle', 0.0, 4.0),
+    ]
+    times = activity_times(spans, 0.0, 10.0)
+    assert times['sleeping'] == pytest.approx(1.9)
+    assert times['analyzing'] == pytest.approx(0.08)
+    assert times['acting'] == pytest.approx(1.02)
+
+
+def test_spans_are_clipped_to_the_window():
+    times = activity_times([span('sleep', 0.0, 10.0), span('input', 9.5, 1.0)], 8.0, 10.0)
+    assert times['sleeping'] == pytest.approx(1.5)
+    assert times['acting'] == pytest.approx(0.5)
+
+
+def test_compute_metrics():
+    spans = [span('cycle', i * 6.0, 5.0) for i in range(10)]
+    spans += [span('capture', i * 0.1, 0.01, thread=2) for i in range(600)]
+    spans += [span('ocr', 1.2, 0.02), span('ocr', 2.2, 0.04), span('ocr', 3.2, 0.03)]
+    spans += [span('health_poll', i * 0.5, 0.001) for i in range(120)]
+    spans += [span('sleep', 59.0, 1.0)]
+    metrics = compute_metrics(spans, window=60.0, now=60.0, thread=1)
+
+    assert metrics.cycles_per_minute == pytest.approx(10)
+    assert metrics.capture_fps == pytest.approx(10)
+    assert metrics.ocr_latency == pytest.approx(30)
+    assert metrics.health_polls == pytest.approx(2)
+    assert metrics.sleeping == pytest.approx(0.998 / 60)
+    assert metrics.analyzing == pytest.approx(0.21 / 60)  # The captures run on another thread
+
+
+def test_metrics_without_spans():
+    metrics = compute_metrics([], window=10.0, now=10.0)
+    assert (metrics.cycles_per_minute, metrics.ocr_latency, metrics.sleeping) == (0, None, 0)
+
+
+def test_reporter_reports_until_stopped():
+    tracer = Tracer(enabled=True)
+    reports = []
+    reported = threading.Event()
+
+    def callback(metrics):
+        reports.append(metrics)
+        reported.set()
+
+    reporter = PerformanceReporter(callback, interval=0.01, tracer=tracer)
+    reporter.start()
+    with tracer.span('cycle'):
+        pass
+    assert reported.wait(1)
+    reporter.stop()
+    count = len(reports)
+    assert reports[-1].cycles_per_minute > 0
+    assert not reported.wait(0.05) or len(reports) == count
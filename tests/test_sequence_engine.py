@@ -0,0 +1,116 @@
+import threading
+from core.sequence_engine import SequenceContext, SequenceRunner, Sequence, Step, Loop, Parallel
+import pytest
+
+class FakeThread:
+    def __init__(self):
+        self._is_running = True
+
+class FakeLogic:
+    def __init__(self):
+        self.current_thread = FakeThread()
+
+class RecordingContext(SequenceContext):
+    """Context recording the waits instead of sleeping."""
+    def __init__(self, logic, state=None):
+        super().__init__(logic, state)
+        self.sleeps = []
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+@pytest.fixture
+def context():
+    return RecordingContext(FakeLogic())
+
+@pytest.fixture
+def runner():
+    return SequenceRunner()
+
+def test_steps_run_in_order(context, runner):
+    calls = []
+    sequence = Sequence('Test', '', [Step('a', lambda ctx: calls.append('a')), Step('b', lambda ctx: calls.append('b'), wait=0.5)])
+    assert runner.run(sequence, context)
+    assert calls == ['a', 'b']
+    assert context.sleeps == [0.5]
+
+def test_failed_step_stops_sequence(context, runner):
+    calls = []
+    sequence = Sequence('Test', '', [Step('fail', lambda ctx: False), Step('never', lambda ctx: calls.append('never'))])
+    assert not runner.run(sequence, context)
+    assert calls == []
+
+def test_optional_step_failure_continues(context, runner):
+    calls = []
+    sequence = Sequence('Test', '', [Step('fail', lambda ctx: False, optional=True), Step('next', lambda ctx: calls.append('next'))])
+    assert runner.run(sequence, context)
+    assert calls == ['next']
+
+def test_retries(context, runner):
+    attempts = []
+    step = Step('flaky', lambda ctx: attempts.append(1) or len(attempts) >= 3, retries=2, retry_delay=0.1)
+    assert runner.run(Sequence('Test', '', [step]), context)
+    assert len(attempts) == 3
+    assert context.sleeps == [0.1, 0.1]
+
+def test_guard_and_skip(context, runner):
+    calls = []
+    context.state['equipped'] = 'muffle'
+    sequence = Sequence('Test', '', [
+        Step('guarded', lambda ctx: calls.append('guarded'), guard=lambda ctx: False, wait=1),
+        Step('equip', lambda ctx: calls.append('equip'), skip_if=lambda ctx: ctx.state.get('equipped') == 'muffle'),
+    ])
+    assert runner.run(sequence, context)
+    assert calls == []
+    assert context.sleeps == []
+
+def test_loop_times_and_wait(context, runner):
+    iterations = []
+    loop = Loop('cast', [Step('record', lambda ctx: iterations.append(ctx.values['iteration']))], times=lambda ctx: 3, wait=0.2)
+    assert runner.run(Sequence('Test', '', [loop]), context)
+    assert iterations == [0, 1, 2]
+    assert context.sleeps == [0.2, 0.2, 0.2]
+
+def test_loop_until(context, runner):
+    context.values['count'] = 0
+    def increment(ctx):
+        ctx.values['count'] += 1
+    loop = Loop('count', [Step('increment', increment)], until=lambda ctx: ctx.values['count'] >= 4)
+    assert runner.run(Sequence('Test', '', [loop]), context)
+    assert context.values['count'] == 4
+
+def test_stop_ends_loop_and_runs_teardown(context, runner):
+    teardown = []
+    def stop_after_two(ctx):
+        if ctx.values['iteration'] == 1:
+            ctx.logic.current_thread._is_running = False
+    sequence = Sequence('Test', '', [Loop('loop', [Step('stop', stop_after_two)])], teardown=lambda ctx: teardown.append(True))
+    assert not runner.run(sequence, context)
+    assert context.values['iteration'] == 1
+    assert teardown == [True]
+
+def test_exception_fails_sequence(context, runner):
+    def boom(ctx):
+        raise RuntimeError("boom")
+    teardown = []
+    assert not runner.run(Sequence('Test', '', [Step('boom', boom)], teardown=lambda ctx: teardown.append(True)), context)
+    assert teardown == [True]
+
+def test_parallel_runs_steps_concurrently(context, runner):
+    barrier = threading.Barrier(2, timeout=2)
+    parallel = Parallel('reads', [Step('a', lambda ctx: barrier.wait()), Step('b', lambda ctx: barrier.wait())])
+    assert runner.run(Sequence('Test', '', [parallel]), context)
+
+def test_parallel_fails_if_a_step_fails(context, runner):
+    parallel = Parallel('reads', [Step('ok', lambda ctx: True), Step('fail', lambda ctx: False)])
+    assert not runner.run(Sequence('Test', '', [parallel]), context)
+
+def test_state_is_shared_between_runs(runner):
+    state = {}
+    sequence = Sequence('Test', '', [Step('remember', lambda ctx: ctx.state.update(seen=ctx.state.get('seen', 0) + 1))])
+    runner.run(sequence, RecordingContext(FakeLogic(), state))
+    runner.run(sequence, RecordingContext(FakeLogic(), state))
+    assert state['seen'] == 2
+
+def test_function_name():
+    assert Sequence('Train Illusion', '', []).function_name == 'train_illusion'
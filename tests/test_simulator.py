@@ -0,0 +1,287 @@
+import cv2
+from pathlib import Path
+from core.simulator import Simulator, blank_screen, draw_bar
+from core.image_processing import ImageProcessing
+from core.clock import SystemClock
+from core.utils import Utils
+from core.logic import Logic
+from core import sequences
+from core.job_queue import JobQueue
+from core.tracing import tracer
+from core.frame_pipeline import CapturePipeline
+from core.capture import CaptureBackend
+from core.favorites_index import FavoritesIndex
+from core.favorite_recognizer import FavoriteNameRecognizer
+import time
+from config.config import cfg, HandSelection
+import pytest
+
+ASSETS_PATH = Path(__file__).parent / 'assets'
+
+
+class ArmorFight:
+    """Health falls at a constant rate and a cast of the healing spell restores some of it when released."""
+
+    def __init__(self, damage_per_second=5, heal_amount=40):
+        self.damage_per_second = damage_per_second
+        self.heal_amount = heal_amount
+        self.health = 100.0
+        self.updated = 0.0
+        self.lowest = 100.0
+        self.heals = 0
+        self.frame = blank_screen()
+
+    def update(self, simulator):
+        now = simulator.clock.now()
+        self.health = max(self.health - self.damage_per_second * (now - self.updated), 0)
+        self.updated = now
+        self.lowest = min(self.lowest, self.health)
+
+    def screen(self, simulator):
+        self.update(simulator)
+        return draw_bar(self.frame, cfg.general_region_healtbar.value, self.health)
+
+    def heal(self, simulator):
+        self.update(simulator)
+        self.health = min(self.health + self.heal_amount, 100)
+        self.heals += 1
+
+
+class SpellCasting:
+    """Every cast uses some magicka, and waiting an hour refills it. Like in the game, a full magicka bar is hidden."""
+
+    def __init__(self, cost):
+        self.cost = cost
+        self.magicka = 100
+        self.casts = 0
+        self.rests = 0
+        self.frame = blank_screen()
+
+    def screen(self, simulator):
+        draw_bar(self.frame, cfg.general_region_magickabar.value, 0 if self.magicka >= 100 else self.magicka, color=(200, 80, 30))
+        return self.frame
+
+    def cast(self, simulator):
+        assert self.magicka >= self.cost, "Cast without enough magicka"
+        self.magicka -= self.cost
+        self.casts += 1
+
+    def rest(self, simulator):
+        self.magicka = 100
+        self.rests += 1
+
+
+@pytest.fixture
+def logic():
+    return Logic()
+
+
+def test_install_restores_backends():
+    capture_backend, input_backend, clock = ImageProcessing.capture_backend, Utils.input_backend, Utils.clock
+    with Simulator(blank_screen()) as simulator:
+        assert ImageProcessing.get_capture_backend() is simulator.capture_backend
+        assert Utils.get_input_backend() is simulator.input_backend
+        assert Utils.get_clock() is simulator.clock
+        assert Utils.focus_window(cfg.general_window_name.value)
+    assert (ImageProcessing.capture_backend, Utils.input_backend, Utils.clock) == (capture_backend, input_backend, clock)
+    assert isinstance(Utils.get_clock(), SystemClock)
+
+
+def test_waits_use_simulated_time():
+    region = (0, 0, 10, 10)
+    with Simulator(blank_screen()) as simulator:
+        simulator.show(blank_screen(color=(255, 255, 255)), delay=0.5)
+        assert ImageProcessing.wait_until_changed(region, timeout=2)
+        assert 0.5 <= simulator.clock.now() < 0.6
+        assert not ImageProcessing.wait_until_changed(region, timeout=3)
+        assert simulator.clock.now() == pytest.approx(3.5, abs=0.1)
+
+
+def test_input_handlers_and_timestamps():
+    simulator = Simulator(blank_screen())
+    pressed = []
+    simulator.on('key_down', 'enter', lambda sim: pressed.append(sim.clock.now()))
+    with simulator:
+        Utils.press_key_with_delay('a', delay=1)
+        Utils.press_key_with_delay('enter')
+    assert pressed == [pytest.approx(1)]
+    assert [(round(timestamp, 3), kind, value) for timestamp, kind, value in simulator.events] == [
+        (0, 'key_down', 'a'), (0, 'key_up', 'a'), (1, 'key_down', 'enter'), (1, 'key_up', 'enter')]
+
+
+def test_detect_favorite_equipped_from_recorded_frame(logic):
+    with Simulator(cv2.imread(str(ASSETS_PATH / 'fav_both.png'))):
+        assert logic.detect_favorite_equipped() == HandSelection.BOTH
+
+
+def test_train_armor(logic):
+    fight = ArmorFight()
+    simulator = Simulator(fight.screen).on('mouse_up', cfg.armor_hand.value.name.lower(), fight.heal)
+    logic.sequence_state['equipped'] = (sequences.healing_spell(), cfg.armor_hand.value)
+    with simulator:
+        assert logic.train_armor()
+
+    assert simulator.clock.now() >= cfg.armor_train_time.value * 60
+    assert fight.heals > 0
+    assert fight.lowest > 30
+    assert logic.health_pipeline is None
+
+
+def test_train_armor_polls_soon_after_healing_under_heavy_damage(logic):
+    fight = ArmorFight(damage_per_second=10, heal_amount=50)
+    simulator = Simulator(fight.screen).on('mouse_up', cfg.armor_hand.value.name.lower(), fight.heal)
+    logic.sequence_state['equipped'] = (sequences.healing_spell(), cfg.armor_hand.value)
+    with simulator:
+        assert logic.train_armor()
+    assert fight.lowest > 40
+
+
+def test_train_illusion_rests_only_when_magicka_runs_out(logic):
+    casting = SpellCasting(cost=cfg.illusion_spell_cost.value)
+    simulator = Simulator(casting.screen).on('mouse_up', cfg.illusion_hand.value.name.lower(), casting.cast)
+    simulator.on('key_down', 'enter', casting.rest)
+    logic.sequence_state['equipped'] = ('muffle', cfg.illusion_hand.value)
+    with simulator:
+        assert logic.train_illusion()
+
+    casts_per_bar = 100 // casting.cost
+    assert casting.casts == cfg.illusion_repeat_time.value
+    assert casting.rests == (casting.casts - 1) // casts_per_bar
+
+
+def test_train_armor_for_a_thousand_minutes(logic):
+    fight = ArmorFight()
+    simulator = Simulator(fight.screen).on('mouse_up', cfg.armor_hand.value.name.lower(), fight.heal)
+    logic.sequence_state['equipped'] = (sequences.healing_spell(), cfg.armor_hand.value)
+    train_time = cfg.armor_train_time.value
+    cfg.armor_train_time.value = 1000
+    try:
+        with simulator:
+            assert logic.train_armor()
+    finally:
+        cfg.armor_train_time.value = train_time
+    assert simulator.clock.now() >= 1000 * 60
+    assert fight.lowest > 30
+
+
+def test_interrupted_clock_ends_waits(logic):
+    simulator = Simulator(blank_screen())
+    simulator.schedule(2, lambda sim: sim.clock.interrupt())
+    with simulator:
+        logic.perform_action(HandSelection.RIGHT, delay=5)
+        assert not ImageProcessing.wait_until_changed((0, 0, 10, 10), timeout=5)
+    assert simulator.clock.now() == pytest.approx(2, abs=0.01)
+    assert [(kind, value) for _, kind, value in simulator.events] == [('mouse_down', 'right'), ('mouse_up', 'right')]
+
+
+def test_job_queue_runs_sequences_back_to_back(logic, tmp_path):
+    casting = SpellCasting(cost=cfg.illusion_spell_cost.value)
+    simulator = Simulator(casting.screen).on('mouse_up', None, casting.cast).on('key_down', 'enter', casting.rest)
+    logic.job_queue = JobQueue(tmp_path / 'job_queue.json')
+    logic.job_queue.add('train_illusion', {'illusion_repeat_time': 7})
+    logic.job_queue.add('train_conjuration', {'conjuration_repeat_time': 3})
+    logic.sequence_state['equipped'] = ('muffle', cfg.illusion_hand.value)
+    repeat_time = cfg.illusion_repeat_time.value
+
+    # Equipping Soul Trap needs OCR, mark it as done once the Illusion job is over
+    simulator.on('mouse_up', None, lambda sim: casting.casts == 7 and logic.sequence_state.update(equipped=('soul trap', cfg.conjuration_hand.value)))
+    with simulator:
+        assert logic.run_jobs()  # Every job completed
+
+    assert casting.casts == 10
+    assert len(logic.job_queue) == 0  # Pruned once the queue is done
+    assert cfg.illusion_repeat_time.value == repeat_time
+
+
+def test_tracing_records_the_stages_of_a_sequence(logic):
+    casting = SpellCasting(cost=cfg.illusion_spell_cost.value)
+    simulator = Simulator(casting.screen).on('mouse_up', None, casting.cast).on('key_down', 'enter', casting.rest)
+    logic.sequence_state['equipped'] = ('muffle', cfg.illusion_hand.value)
+    tracer.clear()
+    tracer.enabled = True
+    try:
+        with simulator:
+            assert logic.train_illusion()
+    finally:
+        tracer.enabled = False
+    stats = tracer.stats()
+    assert {'capture', 'analyze_bars', 'focus_window', 'input', 'sleep'} <= set(stats)
+    assert stats['input']['count'] >= casting.casts
+
+
+class StallingCaptureBackend(CaptureBackend):
+    """Returns a full health bar once, then fails like a capture thread that lost the screen."""
+
+    def __init__(self):
+        self.frame = draw_bar(blank_screen(), cfg.general_region_healtbar.value, 100)
+        self.grabs = 0
+
+    def grab(self, region=None, out=None):
+        self.grabs += 1
+        if self.grabs > 1:
+            raise OSError("Capture failed")
+        x, y, w, h = region
+        out[...] = self.frame[y:y+h, x:x+w]
+        return out
+
+
+def test_check_health_ignores_a_stalled_pipeline(logic):
+    pipeline = CapturePipeline(StallingCaptureBackend(), cfg.general_region_healtbar.value,
+                               {'health': ImageProcessing.analyze_health_fast}, fps=100)
+    logic.health_pipeline = pipeline
+    with Simulator(draw_bar(blank_screen(), cfg.general_region_healtbar.value, 40)), pipeline:
+        deadline = time.monotonic() + 2
+        while pipeline.latest_state() is None and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert pipeline.latest_state().values['health'] == pytest.approx(100, abs=2)
+        time.sleep(logic.health_max_age_frames * pipeline.interval + 0.05)
+        assert logic.check_health() == pytest.approx(40, abs=2)
+    logic.health_pipeline = None
+
+
+class FavoritesMenu:
+    """The favorites menu of the game: 'w' and 's' move the cursor, the selected name is shown in the favorite region."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.cursor = 0
+
+    def screen(self, simulator):
+        frame = blank_screen(color=(30, 30, 30))
+        x, y, w, h = cfg.general_region_favselect.value
+        cv2.putText(frame, self.entries[self.cursor], (x + 10, y + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (230, 230, 230), 2)
+        return frame
+
+    def move(self, step):
+        def handler(simulator):
+            self.cursor = min(max(self.cursor + step, 0), len(self.entries) - 1)
+        return handler
+
+    def name_image(self, simulator):
+        return ImageProcessing.crop_image(self.screen(simulator), cfg.general_region_favselect.value)
+
+
+def test_misread_favorite_is_forgotten(logic, tmp_path):
+    menu = FavoritesMenu(['Healing', 'Muffle', 'Soul Trap'])
+    simulator = Simulator(menu.screen).on('key_down', 's', menu.move(1)).on('key_down', 'w', menu.move(-1))
+    logic.favorites_index = FavoritesIndex(tmp_path / 'favorites_index.json')
+    logic.favorites_index.update(['healing', 'muffle', 'soul trap'])
+    logic.favorites_index.save()
+
+    # The recognizer remembers a misread of Muffle
+    recognizer = FavoriteNameRecognizer()
+    for cursor, text in enumerate(['healing', 'mufflc', 'soul trap']):
+        menu.cursor = cursor
+        recognizer.learn(ImageProcessing._threshold_favorite_name(menu.name_image(simulator)), text)
+    menu.cursor = 0
+    previous_recognizer, ImageProcessing.favorite_recognizer = ImageProcessing.favorite_recognizer, recognizer
+    try:
+        with simulator:
+            assert not logic.jump_to_favorite('muffle', logic.read_favorite())
+    finally:
+        ImageProcessing.favorite_recognizer = previous_recognizer
+
+    assert menu.cursor == 1
+    assert not logic.favorites_index.is_valid()
+    assert recognizer.lookup(ImageProcessing._threshold_favorite_name(menu.name_image(simulator))) is None
+    assert len(recognizer) == 1  # Soul Trap was not involved
@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+from core.template_matching import TemplateMatcher
+import pytest
+
+@pytest.fixture(scope="module")
+def search_image():
+    """A random grayscale image with a flat band on the left side."""
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (35, 40), dtype=np.uint8)
+    img[:, :10] = 100
+    return img
+
+@pytest.fixture(scope="module")
+def templates(search_image):
+    rng = np.random.default_rng(1)
+    return [
+        ('noise1', rng.integers(0, 256, (12, 9), dtype=np.uint8)),
+        ('noise2', rng.integers(0, 256, (12, 9), dtype=np.uint8)),
+        ('exact', search_image[5:17, 20:29].copy()),
+        ('small', search_image[20:26, 3:15].copy()),
+    ]
+
+def test_ncc_numpy_matches_opencv(search_image, templates):
+    stack = np.stack([template for label, template in templates[:3]])
+    scores = TemplateMatcher.ncc_numpy(search_image, stack)
+    for score_map, (_, template) in zip(scores, templates[:3]):
+        expected = cv2.matchTemplate(search_image, template, cv2.TM_CCOEFF_NORMED)
+        assert score_map.shape == expected.shape
+        assert np.allclose(score_map, expected, atol=1e-4)
+
+@pytest.mark.parametrize("method", TemplateMatcher.methods)
+def test_match_finds_exact_template(search_image, templates, method):
+    result = TemplateMatcher.match(search_image, templates, method=method)
+    assert result['label'] == 'exact'
+    assert result['confidence'] == pytest.approx(1.0, abs=1e-4)
+    assert result['location'] == (20, 5)
+    assert set(result['scores']) == {'noise1', 'noise2', 'exact', 'small'}
+
+@pytest.mark.parametrize("method", TemplateMatcher.methods)
+def test_match_early_exit(search_image, templates, method):
+    result = TemplateMatcher.match(search_image, [templates[2], templates[3]], threshold=0.9, method=method)
+    assert result['label'] == 'exact'
+    assert 'small' not in result['scores']
+
+def test_match_multiple_images(search_image, templates):
+    other = np.full_like(search_image, 30)
+    result = TemplateMatcher.match([other, cv2.cvtColor(search_image, cv2.COLOR_GRAY2BGR)], templates)
+    assert result['label'] == 'exact'
+    assert result['image_index'] == 1
+
+def test_match_skips_oversized_templates(templates):
+    result = TemplateMatcher.match(np.zeros((8, 8), dtype=np.uint8), templates)
+    assert result['label'] is None
+    assert result['scores'] == {}
+
+def test_match_unknown_method(search_image, templates):
+    with pytest.raises(ValueError):
+        TemplateMatcher.match(search_image, templates, method='fft')
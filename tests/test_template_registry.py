@@ -0,0 +1,58 @@
+import os
+import shutil
+import cv2
+from core.template_registry import TemplateRegistry
+from pathlib import Path
+import pytest
+
+@pytest.fixture
+def template_path(tmp_path):
+    """Copy a template from core/assets to a temporary folder so it can be modified."""
+    source = Path(__file__).parent.parent / 'core' / 'assets' / 'fav_right_icon.png'
+    path = tmp_path / 'fav_right_icon.png'
+    shutil.copy(source, path)
+    return path
+
+def test_get_returns_grayscale_template(template_path):
+    registry = TemplateRegistry()
+    registry.register('fav_right_icon', template_path)
+    template = registry.get('fav_right_icon')
+    assert template.ndim == 2
+    assert template.shape == cv2.imread(str(template_path), cv2.IMREAD_GRAYSCALE).shape
+
+def test_get_is_served_from_memory(template_path):
+    registry = TemplateRegistry()
+    registry.register('fav_right_icon', template_path)
+    template = registry.get('fav_right_icon')
+    os.remove(template_path)
+    assert registry.get('fav_right_icon') is template
+
+@pytest.mark.parametrize("scale", [0.5, 1.5, 2.0])
+def test_get_scaled_template(template_path, scale):
+    registry = TemplateRegistry()
+    registry.register('fav_right_icon', template_path)
+    height, width = registry.get('fav_right_icon').shape
+    scaled = registry.get('fav_right_icon', scale)
+    assert scaled.shape == (round(height * scale), round(width * scale))
+    assert registry.get('fav_right_icon', scale) is scaled
+
+def test_refresh_invalidates_changed_template(template_path):
+    registry = TemplateRegistry()
+    registry.register('fav_right_icon', template_path)
+    template = registry.get('fav_right_icon')
+    assert registry.refresh() == []
+
+    cv2.imwrite(str(template_path), cv2.resize(template, None, fx=2, fy=2))
+    stat = os.stat(template_path)
+    os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert registry.refresh() == ['fav_right_icon']
+    assert registry.get('fav_right_icon').shape == (template.shape[0] * 2, template.shape[1] * 2)
+
+def test_get_unknown_template():
+    with pytest.raises(KeyError):
+        TemplateRegistry().get('menu_marker')
+
+def test_register_missing_file(tmp_path):
+    with pytest.raises(ValueError):
+        TemplateRegistry().register('missing', tmp_path / 'missing.png')
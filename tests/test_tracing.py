@@ -0,0 +1,95 @@
+import json
+from core.tracing import Tracer
+import pytest
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(capacity=100, enabled=True)
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+
+    @tracer.traced('stage')
+    def work(value):
+        return value * 2
+
+    with tracer.span('block'):
+        assert work(21) == 42
+    assert tracer.snapshot() == []
+    assert tracer.stats() == {}
+
+
+def test_traced_and_span_record_stages(tracer):
+    @tracer.traced('work')
+    def work():
+        pass
+
+    work()
+    work()
+    with tracer.span('block'):
+        pass
+
+    assert [span.stage for span in tracer.snapshot()] == ['work', 'work', 'block']
+    assert tracer.stats()['work']['count'] == 2
+    assert all(span.duration >= 0 for span in tracer.snapshot())
+
+
+def test_failing_call_is_recorded(tracer):
+    @tracer.traced('fail')
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        fail()
+    assert [span.stage for span in tracer.snapshot()] == ['fail']
+
+
+def test_ring_buffer_keeps_the_latest_spans(tracer):
+    for i in range(250):
+        tracer.record('stage', float(i), 0.001)
+    spans = tracer.snapshot()
+    assert len(spans) == tracer.capacity == 100
+    assert spans[0].start == 150
+    assert len(tracer.snapshot(since=200)) == 50
+
+
+def test_recent_returns_the_spans_ended_in_the_window(tracer):
+    for i in range(100):
+        tracer.record('stage', float(i), 0.5)
+    tracer.record('sleep', 50.0, 49.0)  # Started long before the window, ended in it
+    recent = tracer.recent(ended_after=95.0)
+    assert [span.start for span in recent] == [95.0, 96.0, 97.0, 98.0, 99.0, 50.0]
+    assert [span.stage for span in tracer.recent(ended_after=99.0)] == ['stage', 'sleep']
+    assert tracer.recent(ended_after=200.0) == []
+
+
+@pytest.mark.parametrize("durations, expected", [
+    ([0.001] * 10, {'p50': 1, 'p95': 1, 'p99': 1, 'max': 1}),
+    ([i / 1000 for i in range(1, 101)], {'p50': 50.5, 'p95': 95.05, 'p99': 99.01, 'max': 100}),
+])
+def test_stats_percentiles(tracer, durations, expected):
+    for duration in durations:
+        tracer.record('stage', 0.0, duration)
+    stats = tracer.stats()['stage']
+    assert stats['count'] == len(durations)
+    for key, value in expected.items():
+        assert stats[key] == pytest.approx(value)
+
+
+def test_export_chrome_trace(tracer, tmp_path):
+    tracer.record('capture', tracer.origin + 0.5, 0.002)
+    path = tracer.export_chrome_trace(tmp_path / 'trace.json')
+    data = json.loads(path.read_text())
+    event, = data['traceEvents']
+    assert (event['name'], event['ph']) == ('capture', 'X')
+    assert event['ts'] == pytest.approx(500000)
+    assert event['dur'] == pytest.approx(2000)
+
+
+def test_export_json(tracer, tmp_path):
+    tracer.record('ocr', tracer.origin, 0.03)
+    data = json.loads(tracer.export_json(tmp_path / 'trace.json').read_text())
+    assert data['stats']['ocr']['p50'] == pytest.approx(30)
+    assert data['spans'] == [{'stage': 'ocr', 'start': 0, 'duration': 0.03, 'thread': tracer.snapshot()[0].thread}]
@@ -0,0 +1,99 @@
+import threading
+import time
+from core.training_runnable import TrainingRunnable
+from core.simulator import Simulator, blank_screen, draw_bar
+from core.clock import ScaledClock
+from core.logic import Logic
+from core.utils import Utils
+from config.config import cfg
+import pytest
+
+
+class FinishedSignal:
+    def __init__(self):
+        self.event = threading.Event()
+
+    def emit(self):
+        self.event.set()
+
+
+@pytest.fixture
+def simulator():
+    # Half-empty magicka bar, so the bot keeps casting without resting
+    frame = draw_bar(blank_screen(), cfg.general_region_magickabar.value, 50, color=(200, 80, 30))
+    with Simulator(frame, clock=ScaledClock(scale=20), grab_time=0) as simulator:
+        yield simulator
+
+
+def start(logic, function):
+    signal = FinishedSignal()
+    runnable = TrainingRunnable(logic, function, signal)
+    threading.Thread(target=runnable.run, daemon=True).start()
+    return runnable, signal
+
+
+def test_stop_ends_the_sequence_quickly(simulator):
+    logic = Logic()
+
+    def train_illusion():
+        logic.sequence_state['equipped'] = ('muffle', cfg.illusion_hand.value)  # The runnable resets the state on start
+        return logic.train_illusion()
+
+    runnable, signal = start(logic, train_illusion)
+    time.sleep(0.1)  # In the middle of a cast
+
+    start_time = time.perf_counter()
+    runnable.stop()
+    assert time.perf_counter() - start_time < 0.01  # stop() does not wait for the runnable
+    assert signal.event.wait(5)
+
+    assert runnable.stop_latency < TrainingRunnable.stop_latency_target
+    assert simulator.input_backend.pressed == set()
+    assert not Utils.get_cancel_token().cancelled
+
+
+def test_stop_before_start(simulator):
+    signal = FinishedSignal()
+    runnable = TrainingRunnable(Logic(), lambda: Utils.wait_until(lambda: False, timeout=60), signal)
+    runnable.stop()
+    runnable.run()
+    assert signal.event.is_set()
+    assert runnable.stop_latency < TrainingRunnable.stop_latency_target
+
+
+def test_metrics_are_reported_during_the_run(simulator):
+    metrics = []
+
+    class MetricsSignal:
+        def emit(self, value):
+            metrics.append(value)
+
+    logic = Logic()
+    runnable = TrainingRunnable(logic, lambda: Utils.wait_until(lambda: False, timeout=30), FinishedSignal(), MetricsSignal())
+    runnable.run()  # 1.5 s at the scale of the clock
+    assert len(metrics) >= 2
+    assert metrics[-1].sleeping > 0.5
+
+
+def test_stop_while_equipping_closes_the_favorites_menu(monkeypatch):
+    favorites = {'open': False}
+
+    def screen(simulator):
+        return blank_screen(color=(200, 200, 200) if favorites['open'] else (0, 0, 0))
+
+    def toggle_favorites(simulator):
+        favorites['open'] = not favorites['open']
+        if favorites['open']:
+            runnable.stop()  # Stopped while the menu opens
+
+    logic = Logic()
+    monkeypatch.setattr(logic, 'close_menu_if_open', lambda: None)  # No game menu to read in this simulation
+    runnable = TrainingRunnable(logic, lambda: logic.equip_favorite('muffle'), FinishedSignal())
+    with Simulator(screen).on('key_down', 'q', toggle_favorites) as simulator:
+        runnable.run()
+
+    assert not favorites['open']
+    assert not logic.favorites_menu_open
+    keys = [value for _, kind, value in simulator.events if kind == 'key_down']
+    assert keys[:3] == ['q', 'q', 'f5']  # Closed before the quicksave
+
@@ -0,0 +1,64 @@
+from core.window_manager import FakeWindowManager, WindowHandleCache
+from core.exceptions import WindowNotFoundException, WindowAmbiguousException
+import pytest
+
+WINDOW_TITLE = 'Skyrim Special Edition'
+
+@pytest.fixture
+def window_manager():
+    return FakeWindowManager()
+
+@pytest.fixture
+def cache(window_manager):
+    return WindowHandleCache(window_manager)
+
+def test_focus_resolves_handle_once(window_manager, cache):
+    handle = window_manager.add_window(WINDOW_TITLE)
+    for _ in range(10):
+        assert cache.focus(WINDOW_TITLE) == handle
+    assert window_manager.find_calls == 1
+    assert window_manager.focus_calls == 1
+
+def test_focus_again_after_losing_foreground(window_manager, cache):
+    handle = window_manager.add_window(WINDOW_TITLE)
+    other = window_manager.add_window('Notepad')
+    cache.focus(WINDOW_TITLE)
+    window_manager.set_focus(other)
+    cache.focus(WINDOW_TITLE)
+    assert window_manager.foreground == handle
+    assert window_manager.find_calls == 1
+
+def test_focus_after_move(window_manager, cache):
+    handle = window_manager.add_window(WINDOW_TITLE)
+    cache.focus(WINDOW_TITLE)
+    window_manager.move_window(handle, (100, 100, 2020, 1180))
+    cache.focus(WINDOW_TITLE)
+    assert cache.rect == (100, 100, 2020, 1180)
+    assert window_manager.focus_calls == 2
+    assert window_manager.find_calls == 1
+
+def test_focus_restores_minimized_window(window_manager, cache):
+    handle = window_manager.add_window(WINDOW_TITLE)
+    cache.focus(WINDOW_TITLE)
+    window_manager.minimize_window(handle)
+    cache.focus(WINDOW_TITLE)
+    assert not window_manager.is_minimized(handle)
+    assert window_manager.foreground == handle
+
+def test_focus_resolves_lost_window(window_manager, cache):
+    handle = window_manager.add_window(WINDOW_TITLE)
+    cache.focus(WINDOW_TITLE)
+    window_manager.close_window(handle)
+    new_handle = window_manager.add_window(WINDOW_TITLE)
+    assert cache.focus(WINDOW_TITLE) == new_handle
+    assert window_manager.find_calls == 2
+
+def test_focus_missing_window(cache):
+    with pytest.raises(WindowNotFoundException):
+        cache.focus(WINDOW_TITLE)
+
+def test_focus_ambiguous_window(window_manager, cache):
+    window_manager.add_window(WINDOW_TITLE)
+    window_manager.add_window(WINDOW_TITLE)
+    with pytest.raises(WindowAmbiguousException):
+        cache.focus(WINDOW_TITLE)
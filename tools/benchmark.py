@@ -0,0 +1,280 @@
+"""
+Micro benchmarks for the hot paths of the bot.
+
+Usage:
+    python tools/benchmark.py capture --iterations 200
+    python tools/benchmark.py match --iterations 200
+    python tools/benchmark.py health --iterations 1000
+    python tools/benchmark.py snapshot --iterations 200
+    python tools/benchmark.py input --iterations 50
+    python tools/benchmark.py simulate --minutes 10
+    python tools/benchmark.py trace --iterations 100000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+ASSETS_PATH = Path(__file__).resolve().parents[1] / 'tests' / 'assets'
+
+
+def measure(func, iterations, warmup=5):
+    """Run func repeatedly and return the per-call timings in milliseconds."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<40} mean {statistics.mean(timings):8.3f} ms   median {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def bench_capture(args):
+    """Compare pyautogui.screenshot with the persistent mss capture backend."""
+    import cv2
+    import numpy as np
+    import pyautogui
+    from core.capture import MssCaptureBackend
+
+    region = tuple(args.region)
+
+    def pyautogui_grab():
+        img = np.array(pyautogui.screenshot(region=region))
+        return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+    backend = MssCaptureBackend()
+    out = np.empty((region[3], region[2], 3), dtype=np.uint8)
+
+    report("pyautogui.screenshot", measure(pyautogui_grab, args.iterations))
+    report("MssCaptureBackend.grab", measure(lambda: backend.grab(region), args.iterations))
+    report("MssCaptureBackend.grab (reused buffer)", measure(lambda: backend.grab(region, out=out), args.iterations))
+    backend.close()
+
+
+def bench_match(args):
+    """Compare the per-template matching loop with TemplateMatcher as the template count grows."""
+    import cv2
+    import numpy as np
+    from core.template_matching import TemplateMatcher
+
+    frame = cv2.imread(str(ASSETS_PATH / 'fav_both.png'))
+    x, y, w, h = args.region
+    crop = frame[y:y+h, x:x+w]
+    icon = cv2.imread(str(Path(__file__).resolve().parents[1] / 'core' / 'assets' / 'fav_both_icon.png'), cv2.IMREAD_GRAYSCALE)
+    rng = np.random.default_rng(0)
+
+    def loop_match(img, templates):
+        gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        best_label, best_confidence = None, 0
+        for label, template in templates:
+            _, max_val, _, _ = cv2.minMaxLoc(cv2.matchTemplate(gray_img, template, cv2.TM_CCOEFF_NORMED))
+            if max_val > best_confidence:
+                best_label, best_confidence = label, max_val
+        return best_label, best_confidence
+
+    for count in args.counts:
+        templates = [(f'noise{i}', rng.integers(0, 256, icon.shape, dtype=np.uint8)) for i in range(count - 1)]
+        templates.append(('icon', icon))
+        print(f"--- {count} templates")
+        report("loop", measure(lambda: loop_match(crop, templates), args.iterations))
+        report("TemplateMatcher opencv", measure(lambda: TemplateMatcher.match(crop, templates), args.iterations))
+        report("TemplateMatcher opencv (early exit 0.95)", measure(lambda: TemplateMatcher.match(crop, templates[::-1], threshold=0.95), args.iterations))
+        report("TemplateMatcher numpy", measure(lambda: TemplateMatcher.match(crop, templates, method='numpy'), args.iterations))
+
+
+def bench_health(args):
+    """Compare the morphology health reader, the scanline fast path and the BarAnalyzer."""
+    import cv2
+    import numpy as np
+    from core.image_processing import ImageProcessing
+
+    path = ASSETS_PATH / 'healthbar_50.png'
+    x, y, w, h = args.region
+    if path.exists():
+        img = cv2.imread(str(path))[y:y+h, x:x+w]
+    else:
+        # Synthetic half-full bar when the recorded frame is not available
+        img = np.full((h, w, 3), 40, dtype=np.uint8)
+        img[4:h - 4, w // 4:w * 3 // 4] = (20, 20, 180)
+
+    print(f"analyze_health: {ImageProcessing.analyze_health(img):.2f}%   analyze_health_fast: {ImageProcessing.analyze_health_fast(img):.2f}%")
+    report("analyze_health (morphology)", measure(lambda: ImageProcessing.analyze_health(img), args.iterations))
+    report("analyze_health_fast", measure(lambda: ImageProcessing.analyze_health_fast(img), args.iterations))
+
+    from core.bar_analyzer import BarAnalyzer, BarSpec
+    region = (0, 0, w, h)
+    analyzer = BarAnalyzer([BarSpec.health(region)])
+    three_bars = BarAnalyzer([BarSpec.health(region), BarSpec.magicka(region), BarSpec.stamina(region)])
+    report("BarAnalyzer (health)", measure(lambda: analyzer.analyze(img), args.iterations))
+    report("BarAnalyzer (health, magicka, stamina)", measure(lambda: three_bars.analyze(img), args.iterations))
+
+
+def bench_snapshot(args):
+    """Compare one grab per region, a FrameSnapshot and a full-screen grab for the configured regions."""
+    from core.capture import MssCaptureBackend
+    from core.frame_snapshot import FrameSnapshot
+
+    regions = [(774, 1006, 375, 19), (7, 791, 395, 43), (517, 82, 96, 43), (402, 798, 29, 35)]
+    backend = MssCaptureBackend()
+
+    def per_region():
+        return [backend.grab(region) for region in regions]
+
+    def full_screen():
+        frame = backend.grab()
+        return [frame[y:y+h, x:x+w] for x, y, w, h in regions]
+
+    print(f"Snapshot grabs: {FrameSnapshot.plan(regions)}")
+    report("one grab per region", measure(per_region, args.iterations))
+    report("FrameSnapshot", measure(lambda: FrameSnapshot.capture(backend, regions), args.iterations))
+    report("full screen + crop", measure(full_screen, args.iterations))
+    backend.close()
+
+
+def bench_input(args):
+    """Compare the latency of pyautogui, the keyboard module and the InputBackend, and the timing accuracy of a batch."""
+    from core.input_backend import InputBatch, RecordingInputBackend
+
+    if sys.platform == 'win32':
+        # Sends real input: run it with a window that ignores the key and clicks focused
+        import keyboard
+        import pyautogui
+        from core.input_backend import Win32InputBackend
+
+        backend = Win32InputBackend()
+        report(f"pyautogui mouseDown/Up (PAUSE {pyautogui.PAUSE}s)", measure(lambda: (pyautogui.mouseDown(button='middle'), pyautogui.mouseUp(button='middle')), args.iterations))
+        report("keyboard.press_and_release", measure(lambda: keyboard.press_and_release('shift'), args.iterations))
+        report("Win32InputBackend.click", measure(lambda: backend.click('middle'), args.iterations))
+        report("Win32InputBackend.press", measure(lambda: backend.press('shift'), args.iterations))
+
+    # Timing of the quit menu burst of Logic.quicksave_and_quit_game, with the intervals scaled down
+    recorder = RecordingInputBackend()
+    batch = InputBatch().press('a', count=3, interval=args.interval).wait(args.interval).press('s', count=8, interval=args.interval)
+    errors = []
+    for _ in range(args.iterations):
+        recorder.clear()
+        recorder.send(batch)
+        timestamps = [timestamp for timestamp, kind, _ in recorder.events if kind == 'key_down']
+        errors += [abs(b - a - args.interval) * 1000 for a, b in zip(timestamps, timestamps[1:])]
+    report(f"batch interval error ({args.interval * 1000:.0f} ms)", errors)
+
+
+def bench_simulate(args):
+    """Run Train Armor against a simulated fight and compare the simulated time with the time it took."""
+    from config.config import cfg
+    from core.logic import Logic
+    from core.simulator import Simulator, blank_screen, draw_bar
+    from core import sequences
+
+    frame = blank_screen()
+    fight = {'health': 100.0, 'updated': 0.0}
+
+    def update(simulator):
+        now = simulator.clock.now()
+        fight['health'] = max(fight['health'] - args.damage * (now - fight['updated']), 0)
+        fight['updated'] = now
+
+    def screen(simulator):
+        update(simulator)
+        return draw_bar(frame, cfg.general_region_healtbar.value, fight['health'])
+
+    def heal(simulator):
+        update(simulator)
+        fight['health'] = min(fight['health'] + 40, 100)
+
+    cfg.armor_train_time.value = args.minutes
+    simulator = Simulator(screen).on('mouse_up', cfg.armor_hand.value.name.lower(), heal)
+    logic = Logic()
+    logic.sequence_state['equipped'] = (sequences.healing_spell(), cfg.armor_hand.value)
+    start = time.perf_counter()
+    with simulator:
+        logic.train_armor()
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {simulator.clock.now():.0f} s in {elapsed:.2f} s ({simulator.clock.now() / elapsed:.0f}x real time), "
+          f"{simulator.capture_backend.grab_count} grabs, {len(simulator.events)} input events")
+
+
+def bench_trace(args):
+    """Measure the cost of a traced call, with the tracer disabled and enabled."""
+    from core.tracing import Tracer
+
+    tracer = Tracer()
+
+    def plain():
+        pass
+
+    traced = tracer.traced('stage')(plain)
+
+    def span():
+        with tracer.span('stage'):
+            pass
+
+    def per_call_ns(func):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            func()
+        return (time.perf_counter() - start) / args.iterations * 1e9
+
+    baseline = per_call_ns(plain)
+    print(f"{'plain call':<40} {baseline:8.0f} ns")
+    for enabled in (False, True):
+        tracer.enabled = enabled
+        state = 'enabled' if enabled else 'disabled'
+        print(f"{'traced call (' + state + ')':<40} {per_call_ns(traced):8.0f} ns")
+        print(f"{'span (' + state + ')':<40} {per_call_ns(span):8.0f} ns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    capture_parser = subparsers.add_parser('capture', help=bench_capture.__doc__)
+    capture_parser.add_argument('--iterations', type=int, default=200)
+    capture_parser.add_argument('--region', type=int, nargs=4, default=[774, 1006, 375, 19], metavar=('X', 'Y', 'W', 'H'))
+    capture_parser.set_defaults(func=bench_capture)
+
+    match_parser = subparsers.add_parser('match', help=bench_match.__doc__)
+    match_parser.add_argument('--iterations', type=int, default=200)
+    match_parser.add_argument('--counts', type=int, nargs='+', default=[1, 3, 8, 16, 32, 64])
+    match_parser.add_argument('--region', type=int, nargs=4, default=[392, 788, 49, 55], metavar=('X', 'Y', 'W', 'H'))
+    match_parser.set_defaults(func=bench_match)
+
+    health_parser = subparsers.add_parser('health', help=bench_health.__doc__)
+    health_parser.add_argument('--iterations', type=int, default=1000)
+    health_parser.add_argument('--region', type=int, nargs=4, default=[774, 1006, 375, 19], metavar=('X', 'Y', 'W', 'H'))
+    health_parser.set_defaults(func=bench_health)
+
+    snapshot_parser = subparsers.add_parser('snapshot', help=bench_snapshot.__doc__)
+    snapshot_parser.add_argument('--iterations', type=int, default=200)
+    snapshot_parser.set_defaults(func=bench_snapshot)
+
+    input_parser = subparsers.add_parser('input', help=bench_input.__doc__)
+    input_parser.add_argument('--iterations', type=int, default=50)
+    input_parser.add_argument('--interval', type=float, default=0.01)
+    input_parser.set_defaults(func=bench_input)
+
+    simulate_parser = subparsers.add_parser('simulate', help=bench_simulate.__doc__)
+    simulate_parser.add_argument('--minutes', type=int, default=10)
+    simulate_parser.add_argument('--damage', type=float, default=5, help="Health lost per second")
+    simulate_parser.set_defaults(func=bench_simulate)
+
+    trace_parser = subparsers.add_parser('trace', help=bench_trace.__doc__)
+    trace_parser.add_argument('--iterations', type=int, default=100000)
+    trace_parser.set_defaults(func=bench_trace)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()